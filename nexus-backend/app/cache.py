@@ -0,0 +1,101 @@
+import copy
+import hashlib
+import re
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .database import llm_cache_collection
+
+# --- BELLEK İÇİ LRU ---
+class TTLCache:
+    """Boyutu sınırlı, girdileri belirli bir süre sonra geçersiz olan basit bir LRU önbellek."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# --- LLM YANIT ÖNBELLEĞİ (bellek + MongoDB) ---
+_memory = TTLCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"memory_hits": 0, "db_hits": 0, "misses": 0})
+
+def normalize_prompt(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def make_key(namespace: str, template_version: str, model_name: str, prompt: str) -> str:
+    """
+    Normalize edilmiş prompt, model adı ve şablon sürümünden içerik adresli bir anahtar üretir.
+    `template_version` servislerin PROMPT_VERSION sabitidir: prompt şablonu ya da çıktının
+    yorumlanma biçimi değiştiğinde artırılmalıdır, böylece eski önbellek girdileri kullanılmaz.
+    """
+    raw = "\x1f".join([namespace, template_version, model_name, normalize_prompt(prompt)])
+    return f"{namespace}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+async def get(key: str) -> Optional[Any]:
+    namespace = key.split(":", 1)[0]
+    value = _memory.get(key)
+    if value is not None:
+        _stats[namespace]["memory_hits"] += 1
+        return copy.deepcopy(value)
+
+    doc = await llm_cache_collection.find_one({"_id": key, "expiresAt": {"$gt": datetime.utcnow()}})
+    if doc is not None:
+        _stats[namespace]["db_hits"] += 1
+        _memory.set(key, doc["value"])
+        return copy.deepcopy(doc["value"])
+
+    _stats[namespace]["misses"] += 1
+    return None
+
+async def put(key: str, value: Any) -> None:
+    namespace = key.split(":", 1)[0]
+    _memory.set(key, copy.deepcopy(value))
+    now = datetime.utcnow()
+    await llm_cache_collection.update_one(
+        {"_id": key},
+        {"$set": {
+            "namespace": namespace,
+            "value": value,
+            "createdAt": now,
+            "expiresAt": now + timedelta(seconds=settings.RESPONSE_CACHE_TTL_SECONDS),
+        }},
+        upsert=True,
+    )
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    stats = {}
+    for namespace, counters in _stats.items():
+        hits = counters["memory_hits"] + counters["db_hits"]
+        total = hits + counters["misses"]
+        stats[namespace] = {**counters, "hit_rate": round(hits / total, 4) if total else 0.0}
+    return stats
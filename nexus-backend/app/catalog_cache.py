@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from .config import settings
+from .database import catalog_meta_collection
+
+# Sadece seed_db.py çalıştığında değişen katalog verileri (önerilen roadmap'ler, challenge
+# listesi) için süreç içi, sürümlü bir okuma önbelleği. Her girdi, JSON olarak önceden
+# serileştirilmiş yanıt gövdesini ve ETag'ini tutar. Seeder catalog_meta koleksiyonundaki
+# sürüm sayacını artırır; süreçler bu sayacı en fazla CATALOG_VERSION_CHECK_SECONDS'ta bir
+# okur ve sürüm değiştiyse girdileri yeniden yükler. İstek başına veritabanına gidilmez.
+
+CATALOG_VERSION_ID = "catalog"
+
+Loader = Callable[[], Awaitable[bytes]]
+_loaders: Dict[str, Loader] = {}
+_entries: Dict[str, Tuple[int, bytes, str]] = {}
+_build_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+_change_hooks: List[Callable[[], None]] = []
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "not_modified": 0, "loads": 0})
+
+_version: Optional[int] = None
+_version_checked_at = 0.0
+_version_lock = asyncio.Lock()
+
+def register(name: str) -> Callable[[Loader], Loader]:
+    """Bir katalog girdisinin yanıt gövdesini (JSON bytes) üreten yükleyiciyi kaydeder."""
+    def decorator(loader: Loader) -> Loader:
+        _loaders[name] = loader
+        return loader
+    return decorator
+
+def on_change(hook: Callable[[], None]) -> None:
+    """Katalog sürümü değiştiğinde çağrılacak bir fonksiyon ekler (ör. başka süreç içi önbellekleri temizlemek için)."""
+    _change_hooks.append(hook)
+
+def serialize(type_: Any, docs: Any) -> bytes:
+    """Dokümanları response_model ile aynı şekilde doğrulayıp (alias'larla) JSON'a çevirir."""
+    adapter = TypeAdapter(type_)
+    return adapter.dump_json(adapter.validate_python(docs), by_alias=True)
+
+async def current_version() -> int:
+    global _version, _version_checked_at
+    if _version is not None and time.monotonic() - _version_checked_at < settings.CATALOG_VERSION_CHECK_SECONDS:
+        return _version
+    async with _version_lock:
+        if _version is None or time.monotonic() - _version_checked_at >= settings.CATALOG_VERSION_CHECK_SECONDS:
+            doc = await catalog_meta_collection.find_one({"_id": CATALOG_VERSION_ID})
+            version = doc["version"] if doc else 0
+            if _version is not None and version != _version:
+                for hook in _change_hooks:
+                    hook()
+            _version = version
+            _version_checked_at = time.monotonic()
+    return _version
+
+async def get(name: str) -> Tuple[bytes, str]:
+    """Girdinin güncel (gövde, ETag) çiftini döndürür; sürüm değiştiyse önce yeniden yükler."""
+    version = await current_version()
+    entry = _entries.get(name)
+    if entry is None or entry[0] != version:
+        async with _build_locks[name]:
+            entry = _entries.get(name)
+            if entry is None or entry[0] != version:
+                body = await _loaders[name]()
+                etag = f'"{version}-{hashlib.sha256(body).hexdigest()[:16]}"'
+                entry = (version, body, etag)
+                _entries[name] = entry
+                _stats[name]["loads"] += 1
+    return entry[1], entry[2]
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+async def respond(name: str, request: Request) -> Response:
+    """Önbellekteki gövdeyi ETag ile döndürür; istemcinin kopyası güncelse 304 döner."""
+    body, etag = await get(name)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=0, must-revalidate"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        _stats[name]["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    _stats[name]["hits"] += 1
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    return {name: dict(counters) for name, counters in _stats.items()}
@@ -6,7 +6,68 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: Optional[str] = None
     JWT_SECRET_KEY: str
 
+    # --- LLM Gateway ---
+    GEMINI_MODEL_NAME: str = "gemini-1.5-flash"
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TIMEOUT_SECONDS: float = 60.0
+
+    # --- LLM Yanıt Önbelleği ---
+    RESPONSE_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+
+    # --- Katalog Önbelleği ---
+    # Seeder'ın artırdığı katalog sürümünün en fazla ne sıklıkla okunacağı.
+    CATALOG_VERSION_CHECK_SECONDS: float = 5.0
+
+    # --- Roadmap Şablonları ---
+    # Kayıtlı roadmap'ler okunurken birleştirilen şablonların bellekte tutulma süresi.
+    TEMPLATE_CACHE_TTL_SECONDS: int = 300
+
+    # --- Node Sohbeti Bağlam Penceresi ---
+    CHAT_CONTEXT_TURNS: int = 6
+    CHAT_SUMMARY_MIN_MESSAGES: int = 6
+
+    # --- Bilgi Kartları ---
+    FLASHCARDS_PER_NODE: int = 5
+
+    # --- Kod Çalıştırma (Sandbox) ---
+    SANDBOX_WORKERS: int = 2
+    SANDBOX_CPU_SECONDS: int = 2
+    SANDBOX_MEMORY_MB: int = 256
+    SANDBOX_WALL_SECONDS: float = 5.0
+    # Referans çözümden üretilen test vektörü sayısı (bkz. services/test_vectors.py).
+    TEST_VECTORS_PER_CHALLENGE: int = 100
+
+    # --- Önerilen Challenge'lar ---
+    # Her istekte verilen challenge sayısı; havuzda yeterince görülmemiş challenge yoksa AI ile tamamlanır.
+    RECOMMENDED_CHALLENGES_COUNT: int = 3
+
+    # --- Profil ---
+    # Profil yanıtındaki her bölümün (roadmap'ler, mülakatlar, değerlendirmeler) ilk sayfa boyutu.
+    PROFILE_PAGE_SIZE: int = 20
+
+    # --- Kimlik Doğrulama ---
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 1024
+    # True ise kullanıcı id ve username token'a gömülür, istek başına kullanıcı sorgusu yapılmaz.
+    JWT_EMBED_USER_CLAIMS: bool = False
+
+    # --- Şifreleme ---
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # --- Arka Plan İş Kuyruğu ---
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 5.0
+    JOB_LEASE_SECONDS: int = 300
+    # Çalışan bir işin kirası bu aralıkla uzatılır; JOB_LEASE_SECONDS'tan küçük olmalı.
+    JOB_HEARTBEAT_SECONDS: int = 60
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    # Ayrı bir worker süreci (python -m app.worker) yoksa işleri API sürecinde işle.
+    RUN_EMBEDDED_JOB_WORKER: bool = False
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
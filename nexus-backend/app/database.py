@@ -7,9 +7,15 @@ database = client.nexus_db
 roadmap_collection = database.get_collection("roadmaps")
 user_collection = database.get_collection("users")
 challenge_collection = database.get_collection("challenges")
+challenge_vector_collection = database.get_collection("challenge_vectors")
+seen_challenge_collection = database.get_collection("seen_challenges")
 interview_collection = database.get_collection("interviews")
 flashcard_collection = database.get_collection("flashcards")
+flashcard_deck_collection = database.get_collection("flashcard_decks")
+flashcard_review_collection = database.get_collection("flashcard_reviews")
 assessment_collection = database.get_collection("assessments")
-
-async def create_indexes():
-    await user_collection.create_index("email", unique=True)
\ No newline at end of file
+llm_cache_collection = database.get_collection("llm_cache")
+chat_message_collection = database.get_collection("chat_messages")
+chat_summary_collection = database.get_collection("chat_summaries")
+job_collection = database.get_collection("jobs")
+catalog_meta_collection = database.get_collection("catalog_meta")
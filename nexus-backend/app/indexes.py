@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from .database import client, database
+
+# --- İNDEKS KAYDI ---
+# Her koleksiyonun indeksleri burada tanımlanır ve uygulama açılışında idempotent
+# olarak oluşturulur. Tanımlı olmayan ama veritabanında bulunan indeksler silinmez,
+# sadece loglanır.
+#
+# Not: Konumsal (nodes.$) güncellemeler her zaman _id ile filtrelendiği için
+# nodes.nodeId üzerinde ayrı bir multikey indekse gerek yoktur; _id indeksi yeterlidir.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "roadmaps": [
+        # Profil sayfalaması (en yeniden eskiye) ve ownerId ile tüm listelemeler.
+        IndexModel([("ownerId", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("type", ASCENDING)]),
+        IndexModel([("ownerId", ASCENDING), ("templateId", ASCENDING)]),
+    ],
+    "interviews": [
+        IndexModel([("ownerId", ASCENDING), ("status", ASCENDING), ("_id", DESCENDING)]),
+    ],
+    "assessments": [
+        IndexModel([("ownerId", ASCENDING), ("status", ASCENDING), ("_id", DESCENDING)]),
+    ],
+    "flashcards": [
+        IndexModel([("ownerId", ASCENDING), ("roadmapId", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("ownerId", ASCENDING), ("roadmapId", ASCENDING), ("nodeId", ASCENDING), ("_id", ASCENDING)]),
+        # Vadesi gelen kartlar kuyruğu.
+        IndexModel([("ownerId", ASCENDING), ("dueAt", ASCENDING)]),
+        IndexModel([("ownerId", ASCENDING), ("roadmapId", ASCENDING), ("dueAt", ASCENDING)]),
+    ],
+    "flashcard_reviews": [
+        IndexModel([("ownerId", ASCENDING), ("reviewedAt", DESCENDING)]),
+        IndexModel([("cardId", ASCENDING), ("reviewedAt", DESCENDING)]),
+    ],
+    "flashcard_decks": [
+        IndexModel([("ownerId", ASCENDING), ("roadmapId", ASCENDING), ("nodeId", ASCENDING)], unique=True),
+    ],
+    "llm_cache": [
+        IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "chat_messages": [
+        IndexModel([("roadmapId", ASCENDING), ("nodeId", ASCENDING), ("firstAt", DESCENDING)]),
+    ],
+    "chat_summaries": [
+        IndexModel([("roadmapId", ASCENDING), ("nodeId", ASCENDING)], unique=True),
+    ],
+    "challenges": [
+        # AI'ın ürettiği challenge'ların tekrarları parmak iziyle engellenir; seed challenge'larında alan yoktur.
+        IndexModel([("fingerprint", ASCENDING)], unique=True, partialFilterExpression={"fingerprint": {"$exists": True}}),
+        IndexModel([("source", ASCENDING), ("topics", ASCENDING), ("_id", DESCENDING)]),
+    ],
+    "seen_challenges": [
+        IndexModel([("userId", ASCENDING), ("challengeId", ASCENDING)], unique=True),
+    ],
+    "jobs": [
+        IndexModel([("status", ASCENDING), ("runAt", ASCENDING)]),
+        IndexModel([("idempotencyKey", ASCENDING)], unique=True),
+    ],
+}
+
+# Karşılaştırmada dikkate alınan indeks seçenekleri.
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+def _signature(spec: Dict[str, Any]) -> Tuple:
+    key = tuple((field, direction) for field, direction in spec["key"].items())
+    options = tuple((option, spec.get(option)) for option in _COMPARED_OPTIONS if spec.get(option) is not None)
+    return key, options
+
+async def ensure_indexes() -> None:
+    """Kayıttaki tüm indeksleri oluşturur ve tanım ile veritabanı arasındaki farkları loglar."""
+    for collection_name, models in INDEXES.items():
+        collection = database.get_collection(collection_name)
+        declared = {_signature(model.document): model.document["name"] for model in models}
+
+        existing = {}
+        async for index in collection.list_indexes():
+            if index["name"] != "_id_":
+                existing[_signature(index)] = index["name"]
+
+        missing = [name for signature, name in declared.items() if signature not in existing]
+        undeclared = [name for signature, name in existing.items() if signature not in declared]
+        if missing:
+            print(f"[indexes] {collection_name}: creating missing indexes {missing}")
+        if undeclared:
+            print(f"[indexes] {collection_name}: indexes not in registry {undeclared}")
+
+        # Aynı isimde farklı seçeneklerle bir indeks varsa create_indexes hata verir; açılışı durdurmak yerine logla.
+        try:
+            await collection.create_indexes(models)
+        except Exception as e:
+            print(f"[indexes] {collection_name}: could not apply declared indexes: {e}")
+
+
+# --- EXPLAIN ---
+# Router'ların çalıştırdığı sorguların temsili örnekleri. Değerler önemsizdir,
+# sorgu planlayıcısı sadece filtre/sıralama şekline bakar.
+_SAMPLE_ID = ObjectId()
+_SAMPLE_USER = str(ObjectId())
+
+EXPLAIN_QUERIES: List[Dict[str, Any]] = [
+    {"collection": "users", "filter": {"email": "user@example.com"}},
+    {"collection": "roadmaps", "filter": {"ownerId": _SAMPLE_USER}},
+    {"collection": "roadmaps", "filter": {"type": "suggested"}},
+    {"collection": "roadmaps", "filter": {"_id": _SAMPLE_ID, "ownerId": _SAMPLE_USER}},
+    {"collection": "roadmaps", "filter": {"ownerId": _SAMPLE_USER, "templateId": str(_SAMPLE_ID)}},
+    {"collection": "roadmaps", "filter": {"_id": _SAMPLE_ID, "type": "suggested"}},
+    {"collection": "roadmaps", "filter": {"_id": _SAMPLE_ID, "nodes": {"$elemMatch": {"nodeId": "1", "status": "not_started"}}}},
+    {"collection": "interviews", "filter": {"_id": _SAMPLE_ID, "ownerId": _SAMPLE_USER}},
+    {"collection": "roadmaps", "filter": {"ownerId": _SAMPLE_USER, "_id": {"$lt": _SAMPLE_ID}}, "sort": [("_id", DESCENDING)]},
+    {"collection": "interviews", "filter": {"ownerId": _SAMPLE_USER, "status": "completed", "_id": {"$lt": _SAMPLE_ID}}, "sort": [("_id", DESCENDING)]},
+    {"collection": "assessments", "filter": {"_id": _SAMPLE_ID, "ownerId": _SAMPLE_USER}},
+    {"collection": "assessments", "filter": {"ownerId": _SAMPLE_USER, "status": "completed", "_id": {"$lt": _SAMPLE_ID}}, "sort": [("_id", DESCENDING)]},
+    {"collection": "flashcards", "filter": {"ownerId": _SAMPLE_USER, "roadmapId": str(_SAMPLE_ID), "_id": {"$gt": _SAMPLE_ID}}, "sort": [("_id", ASCENDING)]},
+    {"collection": "flashcards", "filter": {"ownerId": _SAMPLE_USER, "roadmapId": str(_SAMPLE_ID), "nodeId": "1"}, "sort": [("_id", ASCENDING)]},
+    {"collection": "flashcards", "filter": {"ownerId": _SAMPLE_USER, "dueAt": {"$lte": datetime.utcnow()}}, "sort": [("dueAt", ASCENDING)]},
+    {"collection": "flashcards", "filter": {"ownerId": _SAMPLE_USER, "roadmapId": str(_SAMPLE_ID), "dueAt": {"$lte": datetime.utcnow()}}, "sort": [("dueAt", ASCENDING)]},
+    {"collection": "flashcard_decks", "filter": {"ownerId": _SAMPLE_USER, "roadmapId": str(_SAMPLE_ID), "status": "ready"}},
+    {"collection": "llm_cache", "filter": {"_id": "roadmap:sample"}},
+    {"collection": "chat_messages", "filter": {"roadmapId": str(_SAMPLE_ID), "nodeId": "1"}, "sort": [("firstAt", DESCENDING)]},
+    {"collection": "chat_summaries", "filter": {"roadmapId": str(_SAMPLE_ID), "nodeId": "1"}},
+    {"collection": "jobs", "filter": {"status": "queued", "runAt": {"$lte": datetime.utcnow()}}, "sort": [("runAt", ASCENDING)]},
+    {"collection": "jobs", "filter": {"idempotencyKey": "interview-submit:sample"}},
+    {"collection": "catalog_meta", "filter": {"_id": "catalog"}},
+    {"collection": "challenge_vectors", "filter": {"_id": str(_SAMPLE_ID), "referenceHash": "sample"}},
+    # Challenge kataloğu küçük ve tamamı listelenir (sürüm değiştiğinde bir kez); tam tarama beklenen davranıştır.
+    {"collection": "challenges", "filter": {"source": {"$ne": "generated"}}, "allow_collscan": True},
+    {"collection": "challenges", "filter": {"fingerprint": "sample"}},
+    {"collection": "challenges", "filter": {"source": "generated", "topics": {"$in": ["python"]}}, "sort": [("_id", DESCENDING)]},
+    {"collection": "seen_challenges", "filter": {"userId": _SAMPLE_USER, "challengeId": {"$in": [_SAMPLE_ID]}}},
+]
+
+def _winning_plans(explain: Any) -> Iterator[Dict]:
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            elif key != "rejectedPlans":
+                yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from _winning_plans(item)
+
+def _stages(plan: Any) -> Iterator[str]:
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+async def explain_queries() -> int:
+    """Her temsili sorgu için explain() çalıştırır ve tam koleksiyon taramalarını raporlar."""
+    collscans = 0
+    for query in EXPLAIN_QUERIES:
+        cursor = database.get_collection(query["collection"]).find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        explain = await cursor.explain()
+        stages = {stage for plan in _winning_plans(explain) for stage in _stages(plan)}
+
+        is_collscan = "COLLSCAN" in stages
+        if is_collscan and not query.get("allow_collscan"):
+            collscans += 1
+            status = "COLLSCAN"
+        else:
+            status = "ok"
+        print(f"[{status:8}] {query['collection']}: {query['filter']} -> {sorted(stages)}")
+
+    print(f"{len(EXPLAIN_QUERIES)} queries explained, {collscans} unexpected collection scans.")
+    return collscans
+
+async def _main(explain: bool) -> int:
+    await ensure_indexes()
+    result = await explain_queries() if explain else 0
+    client.close()
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the declared MongoDB indexes.")
+    parser.add_argument("--explain", action="store_true", help="run explain() on every router query and flag collection scans")
+    args = parser.parse_args()
+    raise SystemExit(1 if asyncio.run(_main(args.explain)) else 0)
@@ -1,7 +1,12 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import create_indexes
-from .routers import roadmaps, challenges, interviews, flashcards, assessments
+from .indexes import ensure_indexes
+from . import cache, catalog_cache
+from .config import settings
+from .routers import roadmaps, challenges, interviews, flashcards, assessments, jobs
+from .services import job_queue, sandbox
+from .services import evaluation_jobs  # noqa: F401  (iş işleyicilerini kaydeder)
 from . import security # security.py'yi import ediyoruz
 
 app = FastAPI(title="Nexus AI Learning Backend")
@@ -25,11 +30,27 @@ app.include_router(challenges.router)
 app.include_router(interviews.router)
 app.include_router(flashcards.router)
 app.include_router(assessments.router)
+app.include_router(jobs.router)
+
+_worker_stop = asyncio.Event()
 
 @app.on_event("startup")
 async def startup_db_client():
-    await create_indexes()
+    await ensure_indexes()
+    await sandbox.pool.start()
+    if settings.RUN_EMBEDDED_JOB_WORKER:
+        asyncio.create_task(job_queue.run_workers(_worker_stop))
+
+@app.on_event("shutdown")
+async def stop_embedded_worker():
+    _worker_stop.set()
+    await sandbox.pool.close()
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the Nexus Backend!"}
\ No newline at end of file
+    return {"message": "Welcome to the Nexus Backend!"}
+
+@app.get("/api/metrics/cache")
+def read_cache_metrics():
+    """LLM yanıt önbelleği ve katalog önbelleği sayaçları."""
+    return {"llm_responses": cache.get_stats(), "catalog": catalog_cache.get_stats()}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, BeforeValidator
-from typing import List, Optional, Annotated
+from typing import Any, Dict, List, Optional, Annotated
 from bson import ObjectId
 from datetime import datetime
 
@@ -58,13 +58,33 @@ class Roadmap(BaseModel):
     type: str
     ownerId: Optional[str] = None
     progress: int = 0
+    completedCount: int = 0
+    nodeCount: int = 0
     nodes: List[RoadmapNode]
     templateId: Optional[str] = None
+    # Graf alanları (bkz. services/roadmap_graph.py): topolojik sıra, node derinlikleri ve şu an açık node'lar.
+    topoOrder: List[str] = []
+    levels: Dict[str, int] = {}
+    availableNodes: List[str] = []
     class Config:
         populate_by_name = True
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str, datetime: lambda dt: dt.isoformat()}
 
+class RoadmapSummary(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    title: str
+    prompt: Optional[str] = None
+    type: str
+    templateId: Optional[str] = None
+    progress: int = 0
+    completedCount: int = 0
+    nodeCount: int = 0
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
 class GenerateRoadmapRequest(BaseModel):
     prompt: str
 
@@ -79,14 +99,67 @@ class CodeChallenge(BaseModel):
     difficulty: str
     category: str
     template_code: str
-    solution_code: str
+    solution_code: Optional[str] = None # AI'ın ürettiği challenge'larda referans çözüm yoktur
     class Config:
         populate_by_name = True
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
 
+class RunRequest(BaseModel):
+    code: str = Field(max_length=20_000)
+
+class TestResult(BaseModel):
+    index: int
+    status: str # passed, failed, error, timeout, skipped
+    time_ms: Optional[float] = None
+    error: Optional[str] = None
+
+class VectorMismatch(BaseModel):
+    index: int
+    args: List[Any]
+    expected: Any = None
+    actual: Any = None
+    error: Optional[str] = None # Fonksiyon bu girdide hata verdiyse
+
+class VectorReport(BaseModel):
+    """Referans çözümden üretilen vektörlerle karşılaştırma; ilk uyuşmazlıkta durur."""
+    total: int
+    checked: int
+    completed: bool
+    mismatch: Optional[VectorMismatch] = None
+
+class SweepPoint(BaseModel):
+    size: int
+    time_ms: float
+    peak_kb: float
+
+class ComplexityEstimate(BaseModel):
+    time: str # O(1), O(log n), O(n), O(n log n), O(n^2), O(n^3)
+    time_exponent: float # log-log eğimi
+    space: Optional[str] = None
+
+class ProfileReport(BaseModel):
+    """Boyut taramasından tahmin edilen karmaşıklık ve referans çözümle karşılaştırma."""
+    points: List[SweepPoint]
+    estimate: Optional[ComplexityEstimate] = None # Yeterli ölçüm yoksa None
+    reference: Optional[ComplexityEstimate] = None
+    reference_points: List[SweepPoint] = []
+    verdict: Optional[str] = None # same, slower, faster
+    slowdown: Optional[float] = None # Ortak en büyük boyutta referansa göre süre oranı
+    error: Optional[str] = None
+
+class RunResult(BaseModel):
+    status: str # passed, failed, error (kod çalıştırılamadı), timeout
+    passed: int
+    total: int
+    tests: List[TestResult] # Gizli testlerin girdileri ve beklenen çıktıları döndürülmez
+    vectors: Optional[VectorReport] = None
+    profile: Optional[ProfileReport] = None
+    error: Optional[str] = None
+    time_ms: float
+
 class HintRequest(BaseModel):
-    user_code: str
+    user_code: str = Field(max_length=20_000)
 
 class HintResponse(BaseModel):
     hint: str
@@ -98,14 +171,22 @@ class InterviewQuestion(BaseModel):
     user_answer: Optional[str] = None
     template_code: Optional[str] = None 
 
+class ItemGrade(BaseModel):
+    kind: str # "knowledge", "project" veya mülakat sorusunun türü
+    question: str
+    score: int # 0-10
+    feedback: str = ""
+
 class InterviewSession(BaseModel):
     id: PyObjectId = Field(default_factory=ObjectId, alias="_id")
     ownerId: str
     topic: str
     questions: List[InterviewQuestion]
+    questions_pending: bool = False # Kalan sorular arka planda üretilirken True
     status: str = "in_progress"
     feedback: Optional[str] = None
     score: Optional[int] = None
+    item_grades: List[ItemGrade] = []
     started_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = None
     class Config:
@@ -131,6 +212,47 @@ class FlashcardDeck(BaseModel):
 class GenerateFlashcardsRequest(BaseModel):
     roadmapId: str
 
+class StoredFlashcard(Flashcard):
+    id: PyObjectId = Field(alias="_id")
+    nodeId: str
+    nodeTitle: str
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+class FlashcardSchedule(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    dueAt: datetime
+    interval: float # gün
+    ease: float
+    reps: int
+    lapses: int
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str, datetime: lambda dt: dt.isoformat()}
+
+class DueFlashcard(StoredFlashcard):
+    dueAt: datetime
+    reps: int = 0
+
+class FlashcardReview(BaseModel):
+    card_id: str
+    grade: int = Field(ge=0, le=5) # 0: hiç hatırlanmadı, 5: kusursuz
+
+class SubmitReviewsRequest(BaseModel):
+    reviews: List[FlashcardReview] = Field(min_length=1, max_length=500)
+
+class SubmitReviewsResponse(BaseModel):
+    updated: List[FlashcardSchedule]
+    conflicts: List[str] = [] # Eşzamanlı başka bir oturumda değiştiği için uygulanmayan kart id'leri
+
+class FlashcardPage(BaseModel):
+    roadmapId: str
+    cards: List[StoredFlashcard]
+    next_cursor: Optional[str] = None # Sonraki sayfa için `after` parametresine verilecek id
+
 # --- Assessment Models ---
 class AssessmentQuestion(BaseModel):
     question_type: str
@@ -151,6 +273,8 @@ class AssessmentSession(BaseModel):
     project_tasks: List[AssessmentProject]
     status: str = "in_progress"
     final_report: Optional[str] = None # Değerlendirme raporunu saklamak için
+    score: Optional[int] = None # 100 üzerinden, soru bazlı notlardan hesaplanır
+    item_grades: List[ItemGrade] = []
     completed_at: Optional[datetime] = None # Tamamlanma zamanını saklamak için
     class Config:
         populate_by_name = True
@@ -158,4 +282,82 @@ class AssessmentSession(BaseModel):
         json_encoders = {ObjectId: str, datetime: lambda dt: dt.isoformat()}
 
 class StartAssessmentRequest(BaseModel):
-    topic: str
\ No newline at end of file
+    topic: str
+
+# --- Profile Models ---
+class SessionSummary(BaseModel):
+    """Profil listelerinde mülakat/değerlendirme özeti; rapor metni /report ucundan ayrıca çekilir."""
+    id: PyObjectId = Field(alias="_id")
+    topic: str
+    score: Optional[int] = None
+    completed_at: Optional[datetime] = None
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str, datetime: lambda dt: dt.isoformat()}
+
+class SessionReport(SessionSummary):
+    report: Optional[str] = None
+    item_grades: List[ItemGrade] = []
+
+class RoadmapSummaryPage(BaseModel):
+    items: List[RoadmapSummary]
+    next_cursor: Optional[str] = None # Sonraki sayfa için `after` parametresine verilecek id
+
+class SessionSummaryPage(BaseModel):
+    items: List[SessionSummary]
+    next_cursor: Optional[str] = None
+
+# --- Job Models ---
+class Job(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    kind: str
+    status: str # queued, running, succeeded, failed
+    attempts: int = 0
+    error: Optional[str] = None
+    result: Optional[dict] = None
+    created_at: datetime
+    updated_at: datetime
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str, datetime: lambda dt: dt.isoformat()}
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+# --- LLM Output Models ---
+# LLM yanıtları bu şemalara göre doğrulanır (bkz. services/llm_json.py).
+LooseStr = Annotated[
+    str,
+    BeforeValidator(lambda v: str(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v),
+]
+
+class GeneratedRoadmapNode(BaseModel):
+    nodeId: LooseStr
+    title: str
+    content: str
+    dependencies: List[LooseStr] = []
+
+class GeneratedRoadmap(BaseModel):
+    title: str
+    nodes: List[GeneratedRoadmapNode]
+
+class GeneratedChallenge(BaseModel):
+    title: str
+    description: str
+    difficulty: str
+    category: str
+    template_code: str
+
+class GeneratedInterviewQuestion(BaseModel):
+    question_text: str
+    template_code: Optional[str] = None
+
+class GeneratedAssessment(BaseModel):
+    knowledge_questions: List[AssessmentQuestion]
+    project_tasks: List[AssessmentProject]
+
+class GeneratedGrade(BaseModel):
+    score: int
+    feedback: str = ""
@@ -3,4 +3,5 @@ from . import auth
 from . import challenges
 from . import interviews
 from . import flashcards
-from . import assessments
\ No newline at end of file
+from . import assessments
+from . import jobs
\ No newline at end of file
@@ -1,13 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, status
 from typing import List, Dict
 from bson import ObjectId
-from datetime import datetime
 from pydantic import BaseModel
 
 from ..database import assessment_collection
-from ..models import AssessmentSession, StartAssessmentRequest, User
+from ..models import AssessmentSession, SessionReport, StartAssessmentRequest, User, JobAccepted
 from ..security import get_current_user
-from ..services import assessment_service
+from ..services import assessment_service, job_queue, evaluation_jobs
 
 router = APIRouter(
     prefix="/api/assessments",
@@ -19,9 +18,9 @@ class SubmitAssessmentRequest(BaseModel):
     project_codes: List[str]
 
 @router.post("/start", response_model=AssessmentSession)
-async def start_assessment_session(request: StartAssessmentRequest, current_user: User = Depends(get_current_user)):
+async def start_assessment_session(request: StartAssessmentRequest, use_cache: bool = True, refresh: bool = False, current_user: User = Depends(get_current_user)):
     try:
-        session_data = await assessment_service.generate_assessment_session(request.topic)
+        session_data = await assessment_service.generate_assessment_session(request.topic, use_cache=use_cache, refresh=refresh)
         new_session = AssessmentSession(
             ownerId=str(current_user.id),
             topic=request.topic,
@@ -46,31 +45,56 @@ async def get_assessment_session(session_id: str, current_user: User = Depends(g
         raise HTTPException(status_code=404, detail="Assessment session not found or access denied.")
     return AssessmentSession.model_validate(session)
 
-@router.post("/{session_id}/submit")
+@router.get("/{session_id}/report", response_model=SessionReport)
+async def get_assessment_report(session_id: str, current_user: User = Depends(get_current_user)):
+    """Profil listesinde yer almayan rapor metnini ve soru bazlı notları döndürür."""
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=400, detail="Invalid session ID.")
+    session = await assessment_collection.find_one(
+        {"_id": ObjectId(session_id), "ownerId": str(current_user.id)},
+        {"topic": 1, "score": 1, "completed_at": 1, "final_report": 1, "item_grades": 1},
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Assessment session not found or access denied.")
+    session["report"] = session.pop("final_report", None)
+    return SessionReport.model_validate(session)
+
+@router.post("/{session_id}/submit", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
 async def submit_assessment(
     session_id: str,
     request: SubmitAssessmentRequest,
     current_user: User = Depends(get_current_user)
 ):
+    """Persists the submission and enqueues the evaluation; poll /api/jobs/{job_id} for the result."""
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=400, detail="Invalid session ID format.")
     session = await assessment_collection.find_one({"_id": ObjectId(session_id), "ownerId": str(current_user.id)})
     if not session:
         raise HTTPException(status_code=404, detail="Assessment session not found.")
-    
-    # AI'dan final raporu al
-    final_report = await assessment_service.evaluate_assessment_submission(
-        topic=session["topic"],
-        questions=request.knowledge_answers,
-        project_codes=request.project_codes # project_codes'u gönder
-    )
-    
-    # Oturumu güncelle
+    if session.get("status") == "completed":
+        raise HTTPException(status_code=400, detail="This assessment has already been completed.")
+
+    # Gönderim sadece ilk seferde yazılır; değerlendirme sürerken gelen tekrar gönderimler mevcut işi alır.
+    # Değerlendirme kalıcı olarak başarısız olduysa gönderim yenilenebilir; değişmeyen
+    # cevapların notları oturumdaki grade_cache üzerinden yeniden kullanılır.
+    idempotency_key = f"assessment-submit:{session_id}"
+    previous_job = await job_queue.find_by_idempotency_key(idempotency_key)
+    writable_statuses = ["in_progress"]
+    if previous_job and previous_job["status"] == "failed":
+        writable_statuses.append("evaluating")
     await assessment_collection.update_one(
-        {"_id": ObjectId(session_id)},
+        {"_id": ObjectId(session_id), "status": {"$in": writable_statuses}},
         {"$set": {
-            "status": "completed",
-            "final_report": final_report,
-            "completed_at": datetime.utcnow()
+            "status": "evaluating",
+            "submitted_knowledge_answers": request.knowledge_answers,
+            "submitted_project_codes": request.project_codes
         }}
     )
-    
-    return {"message": "Assessment submitted successfully."}
\ No newline at end of file
+    job = await job_queue.enqueue(
+        evaluation_jobs.ASSESSMENT_EVALUATION,
+        {"session_id": session_id, "username": current_user.username},
+        # Oturum başına tek değerlendirme işi: çift gönderimler aynı işi döndürür.
+        idempotency_key=idempotency_key,
+        owner_id=str(current_user.id),
+    )
+    return JobAccepted(job_id=str(job["_id"]), status=job["status"])
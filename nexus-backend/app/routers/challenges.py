@@ -1,28 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import traceback
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import List
 from bson import ObjectId
 
 from ..database import challenge_collection, roadmap_collection
-from ..models import CodeChallenge, UserChatMessage, ChatMessage, HintRequest, HintResponse, User
+from ..models import CodeChallenge, UserChatMessage, ChatMessage, HintRequest, HintResponse, RunRequest, RunResult, User
 from ..security import get_current_user
-from ..services import challenge_service, chat_service
+from ..services import challenge_pool, challenge_service, chat_service, profiling, roadmap_templates, sandbox, test_vectors
+from .. import catalog_cache, sse
 
 router = APIRouter(
     prefix="/api/challenges",
     tags=["Challenges"]
 )
 
+@catalog_cache.register("challenges")
+async def _load_challenges() -> bytes:
+    # Gizli testler ve AI'ın kullanıcılar için ürettiği challenge'lar katalogda yer almaz.
+    challenges = await challenge_collection.find(
+        {"source": {"$ne": challenge_pool.GENERATED_SOURCE}}, {"tests": 0}
+    ).to_list(100)
+    return catalog_cache.serialize(List[CodeChallenge], challenges)
+
 @router.get("/", response_model=List[CodeChallenge])
-async def get_all_challenges():
-    challenges = await challenge_collection.find().to_list(100)
-    return [CodeChallenge.model_validate(c) for c in challenges]
+async def get_all_challenges(request: Request):
+    """Served from the in-process catalog cache; supports If-None-Match."""
+    return await catalog_cache.respond("challenges", request)
 
 @router.post("/generate-recommended", response_model=List[CodeChallenge])
 async def generate_recommended_challenges(current_user: User = Depends(get_current_user)):
     """
-    Generates personalized challenges based on the user's completed roadmap nodes.
+    Recommends challenges based on the user's completed roadmap nodes. Stored challenges the
+    user has not seen yet are served first; new ones are generated only to top up the list.
     """
     user_roadmaps = await roadmap_collection.find({"ownerId": str(current_user.id)}).to_list(100)
+    user_roadmaps = await roadmap_templates.materialize_many(user_roadmaps)
     completed_topics = {
         node["title"]
         for roadmap in user_roadmaps
@@ -36,52 +50,60 @@ async def generate_recommended_challenges(current_user: User = Depends(get_curre
             detail="Complete some roadmap nodes first to get personalized challenges!"
         )
 
-    topics_str = ", ".join(list(completed_topics)[:5])
     try:
-        generated_data = await challenge_service.generate_challenges_from_topics(topics_str)
-        
-        # --- KESİN ÇÖZÜM: YANITI MANUEL OLARAK HAZIRLAMA ---
-        response_list = []
-        for data in generated_data:
-            # AI'dan gelen veriye eksik alanı ekle
-            data["solution_code"] = "# Solution is not provided for AI-generated challenges."
-            
-            # Pydantic ile doğrula, bu işlem ona bir ObjectId atayacak
-            validated_challenge_model = CodeChallenge.model_validate(data)
-            
-            # Pydantic modelini JSON'a uygun bir dictionary'e dönüştür.
-            # model_dump(), ObjectId'yi string'e çevirir.
-            challenge_dict = validated_challenge_model.model_dump(by_alias=True)
-            
-            # Frontend'in 'id' alanını bulabilmesi için garantile
-            challenge_dict['id'] = str(challenge_dict['_id'])
-            
-            response_list.append(challenge_dict)
-        
-        # Artık serileştirmeye hazır, temiz bir dictionary listesi döndürüyoruz
-        return response_list
-        # ----------------------------------------------------
-
+        return await challenge_pool.recommend(str(current_user.id), completed_topics)
     except HTTPException as e:
         raise e
     except Exception as e:
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="An error occurred while generating challenges.")
 
 @router.post("/{challenge_id}/hint", response_model=HintResponse)
-async def get_challenge_hint(challenge_id: str, request: HintRequest):
+async def get_challenge_hint(challenge_id: str, request: HintRequest, current_user: User = Depends(get_current_user)):
+    """
+    Hints are cached per challenge and normalized code structure (see services/code_hash.py),
+    so repeated templates and structurally identical attempts are answered from the cache.
+    """
     if not ObjectId.is_valid(challenge_id):
         raise HTTPException(status_code=400, detail="Invalid challenge ID format.")
-    challenge = await challenge_collection.find_one({"_id": ObjectId(challenge_id)})
+    challenge = await challenge_collection.find_one({"_id": ObjectId(challenge_id)}, {"description": 1})
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found.")
     hint_text = await challenge_service.get_hint_for_challenge(
+        challenge_id=challenge_id,
         challenge_description=challenge['description'],
         user_code=request.user_code
     )
     return HintResponse(hint=hint_text)
 
+@router.post("/{challenge_id}/run", response_model=RunResult)
+async def run_challenge_code(challenge_id: str, request: RunRequest, profile: bool = False, current_user: User = Depends(get_current_user)):
+    """
+    Runs the submitted code against the challenge's hidden tests in the local sandbox, then
+    against vectors generated from the reference solution (first mismatch is reported).
+    With `profile=true` the function is also timed over growing input sizes and its
+    estimated complexity is compared with the reference solution's.
+    """
+    if not ObjectId.is_valid(challenge_id):
+        raise HTTPException(status_code=400, detail="Invalid challenge ID format.")
+    challenge = await challenge_collection.find_one({"_id": ObjectId(challenge_id)}, test_vectors.CHALLENGE_PROJECTION)
+    if not challenge:
+        raise HTTPException(status_code=404, detail="Challenge not found.")
+    if not challenge.get("tests") or not challenge.get("entrypoint"):
+        raise HTTPException(status_code=409, detail="This challenge has no tests to run.")
+    vectors = await test_vectors.get_vectors(challenge)
+    run = sandbox.run_tests(
+        request.code, challenge["entrypoint"], challenge["tests"],
+        compare=challenge.get("compare", "exact"), vectors=vectors,
+        sweep=profiling.sweep_job(challenge) if profile else None,
+    )
+    if not profile:
+        return await run
+    # Referans taraması önbellekte yoksa kullanıcının koduyla aynı anda ölçülür.
+    result, reference = await asyncio.gather(run, profiling.reference_sweep(challenge, profiling.sweep_job(challenge)))
+    result["profile"] = profiling.build_report(result.pop("sweep"), reference)
+    return result
+
 @router.post("/{challenge_id}/chat", response_model=ChatMessage)
 async def post_challenge_chat_message(challenge_id: str, message: UserChatMessage, current_user: User = Depends(get_current_user)):
     if not ObjectId.is_valid(challenge_id):
@@ -97,22 +119,32 @@ async def post_challenge_chat_message(challenge_id: str, message: UserChatMessag
     ai_message = ChatMessage(sender="ai", text=ai_response_text)
     return ai_message
 
-@router.post("/{challenge_id}/hint", response_model=HintResponse)
-async def get_challenge_hint(challenge_id: str, request: HintRequest, current_user: User = Depends(get_current_user)):
-    # ID'nin geçerli olup olmadığını kontrol et
+@router.post("/{challenge_id}/chat/stream")
+async def stream_challenge_chat_message(challenge_id: str, message: UserChatMessage, current_user: User = Depends(get_current_user)):
+    """
+    Streams the AI reply for a challenge question as Server-Sent Events.
+    """
     if not ObjectId.is_valid(challenge_id):
-        raise HTTPException(status_code=400, detail="Invalid challenge ID format.")
-        
-    # İlgili challenge'ı veritabanından bul
+        raise HTTPException(status_code=400, detail=f"Invalid challenge ID: {challenge_id}")
     challenge = await challenge_collection.find_one({"_id": ObjectId(challenge_id)})
     if not challenge:
-        # Eğer suggested challenge'lar arasında yoksa, belki AI tarafından üretilmiş ve DB'de olmayan bir challenge'dır.
-        # Bu senaryo şimdilik kapsam dışı, bu yüzden 404 dönüyoruz.
         raise HTTPException(status_code=404, detail="Challenge not found.")
 
-    # AI servisinden ipucu al
-    hint_text = await challenge_service.get_hint_for_challenge(
-        challenge_description=challenge['description'],
-        user_code=request.user_code
-    )
-    return HintResponse(hint=hint_text)
\ No newline at end of file
+    async def events():
+        chunks = []
+        try:
+            async for text in chat_service.stream_ai_challenge_response(
+                challenge_title=challenge["title"],
+                challenge_description=challenge["description"],
+                user_question=message.text
+            ):
+                chunks.append(text)
+                yield sse.format_event({"text": text})
+        except Exception:
+            traceback.print_exc()
+            yield sse.format_event({"detail": "AI assistant is currently unavailable for challenges."}, event="error")
+            return
+        ai_message = ChatMessage(sender="ai", text="".join(chunks).strip())
+        yield sse.format_event(ai_message.model_dump(mode="json"), event="done")
+
+    return sse.event_stream_response(events())
@@ -1,28 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List, Optional
 from bson import ObjectId
 
 from ..database import roadmap_collection
-from ..models import FlashcardDeck, GenerateFlashcardsRequest, User
+from ..models import (
+    DueFlashcard, FlashcardDeck, FlashcardPage, GenerateFlashcardsRequest,
+    SubmitReviewsRequest, SubmitReviewsResponse, User,
+)
 from ..security import get_current_user
-from ..services import flashcard_service
+from ..services import flashcard_service, review_service, roadmap_templates
 
 router = APIRouter(
     prefix="/api/flash-cards",
     tags=["Flashcards"]
 )
 
-@router.post("/generate", response_model=FlashcardDeck)
-async def generate_flashcard_deck(
-    request: GenerateFlashcardsRequest,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Generates a flashcard deck for a given roadmap based on completed nodes.
-    """
-    if not ObjectId.is_valid(request.roadmapId):
+async def _get_accessible_roadmap(roadmap_id: str, current_user: User) -> Dict:
+    if not ObjectId.is_valid(roadmap_id):
         raise HTTPException(status_code=400, detail="Invalid roadmap ID format.")
 
-    roadmap = await roadmap_collection.find_one({"_id": ObjectId(request.roadmapId)})
+    roadmap = await roadmap_collection.find_one(
+        {"_id": ObjectId(roadmap_id)},
+        {"title": 1, "type": 1, "ownerId": 1, "templateId": 1, "nodeStates": 1,
+         "nodes.nodeId": 1, "nodes.title": 1, "nodes.content": 1, "nodes.status": 1}
+    )
     
     if not roadmap:
         raise HTTPException(status_code=404, detail="Roadmap not found.")
@@ -30,32 +31,77 @@ async def generate_flashcard_deck(
     # Roadmap kullanıcı tarafından oluşturulmuşsa, sahibinin o olduğundan emin ol.
     if roadmap.get("type") == "user_generated" and roadmap.get("ownerId") != str(current_user.id):
         raise HTTPException(status_code=403, detail="You are not authorized to access this roadmap.")
+    return await roadmap_templates.materialize(roadmap)
 
-    completed_nodes_titles = [
-        node.get("title")
-        for node in roadmap.get("nodes", [])
-        if node.get("status") == "completed" and node.get("title")
-    ]
+@router.post("/generate", response_model=FlashcardDeck)
+async def generate_flashcard_deck(
+    request: GenerateFlashcardsRequest,
+    use_cache: bool = True,
+    refresh: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns the stored flashcard deck of a roadmap, generating cards only for nodes completed since the last call.
+    `refresh` regenerates the cards of every completed node.
+    """
+    roadmap = await _get_accessible_roadmap(request.roadmapId, current_user)
 
-    if not completed_nodes_titles:
+    if not any(node.get("status") == "completed" for node in roadmap.get("nodes", [])):
         raise HTTPException(
             status_code=400,
             detail="You need to complete at least one topic in this expedition to generate flashcards."
         )
 
     try:
-        cards_data = await flashcard_service.generate_flashcards_for_topic(
-            topic=roadmap["title"],
-            completed_nodes=completed_nodes_titles
-        )
-        if not cards_data:
+        await flashcard_service.sync_deck(str(current_user.id), roadmap, use_cache=use_cache, refresh=refresh)
+        cards = await flashcard_service.get_cards(str(current_user.id), request.roadmapId)
+        if not cards:
              raise HTTPException(status_code=500, detail="AI could not generate flashcards for this topic.")
         
         return FlashcardDeck(
             topic=roadmap["title"],
-            cards=cards_data
+            cards=cards
         )
     except HTTPException as e:
         raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail="An unexpected error occurred while generating flashcards.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="An unexpected error occurred while generating flashcards.")
+
+@router.get("/due", response_model=List[DueFlashcard])
+async def get_due_flashcards(
+    roadmap_id: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    current_user: User = Depends(get_current_user)
+):
+    """Returns the cards that are due for review now, most overdue first."""
+    return await review_service.get_due_cards(str(current_user.id), limit, roadmap_id=roadmap_id)
+
+@router.post("/reviews", response_model=SubmitReviewsResponse)
+async def submit_flashcard_reviews(request: SubmitReviewsRequest, current_user: User = Depends(get_current_user)):
+    """
+    Applies a whole review session at once and returns the new schedule of every reviewed card.
+    Unknown card ids are ignored. Cards changed by a concurrent session are left untouched
+    and listed in `conflicts` so the client can re-fetch and review them again.
+    """
+    reviews = [review.model_dump() for review in request.reviews]
+    return await review_service.submit_reviews(str(current_user.id), reviews)
+
+@router.get("/{roadmap_id}", response_model=FlashcardPage)
+async def get_flashcard_page(
+    roadmap_id: str,
+    node_id: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Pages through the stored cards of a roadmap (optionally a single node) without calling the AI.
+    Pass the returned `next_cursor` as `after` to get the next page.
+    """
+    await _get_accessible_roadmap(roadmap_id, current_user)
+    if after is not None and not ObjectId.is_valid(after):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    cards = await flashcard_service.get_cards(str(current_user.id), roadmap_id, node_id=node_id, after=after, limit=limit + 1)
+    next_cursor = str(cards[limit - 1]["_id"]) if len(cards) > limit else None
+    return FlashcardPage(roadmapId=roadmap_id, cards=cards[:limit], next_cursor=next_cursor)
@@ -1,35 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from typing import Dict, List
 from bson import ObjectId
-from datetime import datetime
 
 from ..database import interview_collection
-from ..models import InterviewSession, StartInterviewRequest, SubmitInterviewRequest, User, InterviewQuestion
+from ..models import InterviewSession, SessionReport, StartInterviewRequest, SubmitInterviewRequest, User, InterviewQuestion, JobAccepted
 from ..security import get_current_user
-from ..services import interview_service
-
-import re
+from ..services import interview_service, job_queue, evaluation_jobs
 
 router = APIRouter(
     prefix="/api/interviews",
     tags=["Interviews"]
 )
 
+async def _fill_remaining_questions(session_id: ObjectId, topic: str, questions_data: List[Dict], tasks: List[asyncio.Task], use_cache: bool):
+    """
+    Oturum döndükten sonra kalan soru bantlarını tamamlandıkça oturuma ekler.
+    Oturum gönderildiyse durur; istemci questions_pending False olana kadar oturumu yoklar.
+    """
+    try:
+        async for batch in interview_service.collect_remaining_questions(topic, questions_data, tasks, use_cache=use_cache):
+            new_questions = [InterviewQuestion.model_validate(q).model_dump() for q in batch]
+            # Gönderilmiş oturumlara soru eklenmez; cevaplar ve değerlendirme mevcut soru setine göredir.
+            result = await interview_collection.update_one(
+                {"_id": session_id, "status": "in_progress"},
+                {"$push": {"questions": {"$each": new_questions}}}
+            )
+            if result.matched_count == 0:
+                break
+    finally:
+        await interview_collection.update_one({"_id": session_id}, {"$set": {"questions_pending": False}})
+
 @router.post("/start", response_model=InterviewSession)
-async def start_interview_session(request: StartInterviewRequest, current_user: User = Depends(get_current_user)):
+async def start_interview_session(request: StartInterviewRequest, background_tasks: BackgroundTasks, use_cache: bool = True, refresh: bool = False, current_user: User = Depends(get_current_user)):
     try:
-        questions_data = await interview_service.generate_interview_questions(request.topic)
+        questions_data, tasks = await interview_service.start_interview_questions(request.topic, use_cache=use_cache, refresh=refresh)
         questions = [InterviewQuestion.model_validate(q) for q in questions_data]
         new_session = InterviewSession(
             ownerId=str(current_user.id),
             topic=request.topic,
             questions=questions,
+            questions_pending=any(not t.done() for t in tasks),
         )
         db_session = new_session.model_dump(by_alias=True, exclude=["id"])
         result = await interview_collection.insert_one(db_session)
         created_session_doc = await interview_collection.find_one({"_id": result.inserted_id})
         if not created_session_doc:
             raise HTTPException(status_code=500, detail="Failed to retrieve created session.")
+        if tasks:
+            background_tasks.add_task(_fill_remaining_questions, result.inserted_id, request.topic, questions_data, tasks, use_cache)
         return InterviewSession.model_validate(created_session_doc)
     except Exception as e:
         import traceback
@@ -45,13 +64,27 @@ async def get_interview_session(session_id: str, current_user: User = Depends(ge
         raise HTTPException(status_code=404, detail="Interview session not found.")
     return InterviewSession.model_validate(session)
 
-@router.post("/{session_id}/submit")
+@router.get("/{session_id}/report", response_model=SessionReport)
+async def get_interview_report(session_id: str, current_user: User = Depends(get_current_user)):
+    """Profil listesinde yer almayan rapor metnini ve soru bazlı notları döndürür."""
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=400, detail="Invalid session ID.")
+    session = await interview_collection.find_one(
+        {"_id": ObjectId(session_id), "ownerId": str(current_user.id)},
+        {"topic": 1, "score": 1, "completed_at": 1, "feedback": 1, "item_grades": 1},
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Interview session not found.")
+    session["report"] = session.pop("feedback", None)
+    return SessionReport.model_validate(session)
+
+@router.post("/{session_id}/submit", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
 async def submit_interview_answers(
     session_id: str,
     request: SubmitInterviewRequest,
     current_user: User = Depends(get_current_user)
 ):
-    """Submits user answers for evaluation and parses key metrics."""
+    """Persists the answers and enqueues the evaluation; poll /api/jobs/{job_id} for the result."""
     if not ObjectId.is_valid(session_id):
         raise HTTPException(status_code=400, detail="Invalid session ID.")
 
@@ -64,34 +97,23 @@ async def submit_interview_answers(
     if session.get("status") == "completed":
         raise HTTPException(status_code=400, detail="This interview has already been completed.")
 
-    # AI'dan değerlendirme raporunu al
-    feedback_report = await interview_service.evaluate_interview_submission(
-        topic=session["topic"],
-        answers=request.answers
-    )
-
-    # --- YENİ EKLENEN KISIM: RAPORDAN METRİKLERİ ÇEKME ---
-    score = None
-    try:
-        # "Final Score: 85/100" veya "Final Puanı: 85" gibi formatları arar
-        score_match = re.search(r"(?:Score|Puanı?):\s*(\d{1,3})", feedback_report, re.IGNORECASE)
-        if score_match:
-            score = int(score_match.group(1))
-    except (ValueError, IndexError):
-        score = None # Hata olursa skoru boş bırak
-    # ---------------------------------------------------
-        
-    # Veritabanındaki oturumu güncelle
+    # Cevaplar sadece ilk gönderimde yazılır; değerlendirme sürerken gelen tekrar gönderimler mevcut işi alır.
+    # Değerlendirme kalıcı olarak başarısız olduysa cevaplar yeniden gönderilebilir; değişmeyen
+    # cevapların notları oturumdaki grade_cache üzerinden yeniden kullanılır.
+    idempotency_key = f"interview-submit:{session_id}"
+    previous_job = await job_queue.find_by_idempotency_key(idempotency_key)
+    writable_statuses = ["in_progress"]
+    if previous_job and previous_job["status"] == "failed":
+        writable_statuses.append("evaluating")
     await interview_collection.update_one(
-        {"_id": ObjectId(session_id)},
-        {
-            "$set": {
-                "status": "completed",
-                "feedback": feedback_report,
-                "score": score, # Ayrıştırılan skoru kaydet
-                "completed_at": datetime.utcnow()
-            }
-        }
+        {"_id": ObjectId(session_id), "status": {"$in": writable_statuses}},
+        {"$set": {"status": "evaluating", "submitted_answers": request.answers}}
     )
-
-    return {"message": "Interview completed and submitted for evaluation."}
\ No newline at end of file
+    job = await job_queue.enqueue(
+        evaluation_jobs.INTERVIEW_EVALUATION,
+        {"session_id": session_id, "username": current_user.username},
+        # Oturum başına tek değerlendirme işi: çift gönderimler aynı işi döndürür.
+        idempotency_key=idempotency_key,
+        owner_id=str(current_user.id),
+    )
+    return JobAccepted(job_id=str(job["_id"]), status=job["status"])
@@ -0,0 +1,49 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..config import settings
+from ..models import Job, User
+from ..security import get_current_user
+from ..services import job_queue
+from .. import sse
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["Jobs"]
+)
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await job_queue.get_job(job_id, owner_id=str(current_user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return Job.model_validate(job)
+
+@router.get("/{job_id}/events")
+async def stream_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Emits a 'status' event whenever the job changes and a final 'done' event when it finishes.
+    Emits an 'error' event and stops if the job disappears while being watched.
+    """
+    job = await job_queue.get_job(job_id, owner_id=str(current_user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    async def events():
+        current = job
+        last_seen = None
+        while True:
+            if current is None:
+                yield sse.format_event({"detail": "Job not found."}, event="error")
+                return
+            snapshot = (current["status"], current["attempts"], current["updated_at"])
+            if snapshot != last_seen:
+                last_seen = snapshot
+                yield sse.format_event(Job.model_validate(current).model_dump(mode="json"), event="status")
+            if current["status"] in job_queue.TERMINAL_STATUSES:
+                yield sse.format_event({"status": current["status"]}, event="done")
+                return
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+            current = await job_queue.get_job(job_id)
+
+    return sse.event_stream_response(events())
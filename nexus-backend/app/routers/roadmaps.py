@@ -1,13 +1,15 @@
 import traceback
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
 from bson import ObjectId
 from pydantic import BaseModel
 
 from ..security import get_current_user
-from ..models import User, Roadmap, GenerateRoadmapRequest, RoadmapNode, UpdateNodeStatusRequest, ChatMessage, UserChatMessage
+from ..models import User, Roadmap, RoadmapSummary, GenerateRoadmapRequest, RoadmapNode, UpdateNodeStatusRequest, ChatMessage, UserChatMessage
 from ..database import roadmap_collection
-from ..services import roadmap_service, chat_service
+from ..services import roadmap_service, roadmap_graph, roadmap_templates, chat_service, chat_history_service, chat_context_service, flashcard_service, node_status_service, profile_service
+from .. import catalog_cache, sse
 
 router = APIRouter(
     prefix="/api/roadmaps",
@@ -17,25 +19,32 @@ router = APIRouter(
 class EnrollResponse(BaseModel):
     personal_roadmap_id: str
 
+# Listeleme uçlarında node içerikleri yerine sadece özet alanlar çekilir.
+SUMMARY_PROJECTION = profile_service.ROADMAP_SUMMARY_PROJECTION
+
 @router.post("/generate", response_model=Roadmap, status_code=status.HTTP_201_CREATED)
-async def generate_new_roadmap(request: GenerateRoadmapRequest, current_user: User = Depends(get_current_user)):
+async def generate_new_roadmap(request: GenerateRoadmapRequest, use_cache: bool = True, refresh: bool = False, current_user: User = Depends(get_current_user)):
     try:
-        ai_response = await roadmap_service.generate_roadmap_from_prompt(request.prompt)
-        sanitized_nodes_data = []
-        for node in ai_response.get("nodes", []):
-            node['nodeId'] = str(node.get('nodeId', ''))
-            if 'dependencies' in node and isinstance(node.get('dependencies'), list):
-                node['dependencies'] = [str(dep) for dep in node['dependencies']]
-            sanitized_nodes_data.append(node)
+        ai_response = await roadmap_service.generate_roadmap_from_prompt(request.prompt, use_cache=use_cache, refresh=refresh)
+        # Üretilen graf olduğu gibi saklanmaz: tekrarlanan id'ler, var olmayan bağımlılıklar ve döngüler onarılır.
+        sanitized_nodes_data, graph_issues = roadmap_graph.repair(ai_response.get("nodes", []))
+        if graph_issues:
+            print(f"Repaired generated roadmap graph for '{request.prompt}': {graph_issues}")
+        topo_order, levels = roadmap_graph.analyze(sanitized_nodes_data)
         roadmap_nodes = [RoadmapNode(**node) for node in sanitized_nodes_data]
         new_roadmap = Roadmap(
             title=ai_response.get("title", f"Roadmap for {request.prompt}"),
             prompt=request.prompt,
             type="user_generated",
             ownerId=str(current_user.id),
-            nodes=roadmap_nodes
+            nodeCount=len(roadmap_nodes),
+            nodes=roadmap_nodes,
+            topoOrder=topo_order,
+            levels=levels,
+            availableNodes=roadmap_graph.available_nodes(sanitized_nodes_data, {}),
         )
-        db_roadmap = new_roadmap.model_dump(by_alias=True, exclude=["id"])
+        # Sohbet geçmişi ayrı koleksiyonda tutulur, node'lara gömülmez.
+        db_roadmap = new_roadmap.model_dump(by_alias=True, exclude={"id": True, "nodes": {"__all__": {"chatHistory"}}})
         result = await roadmap_collection.insert_one(db_roadmap)
         created_roadmap_doc = await roadmap_collection.find_one({"_id": result.inserted_id})
         if not created_roadmap_doc:
@@ -48,33 +57,40 @@ async def generate_new_roadmap(request: GenerateRoadmapRequest, current_user: Us
 @router.get("/ongoing", response_model=List[Roadmap])
 async def get_ongoing_roadmaps(current_user: User = Depends(get_current_user)):
     """
-    Fetches all roadmaps started by the current user, including calculated progress.
+    Fetches all roadmaps started by the current user. Progress is maintained by update_node_status.
     """
     user_roadmaps = await roadmap_collection.find({
         "ownerId": str(current_user.id)
     }).to_list(length=100)
+    user_roadmaps = await roadmap_templates.materialize_many(user_roadmaps)
 
     for r in user_roadmaps:
         r["id"] = str(r["_id"])
-        
-        nodes = r.get("nodes", [])
-        total_nodes = len(nodes)
-        
-        if total_nodes > 0:
-            completed_nodes = len([node for node in nodes if node.get("status") == "completed"])
-            r["progress"] = int((completed_nodes / total_nodes) * 100)
-        else:
-            r["progress"] = 0
-    # ----------------------------------------------------
-            
+
     return user_roadmaps
 
-@router.get("/suggested", response_model=List[Roadmap])
-async def get_suggested_roadmaps():
+@router.get("/summaries", response_model=List[RoadmapSummary])
+async def get_roadmap_summaries(current_user: User = Depends(get_current_user)):
+    """
+    Lightweight dashboard listing: only title, type and progress counters of the user's roadmaps.
+    """
+    summaries = await roadmap_collection.find(
+        {"ownerId": str(current_user.id)}, SUMMARY_PROJECTION
+    ).to_list(length=100)
+    return await roadmap_templates.fill_titles(summaries)
+
+# Şablonlar seed_db.py ile değiştiğinde kayıtların birleştirdiği şablon önbelleği de temizlenir.
+catalog_cache.on_change(roadmap_templates.invalidate)
+
+@catalog_cache.register("suggested_roadmaps")
+async def _load_suggested_roadmaps() -> bytes:
     suggested_roadmaps = await roadmap_collection.find({"type": "suggested"}).to_list(50)
-    for r in suggested_roadmaps:
-        r["id"] = str(r["_id"])
-    return suggested_roadmaps
+    return catalog_cache.serialize(List[Roadmap], suggested_roadmaps)
+
+@router.get("/suggested", response_model=List[Roadmap])
+async def get_suggested_roadmaps(request: Request):
+    """Served from the in-process catalog cache; supports If-None-Match."""
+    return await catalog_cache.respond("suggested_roadmaps", request)
 
 @router.get("/{roadmap_id}", response_model=Roadmap)
 async def get_roadmap_by_id(roadmap_id: str):
@@ -82,7 +98,7 @@ async def get_roadmap_by_id(roadmap_id: str):
         raise HTTPException(status_code=400, detail="Invalid roadmap ID.")
     roadmap = await roadmap_collection.find_one({"_id": ObjectId(roadmap_id)})
     if roadmap:
-        return Roadmap.model_validate(roadmap)
+        return Roadmap.model_validate(await roadmap_templates.materialize(roadmap))
     raise HTTPException(status_code=404, detail="Roadmap not found.")
 
 @router.post("/{template_id}/enroll", response_model=EnrollResponse)
@@ -90,14 +106,16 @@ async def enroll_in_roadmap(template_id: str, current_user: User = Depends(get_c
     existing_copy = await roadmap_collection.find_one({"ownerId": str(current_user.id), "templateId": template_id})
     if existing_copy:
         return {"personal_roadmap_id": str(existing_copy["_id"])}
-    template_roadmap = await roadmap_collection.find_one({"_id": ObjectId(template_id), "type": "suggested"})
+    template_roadmap = await roadmap_templates.get_template(template_id)
     if not template_roadmap:
         raise HTTPException(status_code=404, detail="Suggested roadmap not found.")
+    # Node'lar kopyalanmaz; sadece şablona referans ve boş bir durum katmanı saklanır.
     new_personal_roadmap = {
-        "title": template_roadmap["title"], "prompt": template_roadmap.get("prompt"),
         "type": "user_generated", "ownerId": str(current_user.id),
         "templateId": str(template_roadmap["_id"]), "progress": 0,
-        "nodes": template_roadmap["nodes"]
+        "completedCount": 0, "nodeCount": len(template_roadmap["nodes"]),
+        "nodeStates": {},
+        "availableNodes": roadmap_graph.available_nodes(template_roadmap["nodes"], {}),
     }
     result = await roadmap_collection.insert_one(new_personal_roadmap)
     return {"personal_roadmap_id": str(result.inserted_id)}
@@ -108,51 +126,88 @@ async def update_node_status(roadmap_id: str, node_id: str, request: UpdateNodeS
         raise HTTPException(status_code=400, detail="Invalid roadmap ID.")
     if request.status not in ["not_started", "in_progress", "completed"]:
         raise HTTPException(status_code=400, detail="Invalid status value.")
-    roadmap = await roadmap_collection.find_one({"_id": ObjectId(roadmap_id), "ownerId": str(current_user.id)})
-    if not roadmap:
-        raise HTTPException(status_code=404, detail="Roadmap not found or not owner.")
-    result = await roadmap_collection.update_one(
-        {"_id": ObjectId(roadmap_id), "nodes.nodeId": node_id},
-        {"$set": {"nodes.$.status": request.status}}
-    )
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Node not found.")
-    updated_roadmap = await roadmap_collection.find_one({"_id": ObjectId(roadmap_id)})
-    for node in updated_roadmap.get("nodes", []):
-        if node["nodeId"] == node_id:
-            return RoadmapNode.model_validate(node)
-    raise HTTPException(status_code=500, detail="Could not retrieve updated node.")
-
-@router.get("/{roadmap_id}/nodes/{node_id}/chat", response_model=List[ChatMessage])
-async def get_node_chat_history(roadmap_id: str, node_id: str, current_user: User = Depends(get_current_user)):
+    # Sahiplik kontrolü, durum, sayaçlar ve açık node'lar tek bir atomik find_one_and_update ile yazılır.
+    node = await node_status_service.set_node_status(roadmap_id, str(current_user.id), node_id, request.status)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Roadmap or node not found, or not owner.")
+    return RoadmapNode.model_validate(node)
+
+async def _get_owned_node(roadmap_id: str, node_id: str, current_user: User) -> dict:
+    """Kullanıcıya ait roadmap'teki tek bir node'u, roadmap'in geri kalanını çekmeden döndürür."""
+    if not ObjectId.is_valid(roadmap_id):
+        raise HTTPException(status_code=400, detail="Invalid roadmap ID.")
     roadmap = await roadmap_collection.find_one(
         {"_id": ObjectId(roadmap_id), "ownerId": str(current_user.id)},
-        {"nodes": {"$elemMatch": {"nodeId": node_id}}}
+        {"nodes": {"$elemMatch": {"nodeId": node_id}}, "templateId": 1, f"nodeStates.{node_id}": 1}
     )
+    if roadmap and roadmap_templates.is_overlay(roadmap):
+        template = await roadmap_templates.get_template(roadmap["templateId"])
+        node = next((n for n in (template or {}).get("nodes", []) if n["nodeId"] == node_id), None)
+        if node:
+            return {**node, "status": roadmap_templates.node_status(roadmap, node_id)}
+        raise HTTPException(status_code=404, detail="Roadmap or Node not found")
     if not roadmap or not roadmap.get("nodes"):
         raise HTTPException(status_code=404, detail="Roadmap or Node not found")
-    return roadmap["nodes"][0].get("chatHistory", [])
+    return roadmap["nodes"][0]
+
+@router.get("/{roadmap_id}/nodes/{node_id}/chat", response_model=List[ChatMessage])
+async def get_node_chat_history(
+    roadmap_id: str,
+    node_id: str,
+    before: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns up to `limit` messages older than `before`, oldest first.
+    """
+    await _get_owned_node(roadmap_id, node_id, current_user)
+    return await chat_history_service.get_messages(roadmap_id, node_id, before=before, limit=limit)
 
 @router.post("/{roadmap_id}/nodes/{node_id}/chat", response_model=ChatMessage)
-async def chat_with_ai_on_node(roadmap_id: str, node_id: str, user_message: UserChatMessage, current_user: User = Depends(get_current_user)):
-    roadmap = await roadmap_collection.find_one({"_id": ObjectId(roadmap_id), "ownerId": str(current_user.id)})
-    if not roadmap:
-        raise HTTPException(status_code=404, detail="Roadmap not found or access denied.")
-    target_node = next((node for node in roadmap["nodes"] if node["nodeId"] == node_id), None)
-    if not target_node:
-        raise HTTPException(status_code=404, detail="Node not found in this roadmap.")
-    history = target_node.get("chatHistory", [])
+async def chat_with_ai_on_node(roadmap_id: str, node_id: str, user_message: UserChatMessage, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
+    target_node = await _get_owned_node(roadmap_id, node_id, current_user)
+    summary, history = await chat_context_service.get_context(roadmap_id, node_id)
     user_chat_msg_obj = ChatMessage(sender="user", text=user_message.text)
     history.append(user_chat_msg_obj.model_dump())
-    ai_response_text = await chat_service.get_ai_response(target_node["title"], history)
+    ai_response_text = await chat_service.get_ai_response(target_node["title"], history, summary)
     ai_chat_msg_obj = ChatMessage(sender="ai", text=ai_response_text)
-    history.append(ai_chat_msg_obj.model_dump())
-    await roadmap_collection.update_one(
-        {"_id": ObjectId(roadmap_id), "nodes.nodeId": node_id},
-        {"$set": {"nodes.$.chatHistory": history}}
+    await chat_history_service.append_messages(
+        roadmap_id, node_id, [user_chat_msg_obj.model_dump(), ai_chat_msg_obj.model_dump()]
     )
+    background_tasks.add_task(chat_context_service.refresh_summary, roadmap_id, node_id, target_node["title"])
     return ai_chat_msg_obj
 
+@router.post("/{roadmap_id}/nodes/{node_id}/chat/stream")
+async def stream_chat_with_ai_on_node(roadmap_id: str, node_id: str, user_message: UserChatMessage, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
+    """
+    Streams the AI reply as Server-Sent Events and persists both messages once the stream completes.
+    """
+    target_node = await _get_owned_node(roadmap_id, node_id, current_user)
+    summary, history = await chat_context_service.get_context(roadmap_id, node_id)
+    user_chat_msg_obj = ChatMessage(sender="user", text=user_message.text)
+    history.append(user_chat_msg_obj.model_dump())
+
+    async def events():
+        chunks = []
+        try:
+            async for text in chat_service.stream_ai_response(target_node["title"], history, summary):
+                chunks.append(text)
+                yield sse.format_event({"text": text})
+        except Exception:
+            traceback.print_exc()
+            yield sse.format_event({"detail": "AI assistant is currently unavailable."}, event="error")
+            return
+        ai_chat_msg_obj = ChatMessage(sender="ai", text="".join(chunks).strip())
+        await chat_history_service.append_messages(
+            roadmap_id, node_id, [user_chat_msg_obj.model_dump(), ai_chat_msg_obj.model_dump()]
+        )
+        yield sse.format_event(ai_chat_msg_obj.model_dump(mode="json"), event="done")
+
+    # Özet güncellemesi akış tamamlandıktan sonra çalışır.
+    background_tasks.add_task(chat_context_service.refresh_summary, roadmap_id, node_id, target_node["title"])
+    return sse.event_stream_response(events())
+
 @router.delete("/{roadmap_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_roadmap(roadmap_id: str, current_user: User = Depends(get_current_user)):
     """
@@ -171,5 +226,9 @@ async def delete_roadmap(roadmap_id: str, current_user: User = Depends(get_curre
         # Eğer hiçbir şey silinmediyse, ya roadmap yok ya da kullanıcı sahip değil
         raise HTTPException(status_code=404, detail="Roadmap not found or you are not the owner.")
 
+    await chat_history_service.delete_roadmap_messages(roadmap_id)
+    await chat_context_service.delete_roadmap_summaries(roadmap_id)
+    await flashcard_service.delete_roadmap_decks(str(current_user.id), roadmap_id)
+
     # 204 status kodu ile yanıt gövdesi gönderilmez
     return
\ No newline at end of file
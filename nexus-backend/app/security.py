@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pydantic import BaseModel
 from bson import ObjectId
 from .config import settings
-from .models import User, UserCreate, Token, Roadmap, InterviewSession, AssessmentSession
+from .cache import TTLCache
+from .models import User, UserCreate, Token, RoadmapSummaryPage, SessionSummaryPage
 
 # Proje içi importlar
-from .database import user_collection, roadmap_collection, interview_collection, assessment_collection
-from .models import TokenData, User, UserCreate, Token, Roadmap, InterviewSession, AssessmentSession
+from .database import user_collection
+from .models import TokenData, User, UserCreate, Token
+from .services import profile_service
 
 # --- ROUTER TANIMI ---
 router = APIRouter(
@@ -20,7 +24,22 @@ router = APIRouter(
 )
 
 # --- ŞİFRELEME ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max rounds varsayılana eşitlendiği için BCRYPT_ROUNDS değiştiğinde eski hash'ler
+# needs_update olarak işaretlenir ve bir sonraki girişte yeniden hash'lenir.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt C tarafında GIL'i bıraktığı için ayrı bir thread havuzu yeterlidir. Havuz
+# sınırlı tutulur; böylece giriş patlamaları event loop'u ve Starlette'in varsayılan
+# threadpool'unu meşgul etmez.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
 
 # --- JWT AYARLARI ---
 SECRET_KEY = settings.JWT_SECRET_KEY
@@ -29,12 +48,37 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
+# --- KULLANICI ÖNBELLEĞİ ---
+# Doğrulanmış kullanıcılar token'daki 'sub' (email) ile kısa süreliğine saklanır,
+# böylece her istekte kullanıcı koleksiyonuna gidilmez. Kullanıcı dokümanını yazan her
+# yol invalidate_cached_user'ı çağırır.
+_user_cache = TTLCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+
+def invalidate_cached_user(email: str) -> None:
+    """
+    Kullanıcı dokümanı yazıldıktan sonra çağrılmalı. Önbellek süreç içidir; diğer worker
+    süreçlerindeki kopyalar USER_CACHE_TTL_SECONDS boyunca eski kalabilir.
+    """
+    _user_cache.pop(email)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Şifreyi havuzda doğrular. Hash güncel maliyet parametresiyle üretilmemişse
+    ikinci değer olarak yeni hash'i döndürür, aksi halde None.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -59,19 +103,29 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    
+
+    # Token kullanıcı bilgilerini içeriyorsa veritabanına hiç gitme.
+    if settings.JWT_EMBED_USER_CLAIMS and payload.get("uid") and payload.get("username"):
+        return User(_id=payload["uid"], email=token_data.email, username=payload["username"])
+
+    cached_user = _user_cache.get(token_data.email)
+    if cached_user is not None:
+        return cached_user
+
     user_data = await user_collection.find_one({"email": token_data.email})
     if user_data is None:
         raise credentials_exception
-    
-    return User.model_validate(user_data)
+
+    user = User.model_validate(user_data)
+    _user_cache.set(token_data.email, user)
+    return user
 
 # --- PROFIL İÇİN Pydantic MODELİ ---
 class UserProfileResponse(BaseModel):
     user_details: User
-    roadmaps: List[Roadmap]
-    interviews: List[InterviewSession]
-    assessments: List[AssessmentSession]
+    roadmaps: RoadmapSummaryPage
+    interviews: SessionSummaryPage
+    assessments: SessionSummaryPage
     class Config:
         populate_by_name = True
         arbitrary_types_allowed = True
@@ -85,26 +139,37 @@ async def register_user(user: UserCreate):
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
-    user_dict = user.model_dump()
+    hashed_password = await hash_password_async(user.password)
+    user_dict = user.model_dump(exclude={"password"})
     user_dict["hashed_password"] = hashed_password
     
     new_user = await user_collection.insert_one(user_dict)
+    invalidate_cached_user(user.email)
     created_user = await user_collection.find_one({"_id": new_user.inserted_id})
     return User.model_validate(created_user)
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     user_data = await user_collection.find_one({"email": form_data.username})
-    if not user_data or not verify_password(form_data.password, user_data["hashed_password"]):
+    if user_data:
+        is_valid, new_hash = await verify_and_update_password_async(form_data.password, user_data["hashed_password"])
+    else:
+        is_valid, new_hash = False, None
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        await user_collection.update_one({"_id": user_data["_id"]}, {"$set": {"hashed_password": new_hash}})
+        invalidate_cached_user(user_data["email"])
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    token_claims = {"sub": user_data["email"]}
+    if settings.JWT_EMBED_USER_CLAIMS:
+        token_claims.update({"uid": str(user_data["_id"]), "username": user_data["username"]})
     access_token = create_access_token(
-        data={"sub": user_data["email"]}, expires_delta=access_token_expires
+        data=token_claims, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -113,20 +178,29 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.get("/users/me/profile", response_model=UserProfileResponse)
-async def get_user_profile(current_user: User = Depends(get_current_user)):
-    user_roadmaps = await roadmap_collection.find({"ownerId": str(current_user.id)}).to_list(100)
-    for r in user_roadmaps:
-        total_nodes = len(r.get("nodes", []))
-        r["progress"] = int((len([n for n in r.get("nodes", []) if n.get("status") == "completed"]) / total_nodes) * 100) if total_nodes > 0 else 0
-
-    completed_interviews = await interview_collection.find({"ownerId": str(current_user.id), "status": "completed"}).to_list(100)
-    completed_assessments = await assessment_collection.find({"ownerId": str(current_user.id), "status": "completed"}).to_list(100)
-    
-    profile_data = {
-        "user_details": current_user,
-        "roadmaps": user_roadmaps,
-        "interviews": completed_interviews,
-        "assessments": completed_assessments
-    }
-    
-    return UserProfileResponse.model_validate(profile_data)
\ No newline at end of file
+async def get_user_profile(limit: int = Query(default=settings.PROFILE_PAGE_SIZE, ge=1, le=100), current_user: User = Depends(get_current_user)):
+    """
+    Her bölümün ilk sayfasını özet alanlarla döndürür. Sonraki sayfalar bölüm uçlarından,
+    rapor metinleri /api/interviews/{id}/report ve /api/assessments/{id}/report uçlarından çekilir.
+    """
+    sections = await profile_service.get_profile_sections(str(current_user.id), limit)
+    return UserProfileResponse.model_validate({"user_details": current_user, **sections})
+
+def _check_cursor(after: Optional[str]) -> None:
+    if after is not None and not ObjectId.is_valid(after):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+@router.get("/users/me/profile/roadmaps", response_model=RoadmapSummaryPage)
+async def get_profile_roadmaps(after: Optional[str] = None, limit: int = Query(default=settings.PROFILE_PAGE_SIZE, ge=1, le=100), current_user: User = Depends(get_current_user)):
+    _check_cursor(after)
+    return await profile_service.roadmaps_page(str(current_user.id), after, limit)
+
+@router.get("/users/me/profile/interviews", response_model=SessionSummaryPage)
+async def get_profile_interviews(after: Optional[str] = None, limit: int = Query(default=settings.PROFILE_PAGE_SIZE, ge=1, le=100), current_user: User = Depends(get_current_user)):
+    _check_cursor(after)
+    return await profile_service.interviews_page(str(current_user.id), after, limit)
+
+@router.get("/users/me/profile/assessments", response_model=SessionSummaryPage)
+async def get_profile_assessments(after: Optional[str] = None, limit: int = Query(default=settings.PROFILE_PAGE_SIZE, ge=1, le=100), current_user: User = Depends(get_current_user)):
+    _check_cursor(after)
+    return await profile_service.assessments_page(str(current_user.id), after, limit)
@@ -1,25 +1,24 @@
-import json
-import re
-import google.generativeai as genai
 from fastapi import HTTPException
-from starlette.concurrency import run_in_threadpool
-from typing import List, Dict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
-from ..config import settings
+from . import grading_service, llm_gateway, llm_json
+from ..models import GeneratedAssessment
+from .. import cache
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel(model_name="gemini-1.5-flash")
+PROMPT_VERSION = "v1"
 
-def _extract_json_block(text: str) -> str:
-    match = re.search(r"```json(.*?)```", text, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    if text.strip().startswith('{') and text.strip().endswith('}'):
-        return text.strip()
-    raise ValueError("No valid JSON block found in the AI response.")
+# Bilgi soruları ve proje görevleri toplam puana eşit ağırlıkla katılır.
+SCORE_WEIGHTS = {"knowledge": 0.5, "project": 0.5}
+PASSING_SCORE = 70
 
-async def generate_assessment_session(topic: str) -> Dict:
+async def generate_assessment_session(topic: str, use_cache: bool = True, refresh: bool = False) -> Dict:
     """Generates a challenging, certificate-level assessment."""
+    cache_key = cache.make_key("assessment", PROMPT_VERSION, llm_gateway.DEFAULT_MODEL, topic)
+    if use_cache and not refresh:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     prompt = f"""
     Create a difficult, certificate-level skill assessment for the topic: "{topic}".
     The output MUST be a single JSON object with two keys: "knowledge_questions" and "project_tasks".
@@ -35,59 +34,72 @@ async def generate_assessment_session(topic: str) -> Dict:
     Return ONLY the valid JSON object.
     """
     try:
-        response = await run_in_threadpool(model.generate_content, prompt)
-        json_text = _extract_json_block(response.text)
-        data = json.loads(json_text)
-        if "knowledge_questions" not in data or "project_tasks" not in data:
-            raise ValueError("AI response is missing required keys.")
+        data = await llm_json.generate_json(prompt, GeneratedAssessment)
+        if use_cache:
+            await cache.put(cache_key, data)
         return data
     except Exception as e:
-        print(f"Error generating assessment session: {e}\nResponse was: {response.text if 'response' in locals() else 'No response'}")
+        print(f"Error generating assessment session: {e}\nResponse was: {getattr(e, 'text', 'No response')}")
         raise HTTPException(status_code=500, detail="Failed to generate assessment from AI.")
 
-async def evaluate_assessment_submission(topic: str, questions: List[Dict], project_code: str, username: str) -> str:
-    """Evaluates user's answers and project code, then generates a final report."""
-    submission_text = "--- Bilgi Soruları ve Cevapları ---\n"
-    for i, q in enumerate(questions, 1):
-        submission_text += f"\nSoru {i}: {q.get('question_text')}\n"
-        submission_text += f"Adayın Cevabı: {q.get('user_answer', 'Cevap verilmedi.')}\n"
-    
-    submission_text += "\n--- Mini Proje Kodu ---\n"
-    submission_text += f"```python\n{project_code}\n```"
-
-    prompt = f"""
-    Sen, "{topic}" konusunda uzman bir teknik lider ve eğitmensin.
-    Adayın adı **{username}**. Yetkinlik Değerlendirme Raporu'nu aşağıda verilen katı formata göre, Markdown kullanarak ve Türkçe olarak oluştur.
-
-    ---
-    ### Yetkinlik Değerlendirme Raporu
-    **Aday:** {username}
-    **Değerlendirme Alanı:** {topic}
-
-    ### 1. Genel Özet
-    *Buraya adayın genel yetkinliği hakkında 2-3 cümlelik bir özet yaz.*
-
-    ### 2. Bilgi Soruları Analizi
-    *Buraya teorik sorulara verilen cevapların bir analizini yap. Doğru ve yanlışları belirt.*
-
-    ### 3. Proje Görevi Değerlendirmesi
-    *Buraya gönderilen kodun doğruluğu, verimliliği, okunabilirliği ve en iyi pratiklere uygunluğu hakkında detaylı bir analiz yaz.*
-
-    ### 4. Yetkinlik Matrisi
-    - **[Anahtar Yetkinlik 1]:** **[10 üzerinden Puan]** - *Kısa yorum*
-    - **[Anahtar Yetkinlik 2]:** **[10 üzerinden Puan]** - *Kısa yorum*
-    - **[Anahtar Yetkinlik 3]:** **[10 üzerinden Puan]** - *Kısa yorum*
-
-    ### 5. Final Sonucu
-    **Durum:** **[Başarılı/Başarısız]**
-    ---
-
-    Yukarıdaki şablonu kullanarak, adayın gönderimini analiz et ve raporu doldur:
-    {submission_text}
+def build_items(knowledge_answers: List[Dict], project_tasks: List[Dict], project_codes: List[str]) -> List[Dict]:
+    """Gönderimi grading_service'in puanlayacağı bağımsız maddelere böler."""
+    items = [
+        {"kind": "knowledge", "question": q.get("question_text", ""), "answer": q.get("user_answer") or ""}
+        for q in knowledge_answers
+    ]
+    for i, code in enumerate(project_codes):
+        description = project_tasks[i].get("description", "") if i < len(project_tasks) else f"Proje {i + 1}"
+        items.append({"kind": "project", "question": description, "answer": code or ""})
+    return items
+
+def build_report(topic: str, username: str, grades: List[Dict], score: int) -> str:
+    """Soru bazlı notlardan Markdown formatında Yetkinlik Değerlendirme Raporu'nu oluşturur."""
+    knowledge = [g for g in grades if g["kind"] == "knowledge"]
+    projects = [g for g in grades if g["kind"] == "project"]
+    passed = score >= PASSING_SCORE
+
+    lines = [
+        "### Yetkinlik Değerlendirme Raporu",
+        f"**Aday:** {username}",
+        f"**Değerlendirme Alanı:** {topic}",
+        "",
+        "### 1. Genel Özet",
+        f"Aday, bilgi sorularında {_average(knowledge)}/10, proje görevlerinde {_average(projects)}/10 ortalama puan aldı.",
+        "",
+        "### 2. Bilgi Soruları Analizi",
+    ]
+    lines += [f"- **Soru {i}:** **{g['score']}/10** - {g['feedback']}" for i, g in enumerate(knowledge, 1)]
+    lines += ["", "### 3. Proje Görevi Değerlendirmesi"]
+    lines += [f"- **Proje {i}:** **{g['score']}/10** - {g['feedback']}" for i, g in enumerate(projects, 1)]
+    lines += [
+        "",
+        "### 4. Final Sonucu",
+        f"**Puan:** **{score}/100**",
+        f"**Durum:** **{'Başarılı' if passed else 'Başarısız'}**",
+    ]
+    return "\n".join(lines)
+
+def _average(grades: List[Dict]) -> str:
+    if not grades:
+        return "-"
+    return f"{sum(g['score'] for g in grades) / len(grades):.1f}"
+
+async def evaluate_assessment_submission(
+    topic: str,
+    items: List[Dict],
+    username: str,
+    previous_grades: Optional[Dict[str, Dict]] = None,
+    on_grade: Optional[Callable[[str, Dict], Awaitable[None]]] = None,
+) -> Tuple[str, int, List[Dict]]:
+    """
+    Her bilgi sorusunu ve proje görevini eşzamanlı olarak puanlar; toplam puanı ve
+    raporu kodda hesaplar. (rapor, 100 üzerinden puan, soru bazlı notlar) döndürür.
     """
     try:
-        response = await run_in_threadpool(model.generate_content, prompt)
-        return response.text.strip()
+        grades = await grading_service.grade_items(topic, items, previous_grades, on_grade)
     except Exception as e:
         print(f"Error evaluating assessment: {e}")
-        raise HTTPException(status_code=500, detail="Failed to evaluate the assessment submission.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to evaluate the assessment submission.")
+    score = grading_service.aggregate_score(grades, SCORE_WEIGHTS)
+    return build_report(topic, username, grades, score), score, grades
@@ -0,0 +1,152 @@
+import hashlib
+import random
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from ..config import settings
+from ..database import challenge_collection, seen_challenge_collection
+from . import challenge_service
+
+# AI'ın ürettiği önerilen challenge'lar challenges koleksiyonunda source="generated" ile
+# saklanır; böylece /hint, /chat ve /run uçları onları da bulur. Öneriler önce bu havuzdan,
+# kullanıcının tamamladığı konularla eşleşen ve daha önce görmediği challenge'lardan verilir;
+# AI sadece eksik kalan kadar challenge üretmek için çağrılır.
+#
+# Aynı problemin farklı ifadelerle tekrar üretilmesi sık görülür. Her challenge normalize
+# edilmiş başlık (gerekirse açıklama) kelimelerinden türetilen bir parmak izi (fingerprint)
+# taşır; aynı parmak izine sahip yeni bir üretim mevcut kaydı yeniden kullanır ve sadece
+# konu listesini genişletir.
+#
+# AI'ın ürettiği challenge'larda referans çözüm yoktur; solution_code alanı hiç yazılmaz.
+# Böylece test vektörü üretimi ve profil ölçümü bu challenge'ları atlar.
+
+GENERATED_SOURCE = "generated"
+# Havuzdan okunan en fazla aday sayısı; görülenler elendikten sonra ilk `count` tanesi verilir.
+POOL_SCAN_LIMIT = 50
+# Tek bir üretim isteğinde prompt'a verilen en fazla konu sayısı.
+PROMPT_TOPICS_LIMIT = 5
+# Başlık bu sayıdan az anlamlı kelime içeriyorsa (ör. "Sorting") parmak izine açıklamanın
+# en sık DESCRIPTION_KEYWORDS kelimesi de eklenir.
+MIN_TITLE_TOKENS = 2
+DESCRIPTION_KEYWORDS = 5
+
+_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "to", "for", "and", "or", "with", "from", "by", "at", "as",
+    "is", "are", "be", "that", "this", "it", "its", "given", "write", "implement", "create", "function",
+    "program", "problem", "challenge", "your", "you", "using", "use", "return", "returns", "which", "should",
+}
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+def _tokens(text: str) -> List[str]:
+    """Aksan, büyük/küçük harf, noktalama ve dolgu kelimeleri atılır; basit çoğul eki kırpılır."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    words = (w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in re.findall(r"[a-z0-9]+", text))
+    return [w for w in words if w not in _STOPWORDS]
+
+def fingerprint(title: str, description: str) -> str:
+    """
+    Başlığın anlamlı kelimelerinin kümesi; böylece "Two Sum" ve "Two-Sum Problem" aynı challenge
+    sayılır. Açıklamalar aynı problem için her üretimde farklı ifade edildiğinden sadece başlık
+    çok genel olduğunda kullanılır.
+    """
+    key = sorted(set(_tokens(title)))
+    if len(key) < MIN_TITLE_TOKENS:
+        counts = Counter(_tokens(description))
+        key += sorted(word for word, _ in sorted(counts.items(), key=lambda i: (-i[1], i[0]))[:DESCRIPTION_KEYWORDS])
+    return hashlib.sha256(" ".join(key).encode()).hexdigest()
+
+async def _store(data: Dict, topics: List[str]) -> Dict:
+    """Üretilen challenge'ı parmak iziyle saklar; aynısı varsa mevcut kaydı döndürür."""
+    digest = fingerprint(data["title"], data["description"])
+    document = {
+        **{k: v for k, v in data.items() if k != "solution_code"},
+        "source": GENERATED_SOURCE,
+        "fingerprint": digest,
+        "createdAt": datetime.utcnow(),
+    }
+    try:
+        return await challenge_collection.find_one_and_update(
+            {"fingerprint": digest},
+            # Eski kayıtlarda sahte bir solution_code yorumu bulunabilir; yeniden kullanılırken silinir.
+            {"$setOnInsert": document, "$addToSet": {"topics": {"$each": topics}}, "$unset": {"solution_code": ""}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Aynı parmak izi eşzamanlı olarak eklendi; unique indeks kazananı belirler.
+        return await challenge_collection.find_one_and_update(
+            {"fingerprint": digest},
+            {"$addToSet": {"topics": {"$each": topics}}, "$unset": {"solution_code": ""}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+async def _unseen_from_pool(user_id: str, topics: List[str]) -> List[Dict]:
+    candidates = await challenge_collection.find(
+        {"source": GENERATED_SOURCE, "topics": {"$in": topics}}, {"tests": 0}
+    ).sort("_id", -1).limit(POOL_SCAN_LIMIT).to_list(length=None)
+    if not candidates:
+        return []
+    seen = await seen_challenge_collection.find(
+        {"userId": user_id, "challengeId": {"$in": [c["_id"] for c in candidates]}}, {"challengeId": 1}
+    ).to_list(length=None)
+    seen_ids = {s["challengeId"] for s in seen}
+    return [c for c in candidates if c["_id"] not in seen_ids]
+
+def _prompt_topics(completed_topics: Iterable[str], unseen: List[Dict]) -> List[str]:
+    """
+    Üretim için konu seçer: önce havuzda kullanıcının görmediği challenge'ı kalmamış
+    konular, sonra diğerleri. Her grup kendi içinde karıştırılır; böylece çok sayıda
+    konusu olan kullanıcılar hep aynı (ör. alfabetik ilk) konulardan öneri almaz.
+    """
+    by_key = {normalize_topic(t): t for t in completed_topics}
+    covered = {topic for c in unseen for topic in c.get("topics", [])}
+    uncovered = [key for key in by_key if key not in covered]
+    rest = [key for key in by_key if key in covered]
+    random.shuffle(uncovered)
+    random.shuffle(rest)
+    return [by_key[key] for key in (uncovered + rest)[:PROMPT_TOPICS_LIMIT]]
+
+async def mark_seen(user_id: str, challenge_ids: Iterable) -> None:
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne({"userId": user_id, "challengeId": challenge_id}, {"$setOnInsert": {"seenAt": now}}, upsert=True)
+        for challenge_id in challenge_ids
+    ]
+    if operations:
+        await seen_challenge_collection.bulk_write(operations, ordered=False)
+
+async def recommend(user_id: str, completed_topics: Iterable[str], count: Optional[int] = None) -> List[Dict]:
+    """
+    Kullanıcının görmediği `count` challenge döndürür: önce havuzdan, eksik kalırsa AI ile
+    üretip saklayarak. Dönen challenge'lar kullanıcı için görüldü olarak işaretlenir.
+    """
+    count = count or settings.RECOMMENDED_CHALLENGES_COUNT
+    completed_topics = list(completed_topics)
+    topics = sorted({normalize_topic(t) for t in completed_topics})
+    unseen = await _unseen_from_pool(user_id, topics)
+    challenges = unseen[:count]
+
+    missing = count - len(challenges)
+    if missing > 0:
+        # Challenge sadece üretimde kullanılan konularla etiketlenir.
+        prompt_topics = _prompt_topics(completed_topics, unseen)
+        generated = await challenge_service.generate_challenges_from_topics(", ".join(prompt_topics), missing)
+        served = {c["_id"] for c in challenges}
+        for data in generated:
+            stored = await _store(data, [normalize_topic(t) for t in prompt_topics])
+            # Yeni üretim havuzdaki bir challenge'ın tekrarı olabilir; aynı yanıtta iki kez verilmez.
+            if stored["_id"] not in served:
+                served.add(stored["_id"])
+                challenges.append(stored)
+
+    challenges = challenges[:count]
+    await mark_seen(user_id, [c["_id"] for c in challenges])
+    return challenges
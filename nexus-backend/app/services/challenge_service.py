@@ -1,22 +1,12 @@
-import json
-import re
-import google.generativeai as genai
 from fastapi import HTTPException
-from starlette.concurrency import run_in_threadpool
 from typing import List, Dict
 
-from ..config import settings
+from . import code_hash, llm_gateway, llm_json
+from ..models import GeneratedChallenge
+from .. import cache
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel(model_name="gemini-1.5-flash")
-
-def _extract_json_block(text: str) -> str:
-    match = re.search(r"```json(.*?)```", text, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    if text.strip().startswith('[') and text.strip().endswith(']'):
-        return text.strip()
-    return text
+# İpucu prompt'u değiştiğinde artırılmalı; eski önbellek girdileri böylece geçersiz olur.
+HINT_PROMPT_VERSION = "v1"
 
 async def generate_challenges_from_topics(topics: str, count: int = 3) -> List[dict]:
     """
@@ -35,22 +25,25 @@ async def generate_challenges_from_topics(topics: str, count: int = 3) -> List[d
     Do not include any text or markdown formatting like ```json outside of the JSON list itself.
     """
     try:
-        response = await run_in_threadpool(model.generate_content, prompt)
-        json_text = _extract_json_block(response.text)
-        challenges = json.loads(json_text)
-        if not isinstance(challenges, list) or not all("title" in c and "template_code" in c for c in challenges):
-            raise ValueError("AI response is missing required keys.")
-        return challenges
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"AI-generated JSON for challenges is invalid: {response.text}\nError: {e}")
+        return await llm_json.generate_json(prompt, List[GeneratedChallenge])
+    except llm_json.JSONExtractionError as e:
+        print(f"AI-generated JSON for challenges is invalid: {e.text}\nError: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate valid challenges from AI.")
     except Exception as e:
         raise HTTPException(status_code=500, detail="Could not generate challenges.")
 
-async def get_hint_for_challenge(challenge_description: str, user_code: str) -> str:
+async def get_hint_for_challenge(challenge_id: str, challenge_description: str, user_code: str) -> str:
     """
-    Bir kodlama görevi ve kullanıcının yazdığı kod için AI'dan ipucu alır.
+    Bir kodlama görevi ve kullanıcının yazdığı kod için AI'dan ipucu alır. İpuçları
+    (challenge, kodun normalize edilmiş AST hash'i) ile önbelleğe alınır: boş şablonu veya
+    yapısal olarak aynı hatalı denemeyi gönderen kullanıcılar aynı ipucunu alır.
     """
+    cache_prompt = f"{challenge_id}|{code_hash.normalized_hash(user_code)}"
+    cache_key = cache.make_key("hint", HINT_PROMPT_VERSION, llm_gateway.DEFAULT_MODEL, cache_prompt)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     prompt = f"""
     You are a helpful programming tutor.
     The user is trying to solve the following problem: "{challenge_description}"
@@ -63,11 +56,14 @@ async def get_hint_for_challenge(challenge_description: str, user_code: str) ->
     Analyze the user's code. Provide a concise, helpful hint to guide them in the right direction. 
     Do NOT give the full answer. Focus on the logical error or the next step they should take.
     If the code is empty or nonsensical, suggest a starting point (e.g., "Think about which data structure would be efficient for lookups.").
+    Describe the idea instead of quoting the user's variable names.
     Your response should be in Turkish.
     """
     try:
-        response = await run_in_threadpool(model.generate_content, prompt)
-        return response.text.strip()
+        response_text = await llm_gateway.generate(prompt)
     except Exception as e:
         print(f"Error in hint generation service: {e}")
-        raise HTTPException(status_code=500, detail="Could not get a hint from the AI.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Could not get a hint from the AI.")
+    hint = response_text.strip()
+    await cache.put(cache_key, hint)
+    return hint
@@ -0,0 +1,71 @@
+import traceback
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..config import settings
+from ..database import chat_summary_collection
+from . import chat_history_service, chat_service
+
+# Node sohbetlerinde modele gönderilen bağlam sınırlıdır: son CHAT_CONTEXT_TURNS
+# tur (kullanıcı + AI mesajı) olduğu gibi, daha eski turlar ise (roadmapId, nodeId)
+# başına saklanan ve yanıttan sonra arka planda güncellenen bir özet olarak gönderilir.
+# Özet sadece CHAT_SUMMARY_MIN_MESSAGES mesaj biriktiğinde güncellendiğinden, pencereden
+# çıkmış ama henüz özete katılmamış mesajlar da olduğu gibi gönderilir; böylece bağlamda
+# boşluk kalmaz.
+
+_refreshing: Set[Tuple[str, str]] = set()
+
+def _window_size() -> int:
+    return settings.CHAT_CONTEXT_TURNS * 2
+
+def _context_limit() -> int:
+    # Özet gecikmediği sürece özetlenmemiş mesaj sayısı pencere + (CHAT_SUMMARY_MIN_MESSAGES - 1)'i
+    # geçmez; sınır sadece özet güncellemesi başarısız olduğunda istemin büyümesini engeller.
+    return _window_size() + settings.CHAT_SUMMARY_MIN_MESSAGES
+
+async def get_context(roadmap_id: str, node_id: str) -> Tuple[Optional[str], List[Dict]]:
+    """Sohbetin özetini ve özete henüz katılmamış tüm mesajları (summarizedUntil sonrası) döndürür."""
+    summary_doc = await chat_summary_collection.find_one({"roadmapId": roadmap_id, "nodeId": node_id}) or {}
+    recent = await chat_history_service.get_messages(
+        roadmap_id, node_id, after=summary_doc.get("summarizedUntil"), limit=_context_limit()
+    )
+    return summary_doc.get("summary"), recent
+
+async def refresh_summary(roadmap_id: str, node_id: str, topic: str) -> None:
+    """
+    Pencerenin dışına çıkmış ama henüz özete katılmamış mesajları özete ekler.
+    İstek yolunda değil, yanıt gönderildikten sonra arka planda çağrılır.
+    """
+    key = (roadmap_id, node_id)
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+    try:
+        recent = await chat_history_service.get_messages(roadmap_id, node_id, limit=_window_size())
+        if len(recent) < _window_size():
+            return
+        summary_doc = await chat_summary_collection.find_one({"roadmapId": roadmap_id, "nodeId": node_id}) or {}
+        summarized_until: Optional[datetime] = summary_doc.get("summarizedUntil")
+        pending = await chat_history_service.get_messages(
+            roadmap_id, node_id, before=recent[0]["timestamp"], after=summarized_until, limit=None
+        )
+        # Özet güncellemesi de bir LLM çağrısıdır; birkaç mesaj birikene kadar bekle.
+        if len(pending) < settings.CHAT_SUMMARY_MIN_MESSAGES:
+            return
+        summary = await chat_service.summarize_conversation(topic, summary_doc.get("summary"), pending)
+        await chat_summary_collection.update_one(
+            {"roadmapId": roadmap_id, "nodeId": node_id},
+            {"$set": {
+                "summary": summary,
+                "summarizedUntil": pending[-1]["timestamp"],
+                "updatedAt": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+    except Exception:
+        traceback.print_exc()
+    finally:
+        _refreshing.discard(key)
+
+async def delete_roadmap_summaries(roadmap_id: str) -> None:
+    await chat_summary_collection.delete_many({"roadmapId": roadmap_id})
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ..database import chat_message_collection
+
+# Node sohbetleri roadmap dokümanı yerine (roadmapId, nodeId) başına kovalara
+# (bucket) bölünmüş ayrı bir koleksiyonda tutulur. Her kova en fazla
+# BUCKET_SIZE mesaj içerir; yeni mesajlar $push ile son kovaya eklenir.
+BUCKET_SIZE = 50
+
+async def append_messages(roadmap_id: str, node_id: str, messages: List[Dict]) -> None:
+    """Mesajları (kronolojik sırayla) dolmamış son kovaya ekler, gerekirse yeni kova açar."""
+    if not messages:
+        return
+    timestamps = [m["timestamp"] for m in messages]
+    await chat_message_collection.update_one(
+        {"roadmapId": roadmap_id, "nodeId": node_id, "count": {"$lte": BUCKET_SIZE - len(messages)}},
+        {
+            "$push": {"messages": {"$each": messages}},
+            "$inc": {"count": len(messages)},
+            "$min": {"firstAt": min(timestamps)},
+            "$max": {"lastAt": max(timestamps)},
+        },
+        upsert=True,
+    )
+
+async def get_messages(
+    roadmap_id: str,
+    node_id: str,
+    before: Optional[datetime] = None,
+    limit: Optional[int] = 50,
+    after: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    `before` zamanından önceki (ve varsa `after` zamanından sonraki) en yeni `limit`
+    mesajı kronolojik sırayla döndürür. `limit` None ise aralıktaki tüm mesajlar döner.
+    """
+    bucket_match: Dict = {"roadmapId": roadmap_id, "nodeId": node_id}
+    message_match: Dict = {}
+    if before is not None:
+        bucket_match["firstAt"] = {"$lt": before}
+        message_match["$lt"] = before
+    if after is not None:
+        bucket_match["lastAt"] = {"$gt": after}
+        message_match["$gt"] = after
+
+    pipeline: List[Dict] = [{"$match": bucket_match}, {"$sort": {"firstAt": -1}}]
+    if limit is not None:
+        # İstenen mesaj sayısını karşılamaya yetecek kadar kova oku.
+        pipeline.append({"$limit": limit // BUCKET_SIZE + 2})
+    pipeline.append({"$unwind": "$messages"})
+    if message_match:
+        pipeline.append({"$match": {"messages.timestamp": message_match}})
+    pipeline.append({"$sort": {"messages.timestamp": -1}})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$replaceRoot": {"newRoot": "$messages"}})
+
+    messages = await chat_message_collection.aggregate(pipeline).to_list(length=None)
+    messages.reverse()
+    return messages
+
+async def delete_roadmap_messages(roadmap_id: str) -> None:
+    await chat_message_collection.delete_many({"roadmapId": roadmap_id})
@@ -1,14 +1,9 @@
-import google.generativeai as genai
 from fastapi import HTTPException
-from starlette.concurrency import run_in_threadpool
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 
-from ..config import settings
+from . import llm_gateway
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel(model_name="gemini-1.5-flash")
-
-async def get_ai_response(topic: str, history: List[Dict]) -> str:
+def _build_node_chat(topic: str, history: List[Dict], summary: Optional[str] = None) -> Tuple[List[Dict], object]:
     system_instruction = f"""
     Sen Nexus adlı bir öğrenme platformunda uzman, sabırlı ve teşvik edici bir eğitmensin. 
     Görevin, kullanıcıya '{topic}' konusunu öğretmek.
@@ -22,19 +17,24 @@ async def get_ai_response(topic: str, history: List[Dict]) -> str:
     for message in history:
         role = "model" if message["sender"] == "ai" else "user"
         formatted_history.append({"role": role, "parts": [message["text"]]})
-    convo = model.start_chat(history=[
+    # Son kullanıcı mesajı geçmişe değil, gönderilecek mesaja aittir.
+    if formatted_history and formatted_history[-1]['role'] == 'user':
+        last_user_message = formatted_history.pop()['parts']
+    else:
+        last_user_message = "Lütfen konuyu anlatmaya devam et."
+    chat_history = [
         {'role': 'user', 'parts': [system_instruction]},
         {'role': 'model', 'parts': [f"Anlaşıldı. Ben bir Nexus eğitmeniyim ve kullanıcıya '{topic}' konusunu Markdown formatında öğretmeye hazırım."]},
-        *formatted_history
-    ])
-    last_user_message = formatted_history[-1]['parts'] if formatted_history and formatted_history[-1]['role'] == 'user' else "Lütfen konuyu anlatmaya devam et."
-    try:
-        response = await run_in_threadpool(convo.send_message, last_user_message)
-        return response.text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="AI assistant is currently unavailable.")
+    ]
+    if summary:
+        chat_history += [
+            {'role': 'user', 'parts': [f"Daha önceki konuşmamızın özeti:\n{summary}"]},
+            {'role': 'model', 'parts': ["Anlaşıldı, bu özeti dikkate alarak devam edeceğim."]},
+        ]
+    chat_history += formatted_history
+    return chat_history, last_user_message
 
-async def get_ai_challenge_response(challenge_title: str, challenge_description: str, user_question: str) -> str:
+def _build_challenge_prompt(challenge_title: str, challenge_description: str, user_question: str) -> List[str]:
     system_instruction = f"""
     Sen, Nexus platformunda yardımcı bir AI kodlama asistanısın.
     Kullanıcı şu anda "{challenge_title}" adlı problemi çözmeye çalışıyor.
@@ -45,8 +45,53 @@ async def get_ai_challenge_response(challenge_title: str, challenge_description:
     - Yanıtlarını Markdown formatında yapılandır.
     """
     prompt = f'Sistem talimatını takip et. Kullanıcının sorusu şu: "{user_question}". Bu soruya göre yol gösterici bir yanıt oluştur.'
+    return [system_instruction, prompt]
+
+async def get_ai_response(topic: str, history: List[Dict], summary: Optional[str] = None) -> str:
+    chat_history, last_user_message = _build_node_chat(topic, history, summary)
     try:
-        response = await run_in_threadpool(model.generate_content, [system_instruction, prompt])
-        return response.text.strip()
+        response_text = await llm_gateway.chat(chat_history, last_user_message)
+        return response_text.strip()
     except Exception as e:
-        raise HTTPException(status_code=500, detail="AI assistant is currently unavailable for challenges.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="AI assistant is currently unavailable.")
+
+async def stream_ai_response(topic: str, history: List[Dict], summary: Optional[str] = None) -> AsyncIterator[str]:
+    """get_ai_response'un akış (streaming) sürümü; yanıt parçalarını geldikçe üretir."""
+    chat_history, last_user_message = _build_node_chat(topic, history, summary)
+    async for text in llm_gateway.stream_chat(chat_history, last_user_message):
+        yield text
+
+async def summarize_conversation(topic: str, previous_summary: Optional[str], messages: List[Dict]) -> str:
+    """
+    Mevcut özeti yeni mesajlarla birleştirerek güncellenmiş, kısa bir konuşma özeti üretir.
+    """
+    transcript = "\n".join(
+        f"{'Eğitmen' if m['sender'] == 'ai' else 'Öğrenci'}: {m['text']}" for m in messages
+    )
+    prompt = f"""
+    Bir öğrenci ile '{topic}' konusu üzerine yapılan eğitim sohbetinin özetini güncelliyorsun.
+    Mevcut özet:
+    {previous_summary or "(henüz özet yok)"}
+
+    Özete eklenecek yeni mesajlar:
+    {transcript}
+
+    Öğrencinin neyi öğrendiğini, nerede zorlandığını ve hangi örneklerin verildiğini koruyan,
+    en fazla 200 kelimelik tek bir güncel özet yaz. Sadece özet metnini döndür.
+    """
+    response_text = await llm_gateway.generate(prompt)
+    return response_text.strip()
+
+async def get_ai_challenge_response(challenge_title: str, challenge_description: str, user_question: str) -> str:
+    contents = _build_challenge_prompt(challenge_title, challenge_description, user_question)
+    try:
+        response_text = await llm_gateway.generate(contents)
+        return response_text.strip()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="AI assistant is currently unavailable for challenges.")
+
+async def stream_ai_challenge_response(challenge_title: str, challenge_description: str, user_question: str) -> AsyncIterator[str]:
+    """get_ai_challenge_response'un akış (streaming) sürümü."""
+    contents = _build_challenge_prompt(challenge_title, challenge_description, user_question)
+    async for text in llm_gateway.stream_generate(contents):
+        yield text
@@ -0,0 +1,85 @@
+import ast
+import hashlib
+import io
+import tokenize
+from typing import Dict
+
+# Kullanıcı kodunun yapısal özeti. Yorumlar, boşluklar ve docstring'ler AST'ye girmez;
+# kodda tanımlanan değişken ve parametre adları ilk göründükleri sırayla v0, v1, ...
+# olarak yeniden adlandırılır. Böylece sadece adlandırma veya biçimlendirme bakımından
+# farklı olan iki deneme aynı hash'i verir. Fonksiyon/sınıf adları, import'lar, öznitelikler
+# ve tanımlanmamış adlar (builtin'ler) korunur; bunlar çözümün anlamını taşır.
+
+class _Renamer(ast.NodeTransformer):
+    def __init__(self, bound: set):
+        self._bound = bound
+        self._names: Dict[str, str] = {}
+
+    def _rename(self, name: str) -> str:
+        if name not in self._bound:
+            return name
+        if name not in self._names:
+            self._names[name] = f"v{len(self._names)}"
+        return self._names[name]
+
+    def visit_Name(self, node: ast.Name) -> ast.Name:
+        node.id = self._rename(node.id)
+        return node
+
+    def visit_arg(self, node: ast.arg) -> ast.arg:
+        node.arg = self._rename(node.arg)
+        self.generic_visit(node)
+        return node
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> ast.ExceptHandler:
+        if node.name:
+            node.name = self._rename(node.name)
+        self.generic_visit(node)
+        return node
+
+def _strip_docstrings(tree: ast.AST) -> None:
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.body:
+            first = node.body[0]
+            if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+                node.body = node.body[1:] or [ast.Pass()]
+
+def _bound_names(tree: ast.AST) -> set:
+    """Kodun kendisinin atadığı adlar (tanımlı fonksiyon/sınıf ve import adları hariç)."""
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.discard(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.difference_update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+    return bound
+
+_SKIPPED_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER}
+
+def _normalized_text(code: str) -> str:
+    """Ayrıştırılamayan kod için: yorumlar ve boşluklar atılmış token dizisi (hataya kadar okunanlar)."""
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type not in _SKIPPED_TOKENS:
+                tokens.append(token.string)
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return " ".join(tokens)
+
+def normalized_hash(code: str) -> str:
+    """Kodun normalize edilmiş AST'sinin SHA-256 özeti; sözdizimi hatalı kodda token dizisininki."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return "text:" + hashlib.sha256(_normalized_text(code).encode()).hexdigest()
+    _strip_docstrings(tree)
+    tree = _Renamer(_bound_names(tree)).visit(tree)
+    return "ast:" + hashlib.sha256(ast.dump(tree, annotate_fields=False).encode()).hexdigest()
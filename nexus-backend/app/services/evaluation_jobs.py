@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import Any, Dict
+
+from bson import ObjectId
+
+from ..database import interview_collection, assessment_collection
+from . import job_queue, interview_service, assessment_service
+
+# Mülakat ve değerlendirme gönderimlerinin LLM ile puanlanması HTTP isteği yerine
+# iş kuyruğunda yapılır. Cevaplar gönderim anında oturuma yazılır; işleyiciler
+# oturumu okuyup raporu üretir ve oturumu "completed" olarak işaretler. Her cevap
+# grading_service ile ayrı puanlanır; tamamlanan notlar oturumun grade_cache alanında
+# içerik özetine göre tutulur, böylece yeniden denemeler ve gönderimler değişmeyen
+# cevapları tekrar LLM'e göndermez.
+
+INTERVIEW_EVALUATION = "interview_evaluation"
+ASSESSMENT_EVALUATION = "assessment_evaluation"
+
+def _grade_recorder(collection, session_id: ObjectId):
+    """Her yeni notu bitmesini beklemeden oturuma yazar; yeniden denemeler sadece eksikleri puanlar."""
+    async def record(key: str, grade: Dict[str, Any]) -> None:
+        await collection.update_one({"_id": session_id}, {"$set": {f"grade_cache.{key}": grade}})
+    return record
+
+@job_queue.register(INTERVIEW_EVALUATION)
+async def evaluate_interview(payload: Dict[str, Any]) -> Dict[str, Any]:
+    session = await interview_collection.find_one({"_id": ObjectId(payload["session_id"])})
+    if not session:
+        raise ValueError(f"Interview session {payload['session_id']} not found.")
+    # Yeniden deneme, önceki denemenin tamamladığı bir oturuma denk gelirse tekrar puanlama.
+    if session.get("status") == "completed":
+        return {"score": session.get("score")}
+
+    answers = session.get("submitted_answers", [])
+    feedback_report, score, item_grades = await interview_service.evaluate_interview_submission(
+        topic=session["topic"],
+        questions=session.get("questions", []),
+        answers=answers,
+        username=payload["username"],
+        previous_grades=session.get("grade_cache"),
+        on_grade=_grade_recorder(interview_collection, session["_id"]),
+    )
+    await interview_collection.update_one(
+        {"_id": session["_id"]},
+        {"$set": {
+            "status": "completed",
+            "feedback": feedback_report,
+            "score": score,
+            "item_grades": item_grades,
+            "completed_at": datetime.utcnow()
+        }}
+    )
+    return {"score": score}
+
+@job_queue.register(ASSESSMENT_EVALUATION)
+async def evaluate_assessment(payload: Dict[str, Any]) -> Dict[str, Any]:
+    session = await assessment_collection.find_one({"_id": ObjectId(payload["session_id"])})
+    if not session:
+        raise ValueError(f"Assessment session {payload['session_id']} not found.")
+    if session.get("status") == "completed":
+        return {"score": session.get("score")}
+
+    items = assessment_service.build_items(
+        knowledge_answers=session.get("submitted_knowledge_answers", []),
+        project_tasks=session.get("project_tasks", []),
+        project_codes=session.get("submitted_project_codes", []),
+    )
+    final_report, score, item_grades = await assessment_service.evaluate_assessment_submission(
+        topic=session["topic"],
+        items=items,
+        username=payload["username"],
+        previous_grades=session.get("grade_cache"),
+        on_grade=_grade_recorder(assessment_collection, session["_id"]),
+    )
+    await assessment_collection.update_one(
+        {"_id": session["_id"]},
+        {"$set": {
+            "status": "completed",
+            "final_report": final_report,
+            "score": score,
+            "item_grades": item_grades,
+            "completed_at": datetime.utcnow()
+        }}
+    )
+    return {"score": score}
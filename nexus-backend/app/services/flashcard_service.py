@@ -1,37 +1,43 @@
-import json
-import re
-import google.generativeai as genai
+import asyncio
+from datetime import datetime, timedelta
 from fastapi import HTTPException
-from starlette.concurrency import run_in_threadpool
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from . import llm_gateway, llm_json, review_service
 from ..config import settings
+from ..database import flashcard_collection, flashcard_deck_collection
+from ..models import Flashcard
+from .. import cache
+
+# Kartlar (sahip, roadmap, node) başına destelere ayrılmış olarak saklanır. Her deste
+# flashcard_decks koleksiyonunda bir dokümanla temsil edilir; kartlar ise flashcards
+# koleksiyonunda tek tek tutulur. Sadece destesi olmayan (yeni tamamlanmış) node'lar
+# için, node başına küçük bir LLM çağrısıyla kart üretilir; geri kalanı veritabanından gelir.
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel(model_name="gemini-1.5-flash")
+PROMPT_VERSION = "v2"
 
-def _extract_json_block(text: str) -> str:
-    match = re.search(r"```json(.*?)```", text, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    if text.strip().startswith('[') and text.strip().endswith(']'):
-        return text.strip()
-    raise ValueError("No valid JSON block found in AI response.")
+# Üretimi yarıda kalan (ör. süreç çöktüğü için) bir destenin yeniden üretilebilmesi için geçmesi gereken süre.
+_STALE_CLAIM = timedelta(seconds=settings.LLM_TIMEOUT_SECONDS * 2)
 
-async def generate_flashcards_for_topic(topic: str, completed_nodes: List[str], count: int = 15) -> List[Dict]:
+async def generate_flashcards_for_node(topic: str, node_title: str, node_content: str, count: int, use_cache: bool = True, refresh: bool = False) -> List[Dict]:
     """
-    Bir roadmap'in tamamlanmış konularından bilgi kartları üretir.
+    Bir roadmap'in tek bir tamamlanmış konusu için bilgi kartları üretir.
     """
-    if not completed_nodes:
-        return []
+    cache_prompt = f"{topic}|{node_title}|{node_content}|{count}"
+    cache_key = cache.make_key("flashcards", PROMPT_VERSION, llm_gateway.DEFAULT_MODEL, cache_prompt)
+    if use_cache and not refresh:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-    nodes_text = ", ".join(completed_nodes)
-    
     prompt = f"""
     You are an expert learning assistant creating a flashcard deck.
-    The main topic of the roadmap is "{topic}". The user has completed these specific sub-topics: "{nodes_text}".
+    The main topic of the roadmap is "{topic}". The user has just completed the sub-topic "{node_title}": {node_content}
 
-    Your task is to generate {count} flashcards based ONLY on the completed sub-topics.
+    Your task is to generate {count} flashcards based ONLY on this sub-topic.
     Create flashcards for the most important keywords, definitions, and fundamental questions.
     The "front" of the card should be a term or a short question.
     The "back" of the card should be a concise definition or answer.
@@ -41,15 +47,110 @@ async def generate_flashcards_for_topic(topic: str, completed_nodes: List[str],
     """
 
     try:
-        response = await run_in_threadpool(model.generate_content, prompt)
-        json_text = _extract_json_block(response.text)
-        flashcards = json.loads(json_text)
-        if not isinstance(flashcards, list) or not all("front" in card and "back" in card for card in flashcards):
-            raise ValueError("AI did not return the expected flashcard structure.")
+        flashcards = await llm_json.generate_json(prompt, List[Flashcard])
+        if use_cache:
+            await cache.put(cache_key, flashcards)
         return flashcards
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"AI-generated JSON for flashcards is invalid: {response.text}\nError: {e}")
+    except llm_json.JSONExtractionError as e:
+        print(f"AI-generated JSON for flashcards is invalid: {e.text}\nError: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate valid flashcards from AI.")
     except Exception as e:
         print(f"Error in flashcard generation service: {e}")
-        raise HTTPException(status_code=500, detail="Could not generate flashcards.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Could not generate flashcards.")
+
+async def _build_node_deck(owner_id: str, roadmap_id: str, topic: str, node: Dict, use_cache: bool, refresh: bool) -> None:
+    deck_key = {"ownerId": owner_id, "roadmapId": roadmap_id, "nodeId": node["nodeId"]}
+    now = datetime.utcnow()
+    # Desteyi tek bir upsert ile sahiplen: doküman yoksa eklenir, yarım kalmış (veya refresh
+    # istenmişse hazır) bir deste güncellenir. Başka bir istek üretimi sürdürüyorsa upsert
+    # unique indekse takılır ve bu node atlanır; böylece aynı kartlar iki kez üretilmez.
+    claimable = [{"status": "generating", "claimedAt": {"$lt": now - _STALE_CLAIM}}]
+    if refresh:
+        claimable.append({"status": "ready"})
+    try:
+        await flashcard_deck_collection.update_one(
+            {**deck_key, "$or": claimable},
+            {"$set": {"status": "generating", "claimedAt": now}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return
+
+    try:
+        cards = await generate_flashcards_for_node(
+            topic, node["title"], node.get("content", ""), settings.FLASHCARDS_PER_NODE, use_cache=use_cache, refresh=refresh
+        )
+    except Exception:
+        # Sahipliği hemen bırak ki bir sonraki istek bu node'u yeniden deneyebilsin.
+        await flashcard_deck_collection.update_one(deck_key, {"$set": {"claimedAt": datetime.utcfromtimestamp(0)}})
+        raise
+
+    await flashcard_collection.delete_many(deck_key)
+    if cards:
+        await flashcard_collection.insert_many([
+            {
+                **deck_key, "nodeTitle": node["title"], "front": card["front"], "back": card["back"],
+                "createdAt": now, **review_service.initial_state(now),
+            }
+            for card in cards
+        ])
+    await flashcard_deck_collection.update_one(
+        deck_key,
+        {"$set": {"status": "ready", "cardCount": len(cards), "generatedAt": datetime.utcnow()}},
+    )
+
+async def sync_deck(owner_id: str, roadmap: Dict, use_cache: bool = True, refresh: bool = False) -> int:
+    """
+    Roadmap'in tamamlanmış ama destesi olmayan node'ları için kartları eşzamanlı üretir
+    (`refresh` ise tüm tamamlanmış node'lar için yeniden üretir). Üretilen node sayısını döndürür.
+    """
+    roadmap_id = str(roadmap["_id"])
+    completed = [n for n in roadmap.get("nodes", []) if n.get("status") == "completed" and n.get("title")]
+    if refresh:
+        pending = completed
+    else:
+        stale_before = datetime.utcnow() - _STALE_CLAIM
+        existing = await flashcard_deck_collection.find(
+            {"ownerId": owner_id, "roadmapId": roadmap_id, "$or": [
+                {"status": "ready"}, {"claimedAt": {"$gte": stale_before}},
+            ]},
+            {"nodeId": 1},
+        ).to_list(length=None)
+        existing_ids = {d["nodeId"] for d in existing}
+        pending = [n for n in completed if n["nodeId"] not in existing_ids]
+    if not pending:
+        return 0
+
+    results = await asyncio.gather(
+        *(_build_node_deck(owner_id, roadmap_id, roadmap["title"], node, use_cache, refresh) for node in pending),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors:
+        print(f"Error generating flashcards for roadmap {roadmap_id}: {error}")
+    # Bazı node'lar başarısız olsa bile diğerlerinin kartları saklanmış olur; hepsi başarısızsa hata ver.
+    if len(errors) == len(pending):
+        raise HTTPException(status_code=500, detail="Could not generate flashcards.")
+    return len(pending) - len(errors)
+
+async def get_cards(
+    owner_id: str,
+    roadmap_id: str,
+    node_id: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """Saklanan kartları oluşturulma sırasıyla, `after` id'sinden sonrasını döndürür."""
+    query: Dict = {"ownerId": owner_id, "roadmapId": roadmap_id}
+    if node_id is not None:
+        query["nodeId"] = node_id
+    if after is not None:
+        query["_id"] = {"$gt": ObjectId(after)}
+    cursor = flashcard_collection.find(query).sort("_id", 1)
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=None)
+
+async def delete_roadmap_decks(owner_id: str, roadmap_id: str) -> None:
+    await flashcard_collection.delete_many({"ownerId": owner_id, "roadmapId": roadmap_id})
+    await flashcard_deck_collection.delete_many({"ownerId": owner_id, "roadmapId": roadmap_id})
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import re
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from . import llm_json
+from ..models import GeneratedGrade
+
+# Her cevap / proje görevi ayrı ve eşzamanlı bir LLM çağrısıyla, JSON şemasına uyan
+# yapılandırılmış bir puan olarak değerlendirilir. Toplam puan kodda, deterministik
+# olarak hesaplanır. Notlar içerik özetine (hash) göre saklandığından değişmeyen
+# cevaplar yeniden gönderimde tekrar puanlanmaz.
+
+MAX_ITEM_SCORE = 10
+# Bu türlerdeki cevaplar kod olarak değerlendirilir (proje görevleri ve canlı kodlama soruları).
+CODE_KINDS = {"project", "live_coding"}
+
+GRADE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer"},
+        "feedback": {"type": "string"},
+    },
+    "required": ["score", "feedback"],
+}
+
+def grade_key(kind: str, question: str, answer: str) -> str:
+    normalized = "\x1f".join(re.sub(r"\s+", " ", part or "").strip() for part in (kind, question, answer))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+async def grade_item(topic: str, kind: str, question: str, answer: str) -> Dict:
+    """Tek bir cevabı 0-10 arası puanlar ve kısa bir geri bildirim döndürür."""
+    if not (answer or "").strip():
+        return {"score": 0, "feedback": "Cevap verilmedi."}
+
+    if kind in CODE_KINDS:
+        criteria = "doğruluk, verimlilik, okunabilirlik ve en iyi pratiklere uygunluk"
+        answer_block = f"```python\n{answer}\n```"
+    else:
+        criteria = "doğruluk, derinlik ve açıklık"
+        answer_block = answer
+    prompt = f"""
+    Sen, "{topic}" konusunda uzman bir teknik değerlendiricisin.
+    Aşağıdaki görevi ve adayın cevabını {criteria} açısından değerlendir.
+
+    Görev: {question}
+
+    Adayın cevabı:
+    {answer_block}
+
+    "score" alanına 0 ile {MAX_ITEM_SCORE} arasında bir tam sayı, "feedback" alanına
+    Türkçe, en fazla iki cümlelik bir geri bildirim yaz.
+    """
+    data = await llm_json.generate_json(prompt, GeneratedGrade, response_schema=GRADE_SCHEMA)
+    score = max(0, min(MAX_ITEM_SCORE, int(data["score"])))
+    return {"score": score, "feedback": str(data.get("feedback", "")).strip()}
+
+async def grade_items(
+    topic: str,
+    items: List[Dict],
+    previous_grades: Optional[Dict[str, Dict]] = None,
+    on_grade: Optional[Callable[[str, Dict], Awaitable[None]]] = None,
+) -> List[Dict]:
+    """
+    `items` ({"kind", "question", "answer"}) listesini eşzamanlı puanlar ve aynı
+    sırada {"kind", "question", "score", "feedback"} listesi döndürür. Daha önce
+    puanlanmış cevaplar `previous_grades` üzerinden yeniden kullanılır; yeni her
+    not `on_grade` ile hemen kaydedilebilir, böylece yeniden denemeler sadece
+    eksik kalanları puanlar.
+    """
+    previous_grades = previous_grades or {}
+
+    async def grade(item: Dict) -> Dict:
+        key = grade_key(item["kind"], item["question"], item["answer"])
+        result = previous_grades.get(key)
+        if result is None:
+            result = await grade_item(topic, item["kind"], item["question"], item["answer"])
+            if on_grade is not None:
+                await on_grade(key, result)
+        return {"kind": item["kind"], "question": item["question"], **result}
+
+    return await asyncio.gather(*(grade(item) for item in items))
+
+def aggregate_score(grades: List[Dict], weights: Optional[Dict[str, float]] = None) -> int:
+    """
+    Notları 0-100 arası tek bir puana indirger. Her tür kendi içinde ortalanır ve
+    `weights` ile ağırlıklandırılır; cevabı olmayan türlerin ağırlığı diğerlerine dağıtılır.
+    """
+    by_kind: Dict[str, List[int]] = {}
+    for g in grades:
+        by_kind.setdefault(g["kind"], []).append(g["score"])
+    if not by_kind:
+        return 0
+    weights = weights or {}
+    total_weight = sum(weights.get(kind, 1.0) for kind in by_kind)
+    weighted = sum(
+        weights.get(kind, 1.0) * (sum(scores) / len(scores)) / MAX_ITEM_SCORE
+        for kind, scores in by_kind.items()
+    )
+    return round(100 * weighted / total_weight)
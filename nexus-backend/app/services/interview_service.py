@@ -1,89 +1,200 @@
-import json
+import asyncio
 import re
-import google.generativeai as genai
+from collections import Counter
 from fastapi import HTTPException
-from starlette.concurrency import run_in_threadpool
-from typing import List, Dict
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Set, Tuple
 
-from ..config import settings
+from . import grading_service, llm_gateway, llm_json
+from ..models import GeneratedInterviewQuestion
+from .. import cache
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel(model_name="gemini-1.5-flash")
+PROMPT_VERSION = "v2"
 
-def _extract_json_block(text: str) -> str:
-    match = re.search(r"```json(.*?)```", text, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    if text.strip().startswith('[') and text.strip().endswith(']'):
-        return text.strip()
-    raise ValueError("No valid JSON block found in the AI response.")
+# Soru seti, tür ve zorluk bandı başına küçük ve eşzamanlı isteklere bölünür.
+# (question_type, difficulty, count)
+QUESTION_PLAN = [
+    ("theory", "easy", 3),
+    ("theory", "medium", 4),
+    ("theory", "hard", 3),
+    ("live_coding", "easy", 3),
+    ("live_coding", "medium", 4),
+    ("live_coding", "hard", 3),
+]
+# Oturumun başlatılabilmesi için her türden en az bu kadar soru hazır olmalı.
+MIN_QUESTIONS_PER_TYPE = 3
+# Raporda bu puan ve üzeri alan cevaplar güçlü yön, altındakiler geliştirilebilecek alan sayılır.
+STRONG_ANSWER_SCORE = 7
 
-async def generate_interview_questions(topic: str) -> List[Dict]:
-    """
-    Belirli bir konu için 10 teorik ve 10 kodlama mülakat sorusu üretir.
-    """
+async def _generate_question_band(topic: str, question_type: str, difficulty: str, count: int) -> List[Dict]:
+    if question_type == "live_coding":
+        type_instructions = "Each object must have a \"question_text\" and a \"template_code\" field with a simple Python function template."
+    else:
+        type_instructions = "Each object must have a \"question_text\" field."
     prompt = f"""
-    Generate a comprehensive technical interview question set for the topic: "{topic}".
-    The set must include exactly 20 questions: 10 of type 'theory' and 10 of type 'live_coding'.
+    Generate exactly {count} {difficulty} technical interview questions of type '{question_type}' for the topic: "{topic}".
     Return a single, valid JSON list of objects. Do not include any text or markdown formatting outside of the list.
-    Each object must have a "question_text" and a "question_type".
-    For 'live_coding' questions, also include a 'template_code' field with a simple Python function template.
-    Ensure a good mix of difficulties, from easy to hard.
+    {type_instructions}
     """
     try:
-        response = await run_in_threadpool(model.generate_content, prompt)
-        json_text = _extract_json_block(response.text)
-        questions = json.loads(json_text)
-        if not isinstance(questions, list) or not all("question_type" in q for q in questions):
-             raise ValueError("AI did not return the expected question structure.")
-        return questions
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"AI-generated JSON for interview is invalid: {response.text}\nError: {e}")
-        raise HTTPException(status_code=500, detail="AI failed to generate a valid interview.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Could not start the interview session.")
+        questions = await llm_json.generate_json(prompt, List[GeneratedInterviewQuestion])
+    except llm_json.JSONExtractionError as e:
+        print(f"AI-generated JSON for interview band ({question_type}/{difficulty}) is invalid: {e.text}\nError: {e}")
+        raise
+    for q in questions:
+        q["question_type"] = question_type
+    return questions
+
+def _band_result(task: asyncio.Task) -> List[Dict]:
+    """Başarısız bir bant tüm oturumu düşürmez; sadece loglanır ve boş sayılır."""
+    if task.cancelled():
+        return []
+    if task.exception() is not None:
+        print(f"Interview question band failed: {task.exception()}")
+        return []
+    return task.result()
 
-async def evaluate_interview_submission(topic: str, answers: List[Dict], username: str) -> str:
+def _dedupe(questions: List[Dict], seen: Set[str]) -> List[Dict]:
+    unique = []
+    for q in questions:
+        key = re.sub(r"\W+", " ", q["question_text"]).strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(q)
+    return unique
+
+def _is_viable(questions: List[Dict]) -> bool:
+    counts = Counter(q["question_type"] for q in questions)
+    return all(counts[question_type] >= MIN_QUESTIONS_PER_TYPE for question_type in {band[0] for band in QUESTION_PLAN})
+
+async def start_interview_questions(topic: str, use_cache: bool = True, refresh: bool = False) -> Tuple[List[Dict], List[asyncio.Task]]:
     """
-    Kullanıcının mülakat cevaplarını değerlendirir ve bir rapor oluşturur.
+    Soru üretimini bantlara bölüp eşzamanlı başlatır ve her türden yeterli soru
+    hazır olur olmaz döner. İkinci değer tüm bant görevleridir (bir kısmı hâlâ
+    çalışıyor olabilir); bunlar collect_remaining_questions ile tamamlanmalıdır.
+    Önbellekten gelen setlerde görev listesi boştur.
     """
-    submission_text = ""
-    for i, ans in enumerate(answers, 1):
-        submission_text += f"\n--- Soru {i} ---\n"
-        submission_text += f"Soru: {ans.get('question_text', 'N/A')}\n"
-        submission_text += f"Adayın Cevabı:\n```\n{ans.get('user_answer', 'Cevap verilmedi.')}\n```\n"
+    cache_key = cache.make_key("interview", PROMPT_VERSION, llm_gateway.DEFAULT_MODEL, topic)
+    if use_cache and not refresh:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached, []
 
-    prompt = f"""
-    Sen, "{topic}" konusunda uzman, deneyimli bir teknik mülakatçı ve işe alım yöneticisisin.
-    Adayın adı **{username}**. Mülakat Değerlendirme Raporu'nu aşağıda verilen katı formata göre, Markdown kullanarak ve Türkçe olarak oluştur.
+    tasks = [
+        asyncio.create_task(_generate_question_band(topic, question_type, difficulty, count))
+        for question_type, difficulty, count in QUESTION_PLAN
+    ]
+    pending = set(tasks)
+    questions: List[Dict] = []
+    seen: Set[str] = set()
+    try:
+        while pending and not _is_viable(questions):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                questions += _dedupe(_band_result(task), seen)
+    except asyncio.CancelledError:
+        for task in pending:
+            task.cancel()
+        raise
 
-    ---
-    ### Mülakat Değerlendirme Raporu
-    **Aday:** {username}
-    **Pozisyon:** Junior Software Developer ({topic})
+    if not questions:
+        raise HTTPException(status_code=500, detail="AI failed to generate a valid interview.")
+    return questions, tasks
+
+async def collect_remaining_questions(
+    topic: str,
+    questions: List[Dict],
+    tasks: List[asyncio.Task],
+    use_cache: bool = True,
+) -> AsyncIterator[List[Dict]]:
+    """
+    Bant görevlerini tamamlandıkça toplar ve mevcut sorularla çakışmayan yeni
+    soruları parti parti üretir. Tüm bantlar başarılıysa tam seti önbelleğe yazar.
+    """
+    if not tasks:
+        return
+    seen: Set[str] = set()
+    _dedupe(questions, seen)
+    all_questions = list(questions)
+    failed = False
+    for task in asyncio.as_completed(tasks):
+        try:
+            batch = await task
+        except Exception as e:
+            print(f"Interview question band failed: {e}")
+            failed = True
+            continue
+        batch = _dedupe(batch, seen)
+        if batch:
+            all_questions += batch
+            yield batch
 
-    ### 1. Genel Değerlendirme
-    *Buraya adayın performansı hakkında 2-3 cümlelik bir özet yaz.*
+    if use_cache and not failed:
+        cache_key = cache.make_key("interview", PROMPT_VERSION, llm_gateway.DEFAULT_MODEL, topic)
+        await cache.put(cache_key, all_questions)
 
-    ### 2. Güçlü Yönler
-    - **[Güçlü Yön Başlığı]:** *Buraya spesifik ve olumlu bir geri bildirim yaz.*
-    - **[Başka Bir Güçlü Yön]:** *Buraya spesifik ve olumlu bir geri bildirim daha yaz.*
+def build_items(questions: List[Dict], answers: List[Dict]) -> List[Dict]:
+    """
+    Cevapları grading_service'in puanlayacağı bağımsız maddelere dönüştürür. Soru metni ve
+    türü istemciden değil, oturumda saklanan sorulardan (aynı sıradaki) alınır.
+    """
+    items = []
+    for i, ans in enumerate(answers):
+        question = questions[i] if i < len(questions) else {}
+        items.append({
+            "kind": question.get("question_type") or "theory",
+            "question": question.get("question_text") or ans.get("question_text", ""),
+            "answer": ans.get("user_answer") or "",
+        })
+    return items
 
-    ### 3. Geliştirilebilecek Alanlar
-    - **[Geliştirilecek Alan Başlığı]:** *Buraya yapıcı ve spesifik bir eleştiri yaz. Nasıl daha iyi olabileceğini açıkla.*
-    - **[Başka Bir Geliştirilecek Alan]:** *Buraya yapıcı ve spesifik bir eleştiri daha yaz.*
+def build_report(topic: str, username: str, grades: List[Dict], score: int) -> str:
+    """Soru bazlı notlardan Markdown formatında Mülakat Değerlendirme Raporu'nu oluşturur."""
+    theory = [g for g in grades if g["kind"] == "theory"]
+    coding = [g for g in grades if g["kind"] == "live_coding"]
+    strong = [(i, g) for i, g in enumerate(grades, 1) if g["score"] >= STRONG_ANSWER_SCORE]
+    weak = [(i, g) for i, g in enumerate(grades, 1) if g["score"] < STRONG_ANSWER_SCORE]
 
-    ### 4. Sonuç ve Öneri
-    **İşe Alınabilirlik:** **[Yüzde Belirt, örn: 75%]**
-    **Final Puanı:** **[100 Üzerinden Puan Ver, örn: 78/100]**
-    ---
+    lines = [
+        "### Mülakat Değerlendirme Raporu",
+        f"**Aday:** {username}",
+        f"**Pozisyon:** Junior Software Developer ({topic})",
+        "",
+        "### 1. Genel Değerlendirme",
+        f"Aday, teorik sorularda {_average(theory)}/10, canlı kodlama sorularında {_average(coding)}/10 ortalama puan aldı.",
+        "",
+        "### 2. Güçlü Yönler",
+    ]
+    lines += [f"- **Soru {i}:** **{g['score']}/10** - {g['feedback']}" for i, g in strong] or ["- Belirgin bir güçlü yön tespit edilmedi."]
+    lines += ["", "### 3. Geliştirilebilecek Alanlar"]
+    lines += [f"- **Soru {i}:** **{g['score']}/10** - {g['feedback']}" for i, g in weak] or ["- Belirgin bir eksik tespit edilmedi."]
+    lines += [
+        "",
+        "### 4. Sonuç",
+        f"**Final Puanı:** **{score}/100**",
+    ]
+    return "\n".join(lines)
 
-    Yukarıdaki şablonu kullanarak, adayın cevaplarını analiz et ve raporu doldur:
-    {submission_text}
+def _average(grades: List[Dict]) -> str:
+    if not grades:
+        return "-"
+    return f"{sum(g['score'] for g in grades) / len(grades):.1f}"
+
+async def evaluate_interview_submission(
+    topic: str,
+    questions: List[Dict],
+    answers: List[Dict],
+    username: str,
+    previous_grades: Optional[Dict[str, Dict]] = None,
+    on_grade: Optional[Callable[[str, Dict], Awaitable[None]]] = None,
+) -> Tuple[str, int, List[Dict]]:
+    """
+    Her cevabı eşzamanlı olarak puanlar; toplam puanı ve raporu kodda hesaplar.
+    (rapor, 100 üzerinden puan, soru bazlı notlar) döndürür.
     """
     try:
-        response = await run_in_threadpool(model.generate_content, prompt)
-        return response.text.strip()
+        grades = await grading_service.grade_items(topic, build_items(questions, answers), previous_grades, on_grade)
     except Exception as e:
         print(f"Error in interview evaluation service: {e}")
-        raise HTTPException(status_code=500, detail="Failed to evaluate the interview submission.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to evaluate the interview submission.")
+    score = grading_service.aggregate_score(grades)
+    return build_report(topic, username, grades, score), score, grades
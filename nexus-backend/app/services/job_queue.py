@@ -0,0 +1,178 @@
+import asyncio
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..config import settings
+from ..database import job_collection
+
+# MongoDB üzerinde çalışan basit bir iş kuyruğu. İşler "queued" durumunda eklenir,
+# worker'lar find_one_and_update ile atomik olarak sahiplenir ("running") ve bir
+# kira süresi (lease) boyunca tutar. Süresi dolan kiralar, çöken worker'ların işleri
+# yeniden alınabilsin diye tekrar sahiplenilebilir. Hata alan işler üstel geri
+# çekilme ile yeniden denenir.
+#
+# Her sahiplenme işe yeni bir kilit belirteci (lockedBy) yazar. İşleyici çalıştığı
+# sürece kira düzenli aralıklarla uzatılır; sonuç da sadece kilit hâlâ bu worker'daysa
+# yazılır. Böylece kirası dolup başka bir worker'a geçen bir işin eski sahibi yeni
+# denemenin durumunu ezmez.
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+_handlers: Dict[str, JobHandler] = {}
+
+def register(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Bir iş türü için işleyici kaydeden dekoratör."""
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return decorator
+
+async def enqueue(kind: str, payload: Dict[str, Any], idempotency_key: str, owner_id: Optional[str] = None) -> Dict:
+    """
+    Yeni bir iş ekler. Aynı idempotency anahtarıyla daha önce eklenmiş bir iş varsa
+    yenisi eklenmez, mevcut iş döner; böylece çift gönderimler LLM'e iki kez gitmez.
+    Kalıcı olarak başarısız olmuş işler yeni payload ile yeniden kuyruğa alınır.
+    """
+    now = datetime.utcnow()
+    job = {
+        "kind": kind,
+        "payload": payload,
+        "idempotencyKey": idempotency_key,
+        "ownerId": owner_id,
+        "status": "queued",
+        "attempts": 0,
+        "runAt": now,
+        "lockedUntil": None,
+        "lockedBy": None,
+        "error": None,
+        "result": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    try:
+        result = await job_collection.insert_one(job)
+        job["_id"] = result.inserted_id
+        return job
+    except DuplicateKeyError:
+        pass
+
+    requeued = await job_collection.find_one_and_update(
+        {"idempotencyKey": idempotency_key, "status": "failed"},
+        {"$set": {
+            "payload": payload, "status": "queued", "attempts": 0, "runAt": now,
+            "lockedUntil": None, "lockedBy": None, "error": None, "updated_at": now,
+        }},
+        return_document=ReturnDocument.AFTER,
+    )
+    if requeued:
+        return requeued
+    return await job_collection.find_one({"idempotencyKey": idempotency_key})
+
+async def find_by_idempotency_key(idempotency_key: str) -> Optional[Dict]:
+    return await job_collection.find_one({"idempotencyKey": idempotency_key}, {"payload": 0})
+
+async def get_job(job_id: str, owner_id: Optional[str] = None) -> Optional[Dict]:
+    if not ObjectId.is_valid(job_id):
+        return None
+    query: Dict[str, Any] = {"_id": ObjectId(job_id)}
+    if owner_id is not None:
+        query["ownerId"] = owner_id
+    return await job_collection.find_one(query, {"payload": 0})
+
+async def _claim_next() -> Optional[Dict]:
+    now = datetime.utcnow()
+    return await job_collection.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "runAt": {"$lte": now}},
+            {"status": "running", "lockedUntil": {"$lte": now}},
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "lockedUntil": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                "lockedBy": uuid.uuid4().hex,
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("runAt", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+def _lease_filter(job: Dict) -> Dict[str, Any]:
+    return {"_id": job["_id"], "status": "running", "lockedBy": job["lockedBy"]}
+
+async def _heartbeat(job: Dict) -> None:
+    """İşleyici çalıştığı sürece kirayı uzatır; kira başka bir worker'a geçtiyse durur."""
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        now = datetime.utcnow()
+        try:
+            result = await job_collection.update_one(
+                _lease_filter(job),
+                {"$set": {"lockedUntil": now + timedelta(seconds=settings.JOB_LEASE_SECONDS)}},
+            )
+        except Exception:
+            traceback.print_exc()
+            continue
+        if result.matched_count == 0:
+            print(f"Lost lease on job {job['_id']}; its result will be discarded.")
+            return
+
+async def _finish(job: Dict, update: Dict[str, Any]) -> None:
+    """Sonucu sadece kira hâlâ bu worker'daysa yazar."""
+    update = {**update, "lockedUntil": None, "lockedBy": None, "updated_at": datetime.utcnow()}
+    result = await job_collection.update_one(_lease_filter(job), {"$set": update})
+    if result.matched_count == 0:
+        print(f"Job {job['_id']} was reclaimed by another worker; discarding this attempt's outcome.")
+
+async def _run(job: Dict) -> None:
+    handler = _handlers.get(job["kind"])
+    heartbeat = asyncio.create_task(_heartbeat(job))
+    try:
+        if handler is None:
+            raise RuntimeError(f"No handler registered for job kind '{job['kind']}'.")
+        result = await handler(job["payload"])
+    except Exception as e:
+        traceback.print_exc()
+        if job["attempts"] >= settings.JOB_MAX_ATTEMPTS:
+            update = {"status": "failed", "error": str(e)}
+        else:
+            delay = settings.JOB_RETRY_BASE_SECONDS * (2 ** (job["attempts"] - 1))
+            update = {
+                "status": "queued", "error": str(e),
+                "runAt": datetime.utcnow() + timedelta(seconds=delay),
+            }
+        await _finish(job, update)
+        return
+    finally:
+        heartbeat.cancel()
+
+    await _finish(job, {"status": "succeeded", "result": result, "error": None})
+
+async def _worker_loop(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            job = await _claim_next()
+        except Exception:
+            traceback.print_exc()
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await _run(job)
+
+async def run_workers(stop: asyncio.Event, concurrency: Optional[int] = None) -> None:
+    """`stop` işaretlenene kadar `concurrency` adet eşzamanlı worker döngüsü çalıştırır."""
+    concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+    await asyncio.gather(*(_worker_loop(stop) for _ in range(concurrency)))
@@ -0,0 +1,96 @@
+import asyncio
+import google.generativeai as genai
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..config import settings
+
+# Tüm servisler Gemini'ye bu modül üzerinden erişir. Eşzamanlılık limiti ve
+# zaman aşımı tek bir yerden ayarlanır; çağrılar native async istemciyle
+# yapıldığı için Starlette'in threadpool'unu işgal etmez.
+
+genai.configure(api_key=settings.GEMINI_API_KEY)
+
+DEFAULT_MODEL = settings.GEMINI_MODEL_NAME
+
+_models: Dict[str, genai.GenerativeModel] = {}
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+def get_model(model_name: str = DEFAULT_MODEL) -> genai.GenerativeModel:
+    model = _models.get(model_name)
+    if model is None:
+        model = genai.GenerativeModel(model_name=model_name)
+        _models[model_name] = model
+    return model
+
+def _get_semaphore(model_name: str) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(model_name)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        _semaphores[model_name] = semaphore
+    return semaphore
+
+async def generate(
+    contents: Any,
+    model_name: str = DEFAULT_MODEL,
+    timeout: Optional[float] = None,
+    response_schema: Optional[Dict] = None,
+) -> str:
+    """
+    Tek seferlik bir içerik üretimi yapar ve modelin ham metin yanıtını döndürür.
+    `response_schema` verilirse model bu şemaya uyan bir JSON döndürmeye zorlanır.
+    Zaman aşımında asyncio.TimeoutError fırlatılır.
+    """
+    model = get_model(model_name)
+    generation_config = None
+    if response_schema is not None:
+        generation_config = {"response_mime_type": "application/json", "response_schema": response_schema}
+    async with _get_semaphore(model_name):
+        response = await asyncio.wait_for(
+            model.generate_content_async(contents, generation_config=generation_config),
+            timeout=timeout or settings.LLM_TIMEOUT_SECONDS,
+        )
+    return response.text
+
+async def chat(history: List[Dict], message: Any, model_name: str = DEFAULT_MODEL, timeout: Optional[float] = None) -> str:
+    """
+    Verilen geçmişle bir sohbet oturumu açar, son mesajı gönderir ve yanıt metnini döndürür.
+    """
+    convo = get_model(model_name).start_chat(history=history)
+    async with _get_semaphore(model_name):
+        response = await asyncio.wait_for(
+            convo.send_message_async(message),
+            timeout=timeout or settings.LLM_TIMEOUT_SECONDS,
+        )
+    return response.text
+
+async def _iterate_stream(response, timeout: float) -> AsyncIterator[str]:
+    iterator = response.__aiter__()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(iterator.__anext__(), timeout=timeout)
+        except StopAsyncIteration:
+            return
+        if chunk.text:
+            yield chunk.text
+
+async def stream_generate(contents: Any, model_name: str = DEFAULT_MODEL, timeout: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    generate() ile aynı, ancak yanıtı parça parça üretir. Zaman aşımı her parça için ayrı uygulanır.
+    """
+    model = get_model(model_name)
+    timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+    async with _get_semaphore(model_name):
+        response = await asyncio.wait_for(model.generate_content_async(contents, stream=True), timeout=timeout)
+        async for text in _iterate_stream(response, timeout):
+            yield text
+
+async def stream_chat(history: List[Dict], message: Any, model_name: str = DEFAULT_MODEL, timeout: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    chat() ile aynı, ancak yanıtı parça parça üretir.
+    """
+    convo = get_model(model_name).start_chat(history=history)
+    timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+    async with _get_semaphore(model_name):
+        response = await asyncio.wait_for(convo.send_message_async(message, stream=True), timeout=timeout)
+        async for text in _iterate_stream(response, timeout):
+            yield text
@@ -0,0 +1,190 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from . import llm_gateway
+
+# Tüm servislerin LLM yanıtlarından JSON çıkardığı ortak ayrıştırıcı. Yanıt sırayla
+# şu adaylara bölünür: ```json blokları, metnin tamamı ve düzyazı içindeki her
+# '{' / '[' ile başlayan değer. Her aday önce doğrudan json.loads ile denenir;
+# olmazsa sondaki virgüller temizlenir ve (yarım kalmış / stream edilen yanıtlar için)
+# açık kalan string ve parantezler kapatılır. Hedef Pydantic tipine uyan ilk aday
+# kazanır. Hiçbiri uymazsa generate_json modele tek bir ucuz "JSON'u düzelt" isteği atar.
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+class JSONExtractionError(ValueError):
+    """Yanıttan hedef tipe uyan bir JSON değeri çıkarılamadı."""
+
+    def __init__(self, message: str, text: str):
+        super().__init__(message)
+        self.text = text
+
+def _strip_trailing_commas(segment: str) -> str:
+    """String'lerin dışındaki `,}` ve `,]` kalıplarından virgülü siler."""
+    if "," not in segment:
+        return segment
+    out: List[str] = []
+    in_string = escaped = False
+    for ch in segment:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "}]":
+            i = len(out) - 1
+            while i >= 0 and out[i].isspace():
+                i -= 1
+            if i >= 0 and out[i] == ",":
+                del out[i]
+        out.append(ch)
+    return "".join(out)
+
+def _scan(text: str, start: int) -> Tuple[Optional[int], str, List[Tuple[int, str]]]:
+    """
+    `start` konumundaki '{' veya '[' ile başlayan değeri tarar. Değer tamamsa (bitiş, "", [])
+    döner; parantezler uyuşmuyorsa (-1, "", []). Yarım kalmışsa (None, kapanış eki, kesme
+    noktaları) döner: kapanış eki metnin sonuna eklenince değeri tamamlar; kesme noktaları
+    ise son tam elemandan sonra kesildiğinde gereken (konum, kapanış eki) çiftleridir.
+    """
+    stack: List[str] = []
+    checkpoints: List[Tuple[int, str]] = []
+    in_string = escaped = False
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(_CLOSERS[ch])
+            checkpoints.append((i + 1, "".join(reversed(stack))))
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                return -1, "", []
+            stack.pop()
+            if not stack:
+                return i + 1, "", []
+        elif ch == ",":
+            checkpoints.append((i, "".join(reversed(stack))))
+        i += 1
+
+    closing = "".join(reversed(stack))
+    if in_string:
+        closing = ("\\" if escaped else "") + '"' + closing
+    return None, closing, checkpoints
+
+def _loads(segment: str) -> Any:
+    try:
+        return json.loads(segment)
+    except json.JSONDecodeError:
+        return json.loads(_strip_trailing_commas(segment))
+
+def _value_candidates(text: str, start: int, scan: Tuple[Optional[int], str, List[Tuple[int, str]]]) -> Iterator[Any]:
+    end, closing, checkpoints = scan
+    if end == -1:
+        return
+    if end is not None:
+        try:
+            yield _loads(text[start:end])
+        except json.JSONDecodeError:
+            pass
+        return
+
+    # Yarım kalmış değer: önce olduğu gibi kapat, sonra geriye doğru son tam elemanlardan kes.
+    # Kesme sonucu boş kalan kapsayıcılar ({} / []) bir şey kurtarmadığı için aday sayılmaz.
+    repairs = [(len(text), closing)] + list(reversed(checkpoints))
+    for cut, cut_closing in repairs:
+        try:
+            value = _loads(text[start:cut].rstrip().rstrip(",") + cut_closing)
+        except json.JSONDecodeError:
+            continue
+        if value:
+            yield value
+
+def iter_json_candidates(text: str) -> Iterator[Any]:
+    """Yanıttaki olası JSON değerlerini en olası olandan başlayarak üretir."""
+    sources = [m.group(1) for m in _FENCE_RE.finditer(text) if m.group(1).strip()]
+    sources.append(text)
+    for source in sources:
+        stripped = source.strip().lstrip("﻿")
+        try:
+            yield json.loads(stripped)
+            continue
+        except json.JSONDecodeError:
+            pass
+        # Düzyazı içindeki değerler; tam bir değerin içine düşen başlangıçlar atlanır,
+        # yarım kalan değer ise metnin sonuna kadar uzandığından taramayı bitirir.
+        position = 0
+        while True:
+            starts = [i for i in (stripped.find("{", position), stripped.find("[", position)) if i != -1]
+            if not starts:
+                break
+            start = min(starts)
+            scan = _scan(stripped, start)
+            yield from _value_candidates(stripped, start, scan)
+            end = scan[0]
+            if end is None:
+                break
+            position = start + 1 if end == -1 else end
+
+@lru_cache(maxsize=None)
+def _adapter(target: Any) -> TypeAdapter:
+    return TypeAdapter(target)
+
+def parse_json(text: str, target: Any = Any) -> Any:
+    """
+    `text` içinden `target` tipine (ör. List[Flashcard]) uyan ilk JSON değerini doğrulayıp
+    sade Python yapıları olarak döndürür. Uyan değer yoksa JSONExtractionError fırlatır.
+    """
+    adapter = _adapter(target)
+    last_error: Optional[Exception] = None
+    for candidate in iter_json_candidates(text):
+        try:
+            validated = adapter.validate_python(candidate)
+        except ValidationError as e:
+            last_error = e
+            continue
+        return adapter.dump_python(validated, exclude_unset=True)
+    detail = f": {last_error}" if last_error else ""
+    raise JSONExtractionError(f"No JSON value matching the expected structure was found{detail}", text)
+
+_FIX_PROMPT = """
+The following text was supposed to be a single valid JSON value but could not be parsed or did not match the expected structure.
+Error: {error}
+
+Return ONLY the corrected JSON value, keeping all of its content. Do not add any explanations or markdown formatting.
+
+{text}
+"""
+
+async def generate_json(prompt: str, target: Any = Any, response_schema: Optional[Dict] = None) -> Any:
+    """
+    LLM'den JSON üretir ve `target` tipine göre doğrular. İlk yanıt ayrıştırılamazsa
+    isteğin tamamını tekrarlamak yerine sadece bozuk metni düzelttiren tek bir deneme yapılır.
+    """
+    response_text = await llm_gateway.generate(prompt, response_schema=response_schema)
+    try:
+        return parse_json(response_text, target)
+    except JSONExtractionError as e:
+        print(f"AI response is not valid JSON, asking for a fix: {e}")
+        fixed_text = await llm_gateway.generate(
+            _FIX_PROMPT.format(error=str(e)[:500], text=response_text),
+            response_schema=response_schema,
+        )
+        return parse_json(fixed_text, target)
@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from ..cache import TTLCache
+from ..database import roadmap_collection
+from . import roadmap_templates
+
+# Node durumu tek bir find_one_and_update ile güncellenir: sahiplik filtrede, yeni durum,
+# completedCount/nodeCount/progress ve availableNodes aynı işlemde bir aggregation
+# pipeline'ı ile sunucuda hesaplanır ve sadece değişen node geri döner. Sayaçlar node'un
+# eski durumuna bağlı olduğu için klasik ($set + arrayFilters) bir güncelleme bunları
+# önceden okumadan hesaplayamaz; pipeline ise okuma + yazmayı atomik olarak birleştirir.
+#
+# Şablon katmanlı (bkz. roadmap_templates) dokümanlarda graf dokümanda değil, bellekteki
+# şablondadır; node listesi pipeline'a sabit olarak verilir. Bir roadmap'in hangi şablona
+# bağlı olduğu hiç değişmediğinden bu bilgi süreç içinde önbelleklenir.
+
+COMPLETED = "completed"
+
+# roadmap_id -> templateId (katmanlı) veya "" (node'ları gömülü)
+_roadmap_templates = TTLCache(maxsize=10_000, ttl=60 * 60)
+
+def _progress(completed: Any, total: Any) -> Dict:
+    return {"$cond": [
+        {"$gt": [total, 0]},
+        {"$toInt": {"$floor": {"$multiply": [{"$divide": [completed, total]}, 100]}}},
+        0,
+    ]}
+
+def _available(nodes: Any, completed: Any) -> Dict:
+    """`nodes` ({nodeId, dependencies}) içinden tamamlanmamış ve bağımlılıkları tamamlanmış olanların id'leri."""
+    return {"$map": {
+        "input": {"$filter": {
+            "input": nodes,
+            "as": "n",
+            "cond": {"$and": [
+                {"$not": [{"$in": ["$$n.nodeId", completed]}]},
+                {"$setIsSubset": [{"$ifNull": ["$$n.dependencies", []]}, completed]},
+            ]},
+        }},
+        "as": "n",
+        "in": "$$n.nodeId",
+    }}
+
+def _embedded_pipeline(node_id: str, status: str) -> List[Dict]:
+    return [
+        {"$set": {"nodes": {"$map": {
+            "input": "$nodes",
+            "in": {"$cond": [
+                {"$eq": ["$$this.nodeId", node_id]},
+                {"$mergeObjects": ["$$this", {"status": status}]},
+                "$$this",
+            ]},
+        }}}},
+        {"$set": {"_completed": {"$map": {
+            "input": {"$filter": {"input": "$nodes", "cond": {"$eq": ["$$this.status", COMPLETED]}}},
+            "in": "$$this.nodeId",
+        }}}},
+        {"$set": {"completedCount": {"$size": "$_completed"}, "nodeCount": {"$size": "$nodes"}}},
+        {"$set": {
+            "progress": _progress("$completedCount", "$nodeCount"),
+            "availableNodes": _available("$nodes", "$_completed"),
+        }},
+        {"$unset": "_completed"},
+    ]
+
+def _overlay_pipeline(template: Dict, node_id: str, status: str) -> List[Dict]:
+    graph = [{"nodeId": n["nodeId"], "dependencies": n.get("dependencies", [])} for n in template["nodes"]]
+    node_ids = [n["nodeId"] for n in graph]
+    return [
+        {"$set": {"nodeStates": {"$mergeObjects": [
+            {"$ifNull": ["$nodeStates", {}]},
+            {"$arrayToObject": {"$literal": [{"k": node_id, "v": {"status": status}}]}},
+        ]}}},
+        {"$set": {"_completed": {"$setIntersection": [
+            {"$literal": node_ids},
+            {"$map": {
+                "input": {"$filter": {"input": {"$objectToArray": "$nodeStates"}, "cond": {"$eq": ["$$this.v.status", COMPLETED]}}},
+                "in": "$$this.k",
+            }},
+        ]}}},
+        {"$set": {"completedCount": {"$size": "$_completed"}, "nodeCount": len(node_ids)}},
+        {"$set": {
+            "progress": _progress("$completedCount", "$nodeCount"),
+            "availableNodes": _available({"$literal": graph}, "$_completed"),
+        }},
+        {"$unset": "_completed"},
+    ]
+
+async def _template_id_of(roadmap_id: str, owner_id: str) -> Optional[str]:
+    template_id = _roadmap_templates.get(roadmap_id)
+    if template_id is None:
+        doc = await roadmap_collection.find_one({"_id": ObjectId(roadmap_id), "ownerId": owner_id}, {"templateId": 1, "nodeStates": 1})
+        if doc is None:
+            return None
+        template_id = doc["templateId"] if roadmap_templates.is_overlay(doc) else ""
+        _roadmap_templates.set(roadmap_id, template_id)
+    return template_id
+
+async def _apply(roadmap_id: str, owner_id: str, node_id: str, status: str, template_id: str) -> Optional[Dict]:
+    query: Dict = {"_id": ObjectId(roadmap_id), "ownerId": owner_id}
+    if not template_id:
+        query["nodes.nodeId"] = node_id
+        updated = await roadmap_collection.find_one_and_update(
+            query, _embedded_pipeline(node_id, status),
+            projection={"nodes": {"$elemMatch": {"nodeId": node_id}}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return updated["nodes"][0] if updated and updated.get("nodes") else None
+
+    template = await roadmap_templates.get_template(template_id)
+    node = next((n for n in (template or {}).get("nodes", []) if n["nodeId"] == node_id), None)
+    if node is None:
+        return None
+    query["nodeStates"] = {"$exists": True}
+    updated = await roadmap_collection.find_one_and_update(
+        query, _overlay_pipeline(template, node_id, status),
+        projection={"_id": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return {**node, "status": status} if updated else None
+
+async def set_node_status(roadmap_id: str, owner_id: str, node_id: str, status: str) -> Optional[Dict]:
+    """
+    Node durumunu günceller ve güncellenmiş node'u döndürür; roadmap kullanıcıya ait değilse
+    veya node yoksa None döner. Sıcak yolda veritabanına tek bir istek gider.
+    """
+    cached = _roadmap_templates.get(roadmap_id) is not None
+    template_id = await _template_id_of(roadmap_id, owner_id)
+    if template_id is None:
+        return None
+    node = await _apply(roadmap_id, owner_id, node_id, status, template_id)
+    if node is None and cached:
+        # Önbellekteki biçim eskimiş olabilir (ör. migrate_enrollments.py çalıştı); bir kez tazeleyip dene.
+        _roadmap_templates.pop(roadmap_id)
+        template_id = await _template_id_of(roadmap_id, owner_id)
+        if template_id is not None:
+            node = await _apply(roadmap_id, owner_id, node_id, status, template_id)
+    return node
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Dict, Optional
+
+from bson import ObjectId
+
+from ..database import assessment_collection, interview_collection, roadmap_collection
+from . import roadmap_templates
+
+# Profil sayfası sadece özet alanları okur: node içerikleri, mülakat geri bildirimleri ve
+# değerlendirme raporları gibi büyüyen alanlar projeksiyonla dışarıda bırakılır ve ayrı
+# uçlardan tek tek çekilir. Her bölüm en yeniden eskiye _id imleciyle sayfalanır; böylece
+# yanıt boyutu ve süresi kullanıcının geçmişiyle değil sayfa boyutuyla orantılıdır.
+
+ROADMAP_SUMMARY_PROJECTION = {"title": 1, "prompt": 1, "type": 1, "templateId": 1, "progress": 1, "completedCount": 1, "nodeCount": 1}
+SESSION_SUMMARY_PROJECTION = {"topic": 1, "score": 1, "completed_at": 1}
+
+async def _page(collection, query: Dict, projection: Dict, after: Optional[str], limit: int) -> Dict:
+    if after is not None:
+        query = {**query, "_id": {"$lt": ObjectId(after)}}
+    docs = await collection.find(query, projection).sort("_id", -1).limit(limit + 1).to_list(length=None)
+    next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+    return {"items": docs[:limit], "next_cursor": next_cursor}
+
+async def roadmaps_page(owner_id: str, after: Optional[str], limit: int) -> Dict:
+    page = await _page(roadmap_collection, {"ownerId": owner_id}, ROADMAP_SUMMARY_PROJECTION, after, limit)
+    await roadmap_templates.fill_titles(page["items"])
+    return page
+
+async def interviews_page(owner_id: str, after: Optional[str], limit: int) -> Dict:
+    return await _page(interview_collection, {"ownerId": owner_id, "status": "completed"}, SESSION_SUMMARY_PROJECTION, after, limit)
+
+async def assessments_page(owner_id: str, after: Optional[str], limit: int) -> Dict:
+    return await _page(assessment_collection, {"ownerId": owner_id, "status": "completed"}, SESSION_SUMMARY_PROJECTION, after, limit)
+
+async def get_profile_sections(owner_id: str, limit: int) -> Dict:
+    """Üç bölümün ilk sayfalarını eşzamanlı olarak çeker."""
+    roadmaps, interviews, assessments = await asyncio.gather(
+        roadmaps_page(owner_id, None, limit),
+        interviews_page(owner_id, None, limit),
+        assessments_page(owner_id, None, limit),
+    )
+    return {"roadmaps": roadmaps, "interviews": interviews, "assessments": assessments}
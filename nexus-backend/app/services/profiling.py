@@ -0,0 +1,156 @@
+import math
+import random
+import string
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..cache import TTLCache
+from ..config import settings
+from . import sandbox, test_vectors
+
+# Gönderilen çözümün girdi boyutuna göre nasıl ölçeklendiğini ölçer. Worker, fonksiyonu
+# SWEEP_SIZES boyutlarındaki girdilerle (aynı sandbox sürecinde, testlerden sonra) zamanlar
+# ve tepe belleği ölçer; burada ölçümlere en küçük kareler ile aday karmaşıklık sınıfları
+# uydurulur ve sonuç referans çözümün aynı girdilerdeki ölçümleriyle karşılaştırılır.
+#
+# Girdiler varsayılan olarak fonksiyon imzasından üretilir (bkz. test_vectors.arg_specs);
+# sayılar geniş aralıktan seçilir ki erken çıkışlar (ör. Two Sum'da hemen bulunan çift)
+# ölçümü bozmasın. En kötü durumu rastgele girdilerle yakalanamayan challenge'lar
+# `sweep_input(n)` fonksiyonu tanımlar (ör. Valid Parentheses için iç içe geçerli dizi).
+
+SWEEP_SIZES = [128, 256, 512, 1024, 2048, 4096]
+SWEEP_REPEAT = 3
+# Tek çağrı bu süreyi aşarsa daha büyük boyutlara geçilmez. Toplam bütçe ayrıca CPU limitinin
+# yarısıyla sınırlanır; testler ve vektörler aynı süreçte çalışır.
+SWEEP_CALL_BUDGET_MS = 250
+SWEEP_BUDGET_MS = 1200
+# Karmaşıklık uydurmak için gereken en az ölçüm sayısı.
+MIN_POINTS = 3
+# Tepe bellek bu değerin altındaysa ölçüm gürültüdür; alan karmaşıklığı O(1) sayılır.
+MIN_MEMORY_KB = 1.0
+
+COMPLEXITY_CLASSES: List[Tuple[str, Callable[[float], float]]] = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: n),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n^2)", lambda n: n ** 2),
+    ("O(n^3)", lambda n: n ** 3),
+]
+_RANK = {name: rank for rank, (name, _) in enumerate(COMPLEXITY_CLASSES)}
+
+_reference_sweeps = TTLCache(maxsize=256, ttl=60 * 60)
+
+def _sweep_value(spec: Dict, rng: random.Random, size: int) -> object:
+    if spec["type"] == "list":
+        return [test_vectors.random_value(spec["item"], rng, 3, 10 ** 9) for _ in range(size)]
+    if spec["type"] == "str":
+        alphabet = spec.get("alphabet") or string.ascii_lowercase
+        return "".join(rng.choice(alphabet) for _ in range(size))
+    return test_vectors.random_value(spec, rng, 0, 10 ** 9)
+
+def sweep_job(challenge: Dict) -> Dict:
+    """Worker'a gönderilecek boyut taraması tanımı; aynı challenge için her zaman aynı girdiler."""
+    sweep = {
+        "sizes": SWEEP_SIZES,
+        "repeat": SWEEP_REPEAT,
+        "call_budget_ms": SWEEP_CALL_BUDGET_MS,
+        "budget_ms": min(SWEEP_BUDGET_MS, settings.SANDBOX_CPU_SECONDS * 500),
+    }
+    if challenge.get("sweep_input"):
+        sweep["generator"] = challenge["sweep_input"]
+        return sweep
+    specs = test_vectors.arg_specs(challenge["template_code"], challenge["entrypoint"], challenge.get("tests", []))
+    rng = random.Random(int(test_vectors.reference_hash(challenge)[:8], 16))
+    sweep["inputs"] = [[_sweep_value(spec, rng, size) for spec in specs] for size in SWEEP_SIZES]
+    return sweep
+
+def _least_squares(xs: List[float], ys: List[float]) -> float:
+    """y = a + c*x (c >= 0) uydurmasının ortalama göreli hatası."""
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance if variance else 0.0
+    slope = max(slope, 0.0)
+    intercept = mean_y - slope * mean_x
+    return math.sqrt(sum(((intercept + slope * x - y) / max(y, 1e-9)) ** 2 for x, y in zip(xs, ys)) / len(xs))
+
+def _log_log_slope(sizes: List[int], values: List[float]) -> float:
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(v) for v in values]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+
+def fit(points: List[Dict], field: str) -> Optional[Dict]:
+    """
+    Ölçümlere (size -> field) uyan karmaşıklık sınıfını ve log-log eğimini döndürür. Polinom
+    derecesi eğimden belirlenir; aynı derecedeki iki aday (O(1)/O(log n), O(n)/O(n log n))
+    arasında ise logaritmik çarpanlı sınıf, eğim bunu destekliyor ve en küçük kareler hatası
+    belirgin şekilde daha düşükse seçilir. Yeterli ölçüm yoksa None döner.
+    """
+    if len(points) < MIN_POINTS:
+        return None
+    sizes = [p["size"] for p in points]
+    values = [max(p[field], 1e-6) for p in points]
+    exponent = _log_log_slope(sizes, values)
+    functions = dict(COMPLEXITY_CLASSES)
+
+    def better(candidate: str, baseline: str) -> bool:
+        xs = lambda name: [functions[name](n) for n in sizes]
+        return _least_squares(xs(candidate), values) < 0.8 * _least_squares(xs(baseline), values)
+
+    if exponent < 0.5:
+        complexity = "O(log n)" if exponent >= 0.08 and better("O(log n)", "O(1)") else "O(1)"
+    elif exponent < 1.5:
+        complexity = "O(n log n)" if exponent >= 1.12 and better("O(n log n)", "O(n)") else "O(n)"
+    elif exponent < 2.5:
+        complexity = "O(n^2)"
+    else:
+        complexity = "O(n^3)"
+    return {"complexity": complexity, "exponent": round(exponent, 2)}
+
+def _estimate(sweep: Dict) -> Optional[Dict]:
+    time_fit = fit(sweep["points"], "time_ms")
+    if time_fit is None:
+        return None
+    if max(p["peak_kb"] for p in sweep["points"]) < MIN_MEMORY_KB:
+        space = "O(1)"
+    else:
+        space_fit = fit(sweep["points"], "peak_kb")
+        space = space_fit["complexity"] if space_fit else None
+    return {"time": time_fit["complexity"], "time_exponent": time_fit["exponent"], "space": space}
+
+async def reference_sweep(challenge: Dict, sweep: Dict) -> Optional[Dict]:
+    """Referans çözümün tarama sonuçları; süreç içinde challenge başına bir kez ölçülür."""
+    if not challenge.get("solution_code"):
+        return None
+    key = (str(challenge["_id"]), test_vectors.reference_hash(challenge))
+    cached = _reference_sweeps.get(key)
+    if cached is None:
+        cached = await sandbox.run_sweep(challenge["solution_code"], challenge["entrypoint"], sweep)
+        if cached["error"] is None:
+            _reference_sweeps.set(key, cached)
+    return cached
+
+def build_report(sweep: Dict, reference: Optional[Dict]) -> Dict:
+    """Worker ölçümlerinden ProfileReport biçiminde bir rapor üretir."""
+    estimate = _estimate(sweep)
+    reference_estimate = _estimate(reference) if reference and not reference["error"] else None
+    report = {
+        "points": sweep["points"],
+        "estimate": estimate,
+        "reference": reference_estimate,
+        "reference_points": reference["points"] if reference else [],
+        "verdict": None,
+        "slowdown": None,
+        "error": sweep["error"],
+    }
+    if estimate and reference_estimate:
+        difference = _RANK[estimate["time"]] - _RANK[reference_estimate["time"]]
+        report["verdict"] = "slower" if difference > 0 else "faster" if difference < 0 else "same"
+    reference_times = {p["size"]: p["time_ms"] for p in report["reference_points"]}
+    common = [p for p in sweep["points"] if p["size"] in reference_times]
+    if common:
+        largest = common[-1]
+        report["slowdown"] = round(largest["time_ms"] / max(reference_times[largest["size"]], 1e-6), 2)
+    return report
@@ -0,0 +1,138 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from ..database import flashcard_collection, flashcard_review_collection
+
+# Saklanan kartlar üzerinde SM-2 tabanlı aralıklı tekrar. Her kartın zamanlama durumu
+# (dueAt, interval, ease, reps, lapses) kart dokümanında tutulur; vadesi gelen kartlar
+# (ownerId, dueAt) indeksi üzerinden okunur. Bir tekrar oturumunun tüm cevapları tek
+# bir okuma, tek bir bulk_write ve tek bir log eklemesiyle işlenir.
+#
+# Eşzamanlı oturumlar iyimser kilitle ayrılır: her yazma kartın version alanını artırır
+# ve güncelleme okunan version'a koşulludur. reps bu iş için kullanılamaz; unutulan kartta
+# sıfırlandığından iki oturum aynı değeri görüp birbirinin üzerine yazabilir.
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Bu notun altındaki cevaplar (0-5 ölçeği) unutulmuş sayılır ve kart baştan öğrenilir.
+PASSING_GRADE = 3
+
+SCHEDULE_PROJECTION = {"dueAt": 1, "interval": 1, "ease": 1, "reps": 1, "lapses": 1, "version": 1}
+
+def initial_state(now: datetime) -> Dict:
+    """Yeni bir kartın zamanlama alanları; yeni kartlar hemen tekrar edilebilir."""
+    return {"dueAt": now, "interval": 0.0, "ease": DEFAULT_EASE, "reps": 0, "lapses": 0, "version": 0}
+
+def schedule(card: Dict, grade: int, now: datetime) -> Dict:
+    """SM-2: verilen nota göre kartın yeni zamanlama alanlarını hesaplar."""
+    ease = card.get("ease", DEFAULT_EASE)
+    reps = card.get("reps", 0)
+    lapses = card.get("lapses", 0)
+
+    if grade < PASSING_GRADE:
+        reps = 0
+        lapses += 1
+        interval = 1.0
+    else:
+        if reps == 0:
+            interval = 1.0
+        elif reps == 1:
+            interval = 6.0
+        else:
+            interval = card.get("interval", 1.0) * ease
+        reps += 1
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+    return {
+        "dueAt": now + timedelta(days=interval),
+        "interval": interval,
+        "ease": ease,
+        "reps": reps,
+        "lapses": lapses,
+        "lastReviewedAt": now,
+    }
+
+async def get_due_cards(owner_id: str, limit: int, roadmap_id: Optional[str] = None, now: Optional[datetime] = None) -> List[Dict]:
+    """Vadesi gelmiş kartları en eski vadeden başlayarak döndürür."""
+    query: Dict = {"ownerId": owner_id, "dueAt": {"$lte": now or datetime.utcnow()}}
+    if roadmap_id is not None:
+        query["roadmapId"] = roadmap_id
+    return await flashcard_collection.find(query).sort("dueAt", 1).limit(limit).to_list(length=None)
+
+async def submit_reviews(owner_id: str, reviews: List[Dict]) -> Dict:
+    """
+    Bir tekrar oturumunun cevaplarını ({"card_id", "grade"}) toplu olarak uygular.
+    {"updated": yeni zamanlama durumları, "conflicts": eşzamanlı başka bir oturum
+    tarafından değiştirildiği için uygulanmayan kart id'leri} döndürür. Aynı kart
+    oturumda birden fazla kez tekrar edildiyse cevaplar sırayla uygulanır.
+    """
+    card_ids = list({ObjectId(r["card_id"]) for r in reviews if ObjectId.is_valid(r["card_id"])})
+    cards = {
+        card["_id"]: card
+        async for card in flashcard_collection.find({"_id": {"$in": card_ids}, "ownerId": owner_id}, SCHEDULE_PROJECTION)
+    }
+    if not cards:
+        return {"updated": [], "conflicts": []}
+
+    now = datetime.utcnow()
+    # version alanı eklenmeden önce oluşturulmuş kartlarda alan yoktur; {"version": None} bu kartlarla
+    # da eşleşir ve $inc alanı 1 olarak oluşturur.
+    originals = {card_id: card.pop("version", None) for card_id, card in cards.items()}
+    logs = []
+    for review in reviews:
+        if not ObjectId.is_valid(review["card_id"]):
+            continue
+        card_id = ObjectId(review["card_id"])
+        card = cards.get(card_id)
+        if card is None:
+            continue
+        state = schedule(card, review["grade"], now)
+        logs.append({
+            "ownerId": owner_id,
+            "cardId": card_id,
+            "grade": review["grade"],
+            "reviewedAt": now,
+            "previousInterval": card.get("interval", 0.0),
+            "interval": state["interval"],
+            "ease": state["ease"],
+        })
+        card.update(state)
+
+    # Çakışan kartlar bu oturumda güncellenmez, logları yazılmaz ve yanıtta bildirilir. bulk_write
+    # işlem bazında sonuç vermediğinden, eşleşmeyen güncelleme varsa kartların son yazanı
+    # (lastWriteId) tek bir okumayla kontrol edilir.
+    write_id = uuid.uuid4().hex
+    operations = [
+        UpdateOne(
+            {"_id": card_id, "ownerId": owner_id, "version": originals[card_id]},
+            {
+                "$set": {
+                    **{field: card[field] for field in ("dueAt", "interval", "ease", "reps", "lapses", "lastReviewedAt")},
+                    "lastWriteId": write_id,
+                },
+                "$inc": {"version": 1},
+            },
+        )
+        for card_id, card in cards.items()
+    ]
+    result = await flashcard_collection.bulk_write(operations, ordered=False)
+    conflicts = set()
+    if result.matched_count < len(operations):
+        current = flashcard_collection.find({"_id": {"$in": list(cards)}}, {"version": 1, "lastWriteId": 1})
+        applied = {doc["_id"] async for doc in current if doc.get("lastWriteId") == write_id}
+        conflicts = set(cards) - applied
+
+    logs = [log for log in logs if log["cardId"] not in conflicts]
+    if logs:
+        await flashcard_review_collection.insert_many(logs, ordered=False)
+    return {
+        "updated": [
+            {"_id": card_id, **{k: v for k, v in card.items() if k != "_id"}}
+            for card_id, card in cards.items() if card_id not in conflicts
+        ],
+        "conflicts": [str(card_id) for card_id in cards if card_id in conflicts],
+    }
@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Roadmap'ler, node.dependencies ile tanımlanan yönlü, döngüsüz graflardır (DAG). Bu modül
+# LLM'in ürettiği grafı doğrular/onarır, topolojik sırayı ve derinlik seviyelerini
+# önceden hesaplar ve "açık" (bağımlılıklarının hepsi tamamlanmış, kendisi tamamlanmamış)
+# node kümesini bulur. Tüm fonksiyonlar saftır; veritabanına dokunmaz. Durum değişikliklerinde
+# açık node'lar aynı kuralla sunucu tarafında yeniden hesaplanır (bkz. node_status_service).
+
+COMPLETED = "completed"
+
+def repair(nodes: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """
+    Node listesini geçerli bir DAG'a dönüştürür ve yapılan düzeltmeleri açıklayan mesajları döndürür:
+    boş/tekrarlanan nodeId'ler yeniden adlandırılır, var olmayan ve kendine olan bağımlılıklar
+    ile tekrarlanan bağımlılıklar silinir, döngüler liste sırasına göre geriye dönen kenar
+    kaldırılarak kırılır.
+    """
+    issues: List[str] = []
+    repaired: List[Dict] = []
+    seen: Set[str] = set()
+    for index, node in enumerate(nodes):
+        node = dict(node)
+        node_id = str(node.get("nodeId") or "").strip() or f"node_{index + 1}"
+        if node_id in seen:
+            new_id = node_id
+            suffix = 2
+            while new_id in seen:
+                new_id = f"{node_id}_{suffix}"
+                suffix += 1
+            issues.append(f"duplicate nodeId '{node_id}' renamed to '{new_id}'")
+            node_id = new_id
+        seen.add(node_id)
+        node["nodeId"] = node_id
+        node["dependencies"] = [str(dep) for dep in (node.get("dependencies") or [])]
+        repaired.append(node)
+
+    for node in repaired:
+        kept: List[str] = []
+        for dep in node["dependencies"]:
+            if dep == node["nodeId"]:
+                issues.append(f"self-dependency removed from '{dep}'")
+            elif dep not in seen:
+                issues.append(f"dangling dependency '{dep}' removed from '{node['nodeId']}'")
+            elif dep in kept:
+                issues.append(f"duplicate dependency '{dep}' removed from '{node['nodeId']}'")
+            else:
+                kept.append(dep)
+        node["dependencies"] = kept
+
+    # Döngü kırma: bağımlılıklar boyunca DFS; yığında olan bir node'a dönen kenar döngü demektir.
+    by_id = {node["nodeId"]: node for node in repaired}
+    state: Dict[str, int] = {}  # 1: yığında, 2: bitti
+    for root in repaired:
+        if root["nodeId"] in state:
+            continue
+        state[root["nodeId"]] = 1
+        stack = [(root["nodeId"], 0)]
+        while stack:
+            node_id, position = stack[-1]
+            deps = by_id[node_id]["dependencies"]
+            if position >= len(deps):
+                state[node_id] = 2
+                stack.pop()
+                continue
+            stack[-1] = (node_id, position + 1)
+            dep = deps[position]
+            if state.get(dep) == 1:
+                deps.pop(position)
+                stack[-1] = (node_id, position)
+                issues.append(f"cyclic dependency '{dep}' removed from '{node_id}'")
+            elif dep not in state:
+                state[dep] = 1
+                stack.append((dep, 0))
+    return repaired, issues
+
+def dependents_of(nodes: Iterable[Dict]) -> Dict[str, List[str]]:
+    dependents: Dict[str, List[str]] = {}
+    for node in nodes:
+        dependents.setdefault(node["nodeId"], [])
+        for dep in node.get("dependencies", []):
+            dependents.setdefault(dep, []).append(node["nodeId"])
+    return dependents
+
+def analyze(nodes: List[Dict]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Geçerli bir DAG için (topolojik sıra, derinlik seviyeleri) döndürür. Sıra, aynı seviyedeki
+    node'lar arasında liste sırasını korur; seviye, en uzun bağımlılık zincirinin uzunluğudur.
+    """
+    dependents = dependents_of(nodes)
+    remaining = {node["nodeId"]: len(node.get("dependencies", [])) for node in nodes}
+    levels: Dict[str, int] = {}
+    position = {node["nodeId"]: i for i, node in enumerate(nodes)}
+    by_id = {node["nodeId"]: node for node in nodes}
+
+    frontier = [node["nodeId"] for node in nodes if remaining[node["nodeId"]] == 0]
+    order: List[str] = []
+    while frontier:
+        next_frontier: List[str] = []
+        for node_id in frontier:
+            deps = by_id[node_id].get("dependencies", [])
+            levels[node_id] = 1 + max(levels[dep] for dep in deps) if deps else 0
+            order.append(node_id)
+            for child in dependents[node_id]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    next_frontier.append(child)
+        frontier = sorted(next_frontier, key=position.__getitem__)
+    if len(order) != len(nodes):
+        raise ValueError("Roadmap graph contains a cycle; call repair() first.")
+    return order, levels
+
+def available_nodes(nodes: List[Dict], statuses: Dict[str, str]) -> List[str]:
+    """Tamamlanmamış ve tüm bağımlılıkları tamamlanmış node'lar (liste sırasıyla)."""
+    return [
+        node["nodeId"] for node in nodes
+        if statuses.get(node["nodeId"]) != COMPLETED
+        and all(statuses.get(dep) == COMPLETED for dep in node.get("dependencies", []))
+    ]
+
+def describe(nodes: List[Dict]) -> Dict:
+    """
+    Saklanan bir roadmap'in graf alanlarını (topoOrder, levels, availableNodes) hesaplar.
+    Bu alanlar olmadan kaydedilmiş eski dokümanlar için kullanılır; analiz onarılmış bir
+    kopya üzerinde yapılır, saklanan node'lar değiştirilmez.
+    """
+    repaired, _ = repair(nodes)
+    order, levels = analyze(repaired)
+    statuses = {node["nodeId"]: node.get("status") for node in repaired}
+    return {"topoOrder": order, "levels": levels, "availableNodes": available_nodes(repaired, statuses)}
@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+
+from ..cache import TTLCache
+from ..config import settings
+from ..database import roadmap_collection
+from . import roadmap_graph
+
+# Önerilen (suggested) roadmap'lere kayıt kopyalama yapmadan tutulur: kişisel doküman
+# sadece templateId'yi, sayaçları ve sadece değişen node'ların durumunu içeren seyrek
+# bir nodeStates katmanını saklar ({"<nodeId>": {"status": ...}}). Okurken şablon
+# (bellekte önbelleklenmiş haliyle) ile birleştirilir; böylece şablon içeriğindeki
+# düzeltmeler tüm kayıtlı kullanıcılara kendiliğinden yansır. Sohbet geçmişi zaten
+# (roadmapId, nodeId) ile ayrı koleksiyonda tutulduğu için katmanda bir işaretçi gerekmez.
+
+DEFAULT_STATUS = "not_started"
+
+TEMPLATE_PROJECTION = {"title": 1, "prompt": 1, "nodes": 1, "topoOrder": 1, "levels": 1}
+
+_templates = TTLCache(maxsize=64, ttl=settings.TEMPLATE_CACHE_TTL_SECONDS)
+
+def is_overlay(roadmap: Dict) -> bool:
+    """Doküman şablon + durum katmanı biçiminde mi (yoksa node'ları gömülü mü)?"""
+    return "nodeStates" in roadmap
+
+async def get_template(template_id: str) -> Optional[Dict]:
+    template = _templates.get(template_id)
+    if template is not None:
+        return template
+    if not ObjectId.is_valid(template_id):
+        return None
+    template = await roadmap_collection.find_one({"_id": ObjectId(template_id), "type": "suggested"}, TEMPLATE_PROJECTION)
+    if template is not None:
+        if "topoOrder" not in template:
+            graph = roadmap_graph.describe(template.get("nodes", []))
+            template.update(topoOrder=graph["topoOrder"], levels=graph["levels"])
+        _templates.set(template_id, template)
+    return template
+
+def invalidate(template_id: Optional[str] = None) -> None:
+    if template_id is None:
+        _templates.clear()
+    else:
+        _templates.pop(template_id)
+
+def node_status(roadmap: Dict, node_id: str) -> str:
+    return roadmap.get("nodeStates", {}).get(node_id, {}).get("status", DEFAULT_STATUS)
+
+def merge(roadmap: Dict, template: Optional[Dict]) -> Dict:
+    """Katman dokümanını şablonla birleştirip node'ları gömülü bir roadmap dokümanı döndürür."""
+    merged = dict(roadmap)
+    merged.pop("nodeStates", None)
+    if template is None:
+        # Şablon silinmişse roadmap boş görünür ama erişilebilir kalır (silinebilsin diye).
+        merged.setdefault("title", "Removed roadmap")
+        merged["nodes"] = []
+        return merged
+    merged.setdefault("title", template["title"])
+    merged.setdefault("prompt", template.get("prompt"))
+    merged["nodes"] = [
+        {**node, "status": node_status(roadmap, node["nodeId"])}
+        for node in template.get("nodes", [])
+    ]
+    # Sıra ve seviyeler şablona aittir; açık node'lar ise kayda özeldir ve dokümanda saklanır.
+    merged["topoOrder"] = template["topoOrder"]
+    merged["levels"] = template["levels"]
+    return merged
+
+def _with_graph(roadmap: Dict) -> Dict:
+    if "availableNodes" not in roadmap or "topoOrder" not in roadmap:
+        graph = roadmap_graph.describe(roadmap.get("nodes", []))
+        for field, value in graph.items():
+            roadmap.setdefault(field, value)
+    return roadmap
+
+async def materialize(roadmap: Dict) -> Dict:
+    if is_overlay(roadmap):
+        roadmap = merge(roadmap, await get_template(roadmap["templateId"]))
+    return _with_graph(roadmap)
+
+async def materialize_many(roadmaps: List[Dict]) -> List[Dict]:
+    templates = {}
+    for template_id in {r["templateId"] for r in roadmaps if is_overlay(r)}:
+        templates[template_id] = await get_template(template_id)
+    return [_with_graph(merge(r, templates[r["templateId"]]) if is_overlay(r) else r) for r in roadmaps]
+
+async def fill_titles(summaries: List[Dict]) -> List[Dict]:
+    """Başlık saklamayan kayıt dokümanlarının özetlerine şablon başlığını ekler."""
+    for summary in summaries:
+        if "title" not in summary and summary.get("templateId"):
+            template = await get_template(summary["templateId"])
+            summary["title"] = template["title"] if template else "Removed roadmap"
+    return summaries
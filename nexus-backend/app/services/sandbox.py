@@ -0,0 +1,315 @@
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..config import settings
+
+# Kullanıcı kodunu yerel, kaynak sınırlı Python süreçlerinde çalıştıran havuz. Yorumlayıcı
+# başlatma maliyeti istek yolunun dışında kalsın diye SANDBOX_WORKERS kadar worker önceden
+# başlatılıp "ready" durumunda bekletilir. Her worker tek bir işi çalıştırıp çıkar ve
+# yerine arka planda yenisi başlatılır; böylece kullanıcı kodu kalıcı bir süreçte durum
+# bırakamaz. Limitler ve izinler için bkz. sandbox_worker.py.
+#
+# Worker kullanıcı koduyla aynı süreçte çalıştığından mesajlarına güvenilmez: worker'a
+# beklenen değerler gönderilmez, sadece ürettiği çıktılar alınır ve burada karşılaştırılır.
+# Geçersiz veya tekrarlanan index'li mesajlar yok sayılır.
+
+WORKER_SCRIPT = Path(__file__).with_name("sandbox_worker.py")
+SPAWN_TIMEOUT_SECONDS = 10.0
+# Worker'dan okunan tek satırın üst sınırı (worker çıktıları 256 KB ile sınırlar); aşılırsa süreç sonlandırılır.
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+class SandboxPool:
+    def __init__(self, size: int):
+        self._size = size
+        self._ready: "asyncio.Queue[asyncio.subprocess.Process]" = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)
+        self._workdir: Optional[str] = None
+        self._refills: set = set()
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        if self._workdir is None:
+            self._workdir = tempfile.mkdtemp(prefix="nexus-sandbox-")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-I", "-S", str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env={},
+            cwd=self._workdir,
+            start_new_session=True,
+            limit=MAX_MESSAGE_BYTES,
+        )
+        try:
+            line = await asyncio.wait_for(process.stdout.readline(), SPAWN_TIMEOUT_SECONDS)
+            if json.loads(line or b"{}").get("event") != "ready":
+                raise RuntimeError("sandbox worker did not start")
+        except BaseException:
+            _kill(process)
+            await process.wait()
+            raise
+        return process
+
+    async def _refill(self) -> None:
+        try:
+            if self._ready.qsize() < self._size:
+                self._ready.put_nowait(await self._spawn())
+        except Exception as e:
+            print(f"[sandbox] could not spawn worker: {e}")
+
+    def _schedule_refill(self) -> None:
+        task = asyncio.create_task(self._refill())
+        self._refills.add(task)
+        task.add_done_callback(self._refills.discard)
+
+    async def start(self) -> None:
+        """Havuzu ön ısıtır; çağrılmazsa worker'lar ilk işte başlatılır."""
+        await asyncio.gather(*(self._refill() for _ in range(self._size - self._ready.qsize())))
+
+    async def close(self) -> None:
+        for task in list(self._refills):
+            task.cancel()
+        while not self._ready.empty():
+            process = self._ready.get_nowait()
+            _kill(process)
+            await process.wait()
+
+    async def _take(self) -> asyncio.subprocess.Process:
+        while not self._ready.empty():
+            process = self._ready.get_nowait()
+            if process.returncode is None:
+                return process
+        return await self._spawn()
+
+    async def execute(self, job: Dict, wall_seconds: float) -> Dict:
+        """
+        İşi bir worker'da çalıştırır. Dönüş: {"events": [worker mesajları], "timed_out": bool,
+        "returncode": int}. Süre aşımında süreç grubu öldürülür; o ana kadar gelen mesajlar döner.
+        """
+        async with self._slots:
+            process = await self._take()
+            self._schedule_refill()
+            events: List[Dict] = []
+            timed_out = False
+            deadline = time.monotonic() + wall_seconds
+            try:
+                process.stdin.write(json.dumps(job).encode() + b"\n")
+                await process.stdin.drain()
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    try:
+                        line = await asyncio.wait_for(process.stdout.readline(), remaining)
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                        break
+                    except ValueError:
+                        break
+                    if not line:
+                        break
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(event, dict):
+                        continue
+                    events.append(event)
+                    if event.get("event") in ("done", "error"):
+                        break
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                _kill(process)
+                await process.wait()
+            return {"events": events, "timed_out": timed_out, "returncode": process.returncode}
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+def _job(mode: str, code: str, entrypoint: str, tests: List, compare: str, **extra) -> Dict:
+    return {
+        "mode": mode,
+        "code": code,
+        "entrypoint": entrypoint,
+        "tests": tests,
+        "compare": compare,
+        "cpu_seconds": settings.SANDBOX_CPU_SECONDS,
+        "memory_mb": settings.SANDBOX_MEMORY_MB,
+        **extra,
+    }
+
+pool = SandboxPool(settings.SANDBOX_WORKERS)
+
+def _equal(actual, expected) -> bool:
+    if isinstance(expected, float) or isinstance(actual, float):
+        return (
+            isinstance(actual, (int, float)) and isinstance(expected, (int, float))
+            and not isinstance(actual, bool)
+            and (actual == expected or math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9))
+        )
+    if isinstance(expected, list):
+        return isinstance(actual, list) and len(actual) == len(expected) and all(map(_equal, actual, expected))
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and actual.keys() == expected.keys() and all(_equal(actual[k], expected[k]) for k in expected)
+    return type(actual) is type(expected) and actual == expected
+
+def matches(compare: str, output, expected) -> bool:
+    """Worker'ın bildirdiği (normalize edilmiş) çıktıyı beklenen değerle karşılaştırır."""
+    if compare == "unordered" and isinstance(output, list) and isinstance(expected, list):
+        return _equal(sorted(output, key=repr), sorted(expected, key=repr))
+    return _equal(output, expected)
+
+def _indexed(events: List[Dict], key: str, count: int) -> Dict[int, Dict]:
+    """0 <= index < count olan ilk mesajlar; sahte veya tekrarlanan mesajlar atlanır."""
+    results: Dict[int, Dict] = {}
+    for event in events:
+        index = event.get(key)
+        if type(index) is int and 0 <= index < count and index not in results and event.get("status") in ("ok", "error"):
+            results[index] = event
+    return results
+
+def _test_result(index: int, event: Dict, compare: str, expected) -> Dict:
+    time_ms = event.get("time_ms")
+    result = {"index": index, "time_ms": float(time_ms) if isinstance(time_ms, (int, float)) else None}
+    if event["status"] == "error":
+        return {**result, "status": "error", "error": str(event.get("error"))[:500]}
+    try:
+        passed = matches(compare, event.get("output"), expected)
+    except Exception:
+        passed = False
+    return {**result, "status": "passed" if passed else "failed"}
+
+async def run_tests(
+    code: str,
+    entrypoint: str,
+    tests: List[Dict],
+    compare: str = "exact",
+    vectors: Optional[List[Dict]] = None,
+    sweep: Optional[Dict] = None,
+) -> Dict:
+    """
+    Kodu testlere karşı çalıştırır ve RunResult biçiminde bir sözlük döndürür. Testlerin
+    girdileri ve beklenen çıktıları sonuçta yer almaz (gizli testler). `vectors` verilirse
+    (bkz. test_vectors.py) aynı süreçte testlerden sonra çalıştırılır ve çıktıları burada
+    sırayla karşılaştırılarak ilk uyuşmazlık raporlanır.
+    `sweep` verilirse (bkz. profiling.py) en sonda boyut taraması yapılır ve ölçümler "sweep"
+    anahtarında döner.
+    """
+    start = time.perf_counter()
+    inputs = [test["args"] for test in tests]
+    vectors = vectors or []
+    job = _job("tests", code, entrypoint, inputs, compare, vectors=[v["args"] for v in vectors], sweep=sweep)
+    outcome = await pool.execute(job, settings.SANDBOX_WALL_SECONDS)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    events = outcome["events"]
+    setup_error = next((str(e.get("error")) for e in events if e.get("event") == "error"), None)
+    results = _indexed(events, "index", len(tests))
+    finished = setup_error is not None or any(e.get("event") == "done" for e in events)
+    # CPU limiti aşıldığında çekirdek süreci SIGXCPU ile sonlandırır; bu da bir süre aşımıdır.
+    timed_out = outcome["timed_out"] or outcome["returncode"] == -signal.SIGXCPU
+
+    tests_out = []
+    interrupted = False
+    for index in range(len(tests)):
+        if index in results:
+            tests_out.append(_test_result(index, results[index], compare, tests[index].get("expected")))
+        elif setup_error is not None or finished or interrupted:
+            tests_out.append({"index": index, "status": "skipped"})
+        else:
+            # Sonuç gelmeden biten ilk test, sürecin neden bittiğini taşır.
+            interrupted = True
+            if timed_out:
+                tests_out.append({"index": index, "status": "timeout", "error": "Time limit exceeded."})
+            else:
+                tests_out.append({"index": index, "status": "error", "error": "Process exited unexpectedly (memory limit or crash)."})
+
+    vector_report = None
+    if vectors:
+        vector_report = _vector_report(vectors, _indexed(events, "vector", len(vectors)), compare)
+        if not vector_report["completed"] and timed_out and not interrupted and setup_error is None:
+            interrupted = True
+
+    passed = sum(1 for t in tests_out if t["status"] == "passed")
+    if setup_error is not None:
+        status = "error"
+    elif timed_out and interrupted:
+        status = "timeout"
+    elif passed == len(tests) and (vector_report is None or (vector_report["completed"] and not vector_report["mismatch"])):
+        status = "passed"
+    else:
+        status = "failed"
+    result = {
+        "status": status,
+        "passed": passed,
+        "total": len(tests),
+        "tests": tests_out,
+        "vectors": vector_report,
+        "error": setup_error,
+        "time_ms": elapsed,
+    }
+    if sweep:
+        result["sweep"] = _sweep_outcome(events, setup_error, timed_out)
+    return result
+
+def _vector_report(vectors: List[Dict], results: Dict[int, Dict], compare: str) -> Dict:
+    """Vektörleri sırayla karşılaştırır; ilk uyuşmazlıkta veya ilk eksik sonuçta durur."""
+    report = {"total": len(vectors), "checked": 0, "mismatch": None, "completed": False}
+    for index, vector in enumerate(vectors):
+        event = results.get(index)
+        if event is None:
+            return report
+        report["checked"] = index + 1
+        mismatch = {"index": index, "args": vector["args"], "expected": vector["expected"]}
+        if event["status"] == "error":
+            report.update(mismatch={**mismatch, "error": str(event.get("error"))[:500]}, completed=True)
+            return report
+        try:
+            passed = matches(compare, event.get("output"), vector["expected"])
+        except Exception:
+            passed = False
+        if not passed:
+            report.update(mismatch={**mismatch, "actual": event.get("output")}, completed=True)
+            return report
+    report["completed"] = True
+    return report
+
+def _sweep_outcome(events: List[Dict], setup_error: Optional[str], timed_out: bool) -> Dict:
+    points = [
+        {k: e[k] for k in ("size", "time_ms", "peak_kb")} for e in events
+        if e.get("event") == "sweep" and all(type(e.get(k)) in (int, float) for k in ("size", "time_ms", "peak_kb"))
+    ]
+    error = setup_error or next((str(e.get("error")) for e in events if e.get("event") == "sweep_error"), None)
+    if error is None and timed_out and not any(e.get("event") == "done" for e in events):
+        error = "Time limit exceeded during the size sweep."
+    return {"points": points, "error": error}
+
+async def run_sweep(code: str, entrypoint: str, sweep: Dict) -> Dict:
+    """Sadece boyut taraması (ör. referans çözüm için); {"points", "error"} döndürür."""
+    result = await run_tests(code, entrypoint, [], sweep=sweep)
+    return result["sweep"]
+
+async def run_reference(code: str, entrypoint: str, inputs: List[List], compare: str = "exact") -> List[Dict]:
+    """
+    Referans çözümü girdiler üzerinde çalıştırır ve her girdi için worker mesajını döndürür
+    ({"index", "status": "ok"|"rejected"|"error", "output"?}). Kod bir `precondition`
+    fonksiyonu tanımlıyorsa onu sağlamayan girdiler "rejected" olur.
+    """
+    outcome = await pool.execute(_job("reference", code, entrypoint, inputs, compare), settings.SANDBOX_WALL_SECONDS)
+    setup_error = next((e.get("error") for e in outcome["events"] if e.get("event") == "error"), None)
+    if setup_error is not None:
+        raise ValueError(f"reference solution failed to load: {setup_error}")
+    return [e for e in outcome["events"] if "index" in e]
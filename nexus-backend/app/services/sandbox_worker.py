@@ -0,0 +1,234 @@
+"""
+Sandbox worker süreci. Uygulama tarafından import edilmez; services/sandbox.py tarafından
+`python -I -S sandbox_worker.py` olarak, boş bir ortam ve geçici bir çalışma dizininde
+başlatılır. Her süreç tek bir iş çalıştırıp çıkar, böylece kullanıcı kodunun bıraktığı
+durum sonraki işlere sızmaz.
+
+Protokol (satır başına bir JSON):
+  worker -> {"event": "ready"}             yorumlayıcı hazır, iş bekleniyor
+  pool   -> {"mode", "code", "entrypoint", "tests", "vectors"?, "sweep"?, "compare", "cpu_seconds", "memory_mb"}
+  worker -> {"index", "status": "ok"|"error", "time_ms", "output"?, "error"?}   mode="tests": her girdi bittikçe
+  worker -> {"vector", "status": "ok"|"error", "time_ms", "output"?, "error"?}   "vectors" verildiyse her vektör için
+  worker -> {"event": "sweep", "size", "time_ms", "peak_kb"}   "sweep" verildiyse her girdi boyutu için
+  worker -> {"event": "sweep_error", "size", "error"}
+  worker -> {"index", "status": "ok"|"rejected"|"error", "output"?}   mode="reference": her girdi için
+  worker -> {"event": "error", "error"}    kod derlenemedi / fonksiyon bulunamadı
+  worker -> {"event": "done"}
+
+Kullanıcı kodu çalışmadan önce kaynak limitleri (CPU, adres alanı, dosya yazma, süreç
+oluşturma) uygulanır ve ağ, süreç, dosya yazma ve standart kütüphane dışındaki dosyaları
+okuma işlemlerini engelleyen bir audit hook kurulur. Audit hook'lar Python içinden
+kaldırılamaz; yine de bu bir konteyner izolasyonunun yerini tutmaz.
+
+Kullanıcı kodu bu süreçteki her şeye (frame'ler, protokol dosya tanımlayıcısı) erişebilir.
+Bu yüzden worker'a testlerin ve vektörlerin sadece girdileri gönderilir ve worker sadece çıktıları bildirir;
+beklenen değerlerle karşılaştırma services/sandbox.py'de, uygulama sürecinde yapılır.
+"""
+import builtins
+import copy
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+MAX_ERROR_CHARS = 500
+# Tek bir çıktı mesajının en büyük boyutu; daha büyük dönüş değerleri hata sayılır.
+MAX_OUTPUT_CHARS = 256 * 1024
+
+_BLOCKED_EVENTS = {
+    "socket.__new__", "socket.connect", "socket.bind", "socket.getaddrinfo", "socket.gethostbyname",
+    "subprocess.Popen", "os.system", "os.exec", "os.posix_spawn", "os.spawn", "os.fork", "os.forkpty",
+    "os.kill", "os.killpg", "os.remove", "os.rename", "os.rmdir", "os.mkdir", "os.chmod", "os.chown",
+    "os.symlink", "os.link", "os.truncate", "os.putenv", "os.unsetenv", "os.chdir", "shutil.rmtree",
+    "ctypes.dlopen", "ctypes.dlsym", "ctypes.cdata", "pty.spawn", "resource.setrlimit",
+    "sys._current_frames", "webbrowser.open",
+}
+_BLOCKED_IMPORTS = {"ctypes", "_ctypes", "_posixsubprocess", "multiprocessing", "_multiprocessing"}
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+class _Discard:
+    """Kullanıcı kodunun print çıktılarını yutar (protokol satırlarını bozmasın diye)."""
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+def _readable_roots():
+    paths = {sys.prefix, sys.base_prefix, sys.exec_prefix, os.path.dirname(os.__file__)}
+    return tuple(os.path.realpath(p) + os.sep for p in paths)
+
+def _install_guard():
+    roots = _readable_roots()
+
+    def hook(event, args):
+        if event in _BLOCKED_EVENTS:
+            raise PermissionError(f"'{event}' is not allowed in the sandbox")
+        if event == "import" and args[0].split(".")[0] in _BLOCKED_IMPORTS:
+            raise PermissionError(f"importing '{args[0]}' is not allowed in the sandbox")
+        if event == "open":
+            path, mode, flags = args
+            writing = (mode is not None and any(c in mode for c in "wax+")) or (mode is None and flags & _WRITE_FLAGS)
+            if writing or not isinstance(path, (str, bytes)):
+                raise PermissionError("file access is not allowed in the sandbox")
+            path = os.path.realpath(os.fsdecode(path))
+            if not path.startswith(roots):
+                raise PermissionError("file access is not allowed in the sandbox")
+
+    sys.addaudithook(hook)
+
+def _limit(cpu_seconds, memory_mb):
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+def _describe(exc):
+    text = f"{type(exc).__name__}: {exc}"
+    return text[:MAX_ERROR_CHARS]
+
+def _normalize(value):
+    """Sonucu JSON ile aynı biçime getirir (tuple -> list, set -> sıralı list)."""
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(v) for v in value), key=repr)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+def _observed(compare, result, args):
+    return _normalize(args[0]) if compare == "inplace" else _normalize(result)
+
+def _output_event(event, compare, result, args):
+    """Dönüş değerini (inplace'te ilk argümanı) JSON'a uygun biçimde mesaja ekler."""
+    output = _observed(compare, result, args)
+    try:
+        size = len(json.dumps(output))
+    except (TypeError, ValueError):
+        return {**event, "status": "error", "error": f"Unsupported return type '{type(result).__name__}'."}
+    if size > MAX_OUTPUT_CHARS:
+        return {**event, "status": "error", "error": "Return value is too large."}
+    return {**event, "status": "ok", "output": output}
+
+def _run_inputs(function, inputs, compare, emit, key="index"):
+    """Fonksiyonu her girdide çalıştırır ve çıktısını bildirir; karşılaştırma yapılmaz."""
+    for index, args in enumerate(inputs):
+        args = copy.deepcopy(args)
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+        except BaseException as e:
+            emit({key: index, "status": "error", "time_ms": (time.perf_counter() - start) * 1000, "error": _describe(e)})
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        emit(_output_event({key: index, "time_ms": elapsed}, compare, result, args))
+
+def _run_sweep(function, sweep, emit):
+    """
+    Fonksiyonu artan girdi boyutlarında zamanlar (en iyi `repeat` ölçüm) ve her boyutta
+    tracemalloc ile bir kez tepe bellek kullanımını ölçer. Tek bir çağrı veya toplam süre
+    bütçeyi aşınca durur. Girdiler ya hazır verilir ya da sweep_input(n) ile üretilir.
+    """
+    generator = None
+    if sweep.get("generator"):
+        scope = {"__name__": "__sweep__", "__builtins__": builtins}
+        exec(compile(sweep["generator"], "<sweep>", "exec"), scope)
+        generator = scope["sweep_input"]
+    spent = 0.0
+    previous = None
+    for position, size in enumerate(sweep["sizes"]):
+        try:
+            args = generator(size) if generator is not None else sweep["inputs"][position]
+            timings = []
+            for _ in range(sweep["repeat"]):
+                call_args = copy.deepcopy(args)
+                start = time.perf_counter()
+                function(*call_args)
+                timings.append(time.perf_counter() - start)
+                if timings[-1] * 1000 > sweep["call_budget_ms"]:
+                    break
+            call_args = copy.deepcopy(args)
+            start = time.perf_counter()
+            tracemalloc.start()
+            try:
+                function(*call_args)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            spent += sum(timings) + time.perf_counter() - start
+        except BaseException as e:
+            emit({"event": "sweep_error", "size": size, "error": _describe(e)})
+            return
+        best = min(timings) * 1000
+        emit({"event": "sweep", "size": size, "time_ms": best, "peak_kb": peak / 1024})
+        # Bir sonraki boyutun maliyeti gözlenen büyüme oranıyla tahmin edilir (tracemalloc'lu
+        # çağrı yaklaşık üç normal çağrı sayılır); bütçeyi aşacaksa tarama burada biter.
+        growth = max(2.0, best / previous) if previous else 4.0
+        projected = best * growth * (len(timings) + 3)
+        if best > sweep["call_budget_ms"] or spent * 1000 + projected > sweep["budget_ms"]:
+            return
+        previous = max(best, 1e-6)
+
+def _run_reference(function, precondition, inputs, compare, emit):
+    """Referans çözümün çıktılarını üretir; ön koşulu sağlamayan girdiler reddedilir."""
+    for index, args in enumerate(inputs):
+        try:
+            if precondition is not None and not precondition(*copy.deepcopy(args)):
+                emit({"index": index, "status": "rejected"})
+                continue
+            args = copy.deepcopy(args)
+            result = function(*args)
+        except BaseException as e:
+            emit({"index": index, "status": "error", "error": _describe(e)})
+            continue
+        emit(_output_event({"index": index}, compare, result, args))
+
+def main():
+    out = os.fdopen(os.dup(1), "w", buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+    def emit(message):
+        out.write(json.dumps(message, default=repr) + "\n")
+
+    emit({"event": "ready"})
+    job = json.loads(sys.stdin.readline())
+    _limit(job["cpu_seconds"], job["memory_mb"])
+    sys.stdout = sys.stderr = _Discard()
+    sys.stdin = None
+    namespace = {"__name__": "__solution__", "__builtins__": builtins}
+    _install_guard()
+
+    try:
+        exec(compile(job["code"], "<solution>", "exec"), namespace)
+        function = namespace[job["entrypoint"]]
+        if not callable(function):
+            raise TypeError(f"'{job['entrypoint']}' is not a function")
+    except KeyError:
+        emit({"event": "error", "error": f"Function '{job['entrypoint']}' is not defined."})
+        return
+    except BaseException as e:
+        emit({"event": "error", "error": _describe(e)})
+        return
+
+    compare = job.get("compare", "exact")
+    if job.get("mode") == "reference":
+        _run_reference(function, namespace.get("precondition"), job["tests"], compare, emit)
+        emit({"event": "done"})
+        return
+
+    _run_inputs(function, job["tests"], compare, emit)
+    if job.get("vectors"):
+        _run_inputs(function, job["vectors"], compare, emit, key="vector")
+    if job.get("sweep"):
+        _run_sweep(function, job["sweep"], emit)
+    emit({"event": "done"})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import ast
+import asyncio
+import hashlib
+import json
+import random
+import string
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..cache import TTLCache
+from ..config import settings
+from ..database import challenge_vector_collection
+from . import sandbox
+
+# Challenge'ın referans çözümünden (solution_code) otomatik test vektörleri üretir. Girdi
+# türleri template_code'daki fonksiyon imzasından (tip açıklamaları), yoksa gizli testlerdeki
+# örnek argümanlardan, o da yoksa parametre adlarından çıkarılır. Kenar durumlar ve rastgele
+# girdiler sandbox'ta referans çözümle çalıştırılır ve çıktılarıyla birlikte challenge_vectors
+# koleksiyonunda saklanır. Çözüm veya üretici değiştiğinde (hash) vektörler yeniden üretilir.
+#
+# Birden fazla doğru cevabı olabilen problemlerde challenge bir `precondition` fonksiyonu
+# tanımlar (ör. Two Sum'da tam olarak bir çözüm olması); bunu sağlamayan girdiler atılır.
+
+GENERATOR_VERSION = 1
+# Testleri çalıştırmak ve vektör üretmek için challenge'dan okunan alanlar.
+CHALLENGE_PROJECTION = {
+    "entrypoint": 1, "compare": 1, "tests": 1, "precondition": 1, "sweep_input": 1,
+    "template_code": 1, "solution_code": 1,
+}
+MAX_LIST_SIZE = 60
+CANDIDATE_FACTOR = 6
+
+_NAME_HINTS = {
+    "int": {"target", "k", "n", "m", "x", "num", "count", "amount", "size", "index"},
+    "str": {"s", "t", "string", "text", "word", "pattern", "sentence"},
+    "list": {"nums", "arr", "array", "numbers", "prices", "heights", "values", "items", "coins"},
+}
+
+_vectors = TTLCache(maxsize=256, ttl=60 * 60)
+_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# --- İmzadan girdi türleri ---
+
+def _spec_from_annotation(node: Optional[ast.expr]) -> Optional[Dict]:
+    if node is None:
+        return None
+    if isinstance(node, ast.Name) and node.id in ("int", "float", "str", "bool"):
+        return {"type": node.id}
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id in ("list", "List"):
+        item = _spec_from_annotation(node.slice)
+        return {"type": "list", "item": item or {"type": "int"}}
+    return None
+
+def _spec_from_examples(values: List[Any]) -> Optional[Dict]:
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    sample = values[0]
+    if isinstance(sample, bool):
+        return {"type": "bool"}
+    if isinstance(sample, int):
+        return {"type": "int"}
+    if isinstance(sample, float):
+        return {"type": "float"}
+    if isinstance(sample, str):
+        alphabet = sorted({c for v in values if isinstance(v, str) for c in v})
+        return {"type": "str", "alphabet": "".join(alphabet) or string.ascii_lowercase}
+    if isinstance(sample, list):
+        items = [item for v in values if isinstance(v, list) for item in v]
+        return {"type": "list", "item": _spec_from_examples(items) or {"type": "int"}}
+    return None
+
+def _spec_from_name(name: str) -> Dict:
+    if name in _NAME_HINTS["list"]:
+        return {"type": "list", "item": {"type": "int"}}
+    if name in _NAME_HINTS["str"]:
+        return {"type": "str"}
+    return {"type": "int"}
+
+def _refine(spec: Dict, example_spec: Optional[Dict]) -> Dict:
+    """Tip açıklamasından gelen türü örneklerden gelen ayrıntılarla (ör. alfabe) tamamlar."""
+    if example_spec is None or example_spec["type"] != spec["type"]:
+        return spec
+    if spec["type"] == "list":
+        return {**spec, "item": _refine(spec["item"], example_spec.get("item"))}
+    if spec["type"] == "str":
+        return {**spec, "alphabet": spec.get("alphabet") or example_spec.get("alphabet")}
+    return spec
+
+def arg_specs(template_code: str, entrypoint: str, examples: List[Dict]) -> List[Dict]:
+    """Fonksiyonun her parametresi için bir girdi türü tanımı döndürür."""
+    tree = ast.parse(template_code)
+    function = next(
+        (n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) and n.name == entrypoint),
+        None,
+    )
+    if function is None:
+        raise ValueError(f"function '{entrypoint}' not found in template_code")
+    specs = []
+    for position, arg in enumerate(function.args.args):
+        example_values = [test["args"][position] for test in examples if len(test.get("args", [])) > position]
+        from_examples = _spec_from_examples(example_values)
+        spec = _spec_from_annotation(arg.annotation) or from_examples or _spec_from_name(arg.arg)
+        specs.append(_refine(spec, from_examples))
+    return specs
+
+# --- Girdi üretimi ---
+
+def _scalar(spec: Dict, rng: random.Random, scale: int) -> Any:
+    kind = spec["type"]
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "float":
+        return round(rng.uniform(-scale, scale), 3)
+    if kind == "str":
+        alphabet = spec.get("alphabet") or string.ascii_lowercase
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+    return rng.randint(-scale, scale)
+
+def random_value(spec: Dict, rng: random.Random, size: int, scale: int) -> Any:
+    if spec["type"] == "list":
+        return [random_value(spec["item"], rng, max(1, size // 4), scale) for _ in range(size)]
+    if spec["type"] == "str":
+        alphabet = spec.get("alphabet") or string.ascii_lowercase
+        return "".join(rng.choice(alphabet) for _ in range(size))
+    return _scalar(spec, rng, scale)
+
+def _edge_values(spec: Dict, rng: random.Random) -> List[Any]:
+    kind = spec["type"]
+    if kind == "int":
+        return [0, 1, -1, 2, 10 ** 9, -(10 ** 9)]
+    if kind == "float":
+        return [0.0, 1.0, -1.5, 1e6]
+    if kind == "bool":
+        return [True, False]
+    if kind == "str":
+        alphabet = spec.get("alphabet") or string.ascii_lowercase
+        return ["", alphabet[0], alphabet[0] * 8, alphabet, alphabet[::-1] * 3]
+    item = spec["item"]
+    if item["type"] in ("int", "float"):
+        zero = 0.0 if item["type"] == "float" else 0
+        ascending = sorted(random_value(item, rng, 1, 100) for _ in range(MAX_LIST_SIZE))
+        return [
+            [], [zero], [rng.randint(-100, 100)], [zero] * 5,
+            [-(abs(v) + 1) for v in ascending[:10]],
+            ascending, ascending[::-1], [7] * 12,
+        ]
+    return [[], [_scalar(item, rng, 10)], [random_value(item, rng, 3, 10) for _ in range(MAX_LIST_SIZE)]]
+
+def candidate_inputs(specs: List[Dict], count: int, seed: int) -> List[List]:
+    """Önce kenar durumları (her parametre için, diğerleri rastgele), sonra rastgele girdiler; tekrarsız."""
+    rng = random.Random(seed)
+    candidates: List[List] = []
+    seen = set()
+
+    def add(args: List) -> None:
+        key = json.dumps(args, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(args)
+
+    def random_args() -> List:
+        # Küçük değer aralıkları eşitlik/çakışma içeren girdileri (ör. toplamı hedefe eşit çiftler) sık üretir.
+        scale = rng.choice((10, 10, 100, 1000))
+        size = rng.choice((rng.randint(0, 8), rng.randint(0, 8), rng.randint(9, MAX_LIST_SIZE)))
+        return [random_value(spec, rng, size, scale) for spec in specs]
+
+    for position, spec in enumerate(specs):
+        for value in _edge_values(spec, rng):
+            args = random_args()
+            args[position] = value
+            add(args)
+    attempts = 0
+    while len(candidates) < count and attempts < count * 4:
+        attempts += 1
+        add(random_args())
+    return candidates[:count]
+
+# --- Üretim ve saklama ---
+
+def reference_hash(challenge: Dict) -> str:
+    source = json.dumps([
+        GENERATOR_VERSION, challenge.get("solution_code"), challenge.get("template_code"),
+        challenge.get("entrypoint"), challenge.get("compare"), challenge.get("precondition"),
+        challenge.get("sweep_input"),
+    ])
+    return hashlib.sha256(source.encode()).hexdigest()
+
+async def generate(challenge: Dict, count: Optional[int] = None) -> List[Dict]:
+    """Referans çözümü aday girdilerde çalıştırıp en fazla `count` vektör ({"args", "expected"}) döndürür."""
+    count = count or settings.TEST_VECTORS_PER_CHALLENGE
+    specs = arg_specs(challenge["template_code"], challenge["entrypoint"], challenge.get("tests", []))
+    seed = int(reference_hash(challenge)[:8], 16)
+    inputs = candidate_inputs(specs, count * CANDIDATE_FACTOR, seed)
+    code = challenge["solution_code"] + "\n\n" + (challenge.get("precondition") or "")
+
+    vectors: List[Dict] = []
+    # Tek bir sandbox çağrısı duvar saati limitine takılmasın diye girdiler parçalar halinde çalıştırılır.
+    for start in range(0, len(inputs), count):
+        chunk = inputs[start:start + count]
+        for result in await sandbox.run_reference(code, challenge["entrypoint"], chunk, challenge.get("compare", "exact")):
+            if result["status"] == "ok":
+                vectors.append({"args": chunk[result["index"]], "expected": result["output"]})
+        if len(vectors) >= count:
+            break
+    # Küçük girdiler önce denenir; böylece raporlanan ilk uyuşmazlık okunması en kolay olandır.
+    return sorted(vectors[:count], key=lambda v: len(json.dumps(v["args"])))
+
+def _can_generate(challenge: Dict) -> bool:
+    return bool(challenge.get("entrypoint") and challenge.get("template_code") and challenge.get("solution_code"))
+
+async def get_vectors(challenge: Dict) -> List[Dict]:
+    """
+    Challenge'ın vektörlerini döndürür: önce süreç içi önbellek, sonra challenge_vectors;
+    ikisinde de güncel değilse üretip saklar. Üretilemezse boş liste döner.
+    """
+    if not _can_generate(challenge):
+        return []
+    challenge_id = str(challenge["_id"])
+    digest = reference_hash(challenge)
+    cached = _vectors.get(challenge_id)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    async with _locks[challenge_id]:
+        cached = _vectors.get(challenge_id)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        stored = await challenge_vector_collection.find_one({"_id": challenge_id, "referenceHash": digest})
+        if stored is not None:
+            vectors = stored["vectors"]
+        else:
+            try:
+                vectors = await generate(challenge)
+            except Exception as e:
+                print(f"[test_vectors] could not generate vectors for {challenge_id}: {e}")
+                return []
+            await challenge_vector_collection.replace_one(
+                {"_id": challenge_id},
+                {"referenceHash": digest, "vectors": vectors, "generatedAt": datetime.utcnow()},
+                upsert=True,
+            )
+        _vectors.set(challenge_id, (digest, vectors))
+        return vectors
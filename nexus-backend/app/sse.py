@@ -0,0 +1,19 @@
+import json
+from typing import Any, AsyncIterator, Optional
+from fastapi.responses import StreamingResponse
+
+def format_event(data: Any, event: Optional[str] = None) -> str:
+    """Bir veriyi Server-Sent Events formatında tek bir olay olarak serileştirir."""
+    payload = ""
+    if event:
+        payload += f"event: {event}\n"
+    payload += f"data: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+    return payload
+
+def event_stream_response(events: AsyncIterator[str]) -> StreamingResponse:
+    # Proxy'lerin (nginx vb.) yanıtı tamponlamaması için X-Accel-Buffering kapatılır.
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,22 @@
+import asyncio
+import signal
+
+from .database import client
+from .services import job_queue
+from .services import evaluation_jobs  # noqa: F401  (iş işleyicilerini kaydeder)
+
+# Arka plan işlerini API sürecinden ayrı çalıştıran worker süreci:
+#   python -m app.worker
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    print("Job worker started.")
+    await job_queue.run_workers(stop)
+    client.close()
+    print("Job worker stopped.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
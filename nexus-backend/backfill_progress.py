@@ -0,0 +1,33 @@
+import asyncio
+
+from app.database import client, roadmap_collection
+
+# progress/completedCount/nodeCount alanları olmayan eski roadmap dokümanlarını
+# tek bir sunucu tarafı güncellemesiyle doldurur. Tekrar çalıştırmak güvenlidir.
+
+async def backfill_progress():
+    print("Backfilling roadmap progress counters...")
+    result = await roadmap_collection.update_many(
+        {"$or": [{"completedCount": {"$exists": False}}, {"nodeCount": {"$exists": False}}]},
+        [
+            {"$set": {
+                "nodeCount": {"$size": {"$ifNull": ["$nodes", []]}},
+                "completedCount": {"$size": {"$filter": {
+                    "input": {"$ifNull": ["$nodes", []]},
+                    "cond": {"$eq": ["$$this.status", "completed"]},
+                }}},
+            }},
+            {"$set": {
+                "progress": {"$cond": [
+                    {"$gt": ["$nodeCount", 0]},
+                    {"$toInt": {"$floor": {"$multiply": [{"$divide": ["$completedCount", "$nodeCount"]}, 100]}}},
+                    0,
+                ]},
+            }},
+        ]
+    )
+    client.close()
+    print(f"Updated {result.modified_count} roadmaps.")
+
+if __name__ == "__main__":
+    asyncio.run(backfill_progress())
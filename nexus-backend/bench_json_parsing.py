@@ -0,0 +1,69 @@
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, List
+
+from app.models import (
+    Flashcard, GeneratedAssessment, GeneratedChallenge, GeneratedGrade,
+    GeneratedInterviewQuestion, GeneratedRoadmap,
+)
+from app.services.llm_json import JSONExtractionError, parse_json
+
+# fixtures/llm_responses altındaki bozuk LLM yanıtlarını ortak ayrıştırıcıdan geçirir,
+# her biri için sonucu ve saniyedeki ayrıştırma sayısını yazdırır. Dosya adının ilk
+# parçası hedef tipi belirler; "invalid__" ile başlayanların reddedilmesi beklenir.
+# "json.loads" sütunu, aynı metnin doğrudan json.loads ile ayrıştırılıp ayrıştırılamadığını gösterir.
+
+FIXTURES = Path(__file__).parent / "fixtures" / "llm_responses"
+
+TARGETS = {
+    "roadmap": GeneratedRoadmap,
+    "flashcards": List[Flashcard],
+    "challenges": List[GeneratedChallenge],
+    "interview": List[GeneratedInterviewQuestion],
+    "assessment": GeneratedAssessment,
+    "grade": GeneratedGrade,
+    "invalid": List[Flashcard],
+}
+
+def _rate(text: str, target: Any, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            parse_json(text, target)
+        except JSONExtractionError:
+            pass
+    return iterations / (time.perf_counter() - start)
+
+def main(iterations: int) -> int:
+    failures = 0
+    print(f"{'fixture':50} {'result':8} {'json.loads':10} {'parses/sec':>10}")
+    for path in sorted(FIXTURES.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        kind = path.stem.split("__", 1)[0]
+        target = TARGETS[kind]
+        try:
+            json.loads(text)
+            plain = "ok"
+        except json.JSONDecodeError:
+            plain = "error"
+        try:
+            parse_json(text, target)
+            result = "parsed"
+        except JSONExtractionError:
+            result = "rejected"
+        expected = "rejected" if kind == "invalid" else "parsed"
+        if result != expected:
+            failures += 1
+            result += "!"
+        print(f"{path.stem:50} {result:8} {plain:10} {_rate(text, target, iterations):10.0f}")
+
+    print(f"{failures} fixtures did not produce the expected result.")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared LLM JSON parser: fixture corpus check and throughput.")
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    raise SystemExit(1 if main(args.iterations) else 0)
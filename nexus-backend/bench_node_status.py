@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import time
+import uuid
+
+from bson import ObjectId
+
+from app.database import client, roadmap_collection
+from app.services import node_status_service, roadmap_graph
+
+# Node durumu güncellemesinin saniyede kaç istek işleyebildiğini ölçen yük testi. Çalışan bir
+# MongoDB'ye (MONGO_DETAILS) geçici roadmap'ler ekler ve sonunda siler. "before" satırı,
+# tüm dokümanı okuyup Python'da hesaplayan ve ardından koşullu update_one yapan eski akıştır;
+# "after" satırı tek find_one_and_update kullanan node_status_service'tir.
+
+STATUSES = ("in_progress", "completed", "not_started")
+
+def _roadmap(owner_id: str, node_count: int) -> dict:
+    # Her node bir öncekine bağlı (zincir), her beşinci node ayrıca ilk node'a bağlı.
+    nodes = []
+    for i in range(node_count):
+        deps = [f"n{i - 1}"] if i else []
+        if i % 5 == 0 and i > 1:
+            deps.append("n0")
+        nodes.append({
+            "nodeId": f"n{i}", "title": f"Node {i}", "description": "x" * 200,
+            "dependencies": deps, "status": "not_started",
+        })
+    return {
+        "title": "bench", "type": "user_generated", "ownerId": owner_id, "nodes": nodes,
+        "progress": 0, "completedCount": 0, "nodeCount": node_count,
+        "availableNodes": roadmap_graph.available_nodes(nodes, {}),
+    }
+
+async def _legacy_update(roadmap_id: str, owner_id: str, node_id: str, status: str) -> bool:
+    roadmap = await roadmap_collection.find_one({"_id": ObjectId(roadmap_id), "ownerId": owner_id})
+    target = next((n for n in roadmap["nodes"] if n["nodeId"] == node_id), None)
+    old_status = target.get("status", "not_started")
+    completed = roadmap["completedCount"] + int(status == "completed") - int(old_status == "completed")
+    statuses = {n["nodeId"]: n.get("status") for n in roadmap["nodes"]}
+    statuses[node_id] = status
+    result = await roadmap_collection.update_one(
+        {
+            "_id": ObjectId(roadmap_id), "completedCount": roadmap["completedCount"],
+            "nodes": {"$elemMatch": {"nodeId": node_id, "status": old_status}},
+        },
+        {"$set": {
+            "nodes.$.status": status,
+            "completedCount": completed,
+            "progress": int(completed / roadmap["nodeCount"] * 100),
+            "availableNodes": roadmap_graph.available_nodes(roadmap["nodes"], statuses),
+        }},
+    )
+    return result.matched_count == 1
+
+async def _atomic_update(roadmap_id: str, owner_id: str, node_id: str, status: str) -> bool:
+    return await node_status_service.set_node_status(roadmap_id, owner_id, node_id, status) is not None
+
+async def _run(update, roadmap_ids, owner_id: str, node_count: int, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    conflicts = 0
+
+    async def click(i: int):
+        nonlocal conflicts
+        async with semaphore:
+            # Aynı roadmap'e eşzamanlı tıklamalar da olsun diye roadmap'ler döngüsel seçilir.
+            ok = await update(roadmap_ids[i % len(roadmap_ids)], owner_id, f"n{i % node_count}", STATUSES[i % len(STATUSES)])
+            conflicts += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(click(i) for i in range(total)))
+    return total / (time.perf_counter() - start), conflicts
+
+async def main(total: int, node_count: int, roadmaps: int):
+    owner_id = f"bench-{uuid.uuid4().hex}"
+    result = await roadmap_collection.insert_many([_roadmap(owner_id, node_count) for _ in range(roadmaps)])
+    roadmap_ids = [str(i) for i in result.inserted_ids]
+    print(f"updates={total}, nodes/roadmap={node_count}, roadmaps={roadmaps}")
+    try:
+        for name, update in (("before", _legacy_update), ("after ", _atomic_update)):
+            for concurrency in (1, 16, 64):
+                rate, conflicts = await _run(update, roadmap_ids, owner_id, node_count, total, concurrency)
+                print(f"{name} (conc={concurrency:<3}): {rate:8.1f} updates/sec, {conflicts} conflicts")
+    finally:
+        await roadmap_collection.delete_many({"ownerId": owner_id})
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Node status update throughput against a live MongoDB.")
+    parser.add_argument("-n", "--updates", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=40)
+    parser.add_argument("--roadmaps", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.nodes, args.roadmaps))
@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import time
+
+from app.config import settings
+from app.security import pwd_context, verify_and_update_password_async
+
+# Tek bir uvicorn worker'ının saniyede kaç girişi doğrulayabildiğini ölçen mikro benchmark.
+# "inline" satırı, doğrulamanın doğrudan event loop üzerinde yapıldığı eski davranıştır.
+
+async def _bench_pool(hashed: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            await verify_and_update_password_async("correct horse battery staple", hashed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+def _bench_inline(hashed: str, total: int) -> float:
+    start = time.perf_counter()
+    for _ in range(total):
+        pwd_context.verify("correct horse battery staple", hashed)
+    return total / (time.perf_counter() - start)
+
+async def main(total: int):
+    hashed = pwd_context.hash("correct horse battery staple")
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}, pool workers={settings.PASSWORD_HASH_WORKERS}, logins={total}")
+    print(f"inline          : {_bench_inline(hashed, total):8.1f} logins/sec")
+    for concurrency in (1, 4, 16):
+        rate = await _bench_pool(hashed, total, concurrency)
+        print(f"pool (conc={concurrency:<3}): {rate:8.1f} logins/sec")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password hashing throughput per worker.")
+    parser.add_argument("-n", "--logins", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
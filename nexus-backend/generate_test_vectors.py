@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+import time
+
+from app.database import challenge_collection, client
+from app.services import sandbox, test_vectors
+
+# Tüm challenge'ların test vektörlerini önceden üretir (seed_db.py'den sonra çalıştırılır);
+# böylece ilk /run isteği üretimi beklemez. Güncel vektörler yeniden üretilmez.
+
+async def main(limit: int):
+    challenges = await challenge_collection.find({}, test_vectors.CHALLENGE_PROJECTION).to_list(limit)
+    for challenge in challenges:
+        start = time.perf_counter()
+        vectors = await test_vectors.get_vectors(challenge)
+        print(f"{challenge['_id']}: {len(vectors)} vectors in {time.perf_counter() - start:.2f}s")
+    await sandbox.pool.close()
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate reference test vectors for all challenges.")
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.limit))
@@ -0,0 +1,47 @@
+import asyncio
+
+from app.database import client, roadmap_collection, chat_message_collection
+from app.services.chat_history_service import BUCKET_SIZE
+
+# Roadmap dokümanlarına gömülü nodes[].chatHistory listelerini chat_messages
+# koleksiyonuna taşıyan tek seferlik betik. Tekrar çalıştırmak güvenlidir:
+# taşınan roadmap'lerde chatHistory alanı silindiği için ikinci kez işlenmezler.
+
+async def migrate_chat_history():
+    print("Migrating embedded chat histories...")
+    migrated_roadmaps = 0
+    migrated_messages = 0
+
+    cursor = roadmap_collection.find(
+        {"nodes.chatHistory": {"$exists": True}},
+        {"nodes.nodeId": 1, "nodes.chatHistory": 1}
+    )
+    async for roadmap in cursor:
+        roadmap_id = str(roadmap["_id"])
+        buckets = []
+        for node in roadmap.get("nodes", []):
+            history = sorted(node.get("chatHistory") or [], key=lambda m: m["timestamp"])
+            for start in range(0, len(history), BUCKET_SIZE):
+                messages = history[start:start + BUCKET_SIZE]
+                buckets.append({
+                    "roadmapId": roadmap_id,
+                    "nodeId": node["nodeId"],
+                    "count": len(messages),
+                    "firstAt": messages[0]["timestamp"],
+                    "lastAt": messages[-1]["timestamp"],
+                    "messages": messages,
+                })
+        if buckets:
+            await chat_message_collection.insert_many(buckets)
+            migrated_messages += sum(b["count"] for b in buckets)
+        await roadmap_collection.update_one(
+            {"_id": roadmap["_id"]},
+            {"$unset": {"nodes.$[].chatHistory": ""}}
+        )
+        migrated_roadmaps += 1
+
+    client.close()
+    print(f"Migrated {migrated_messages} messages from {migrated_roadmaps} roadmaps.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_chat_history())
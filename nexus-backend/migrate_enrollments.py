@@ -0,0 +1,35 @@
+import asyncio
+
+from app.database import client, roadmap_collection
+
+# Önerilen roadmap'lere yapılmış eski (node'ları tam kopyalanmış) kayıtları şablon
+# referansı + seyrek nodeStates katmanı biçimine dönüştürür. Sadece "not_started"
+# dışındaki durumlar katmana yazılır; sohbet geçmişi zaten ayrı koleksiyondadır
+# (bkz. migrate_chat_history.py). Tekrar çalıştırmak güvenlidir.
+
+async def migrate_enrollments():
+    print("Converting enrolled roadmap copies to template overlays...")
+    cursor = roadmap_collection.find(
+        {"templateId": {"$ne": None}, "nodes": {"$exists": True}, "nodeStates": {"$exists": False}},
+        {"nodes.nodeId": 1, "nodes.status": 1}
+    )
+    migrated = 0
+    async for roadmap in cursor:
+        node_states = {
+            node["nodeId"]: {"status": node["status"]}
+            for node in roadmap.get("nodes", [])
+            if node.get("status", "not_started") != "not_started"
+        }
+        await roadmap_collection.update_one(
+            {"_id": roadmap["_id"], "nodeStates": {"$exists": False}},
+            {
+                "$set": {"nodeStates": node_states},
+                "$unset": {"nodes": "", "title": "", "prompt": ""},
+            }
+        )
+        migrated += 1
+    client.close()
+    print(f"Migrated {migrated} enrollments.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_enrollments())
@@ -2,11 +2,15 @@ import asyncio
 import motor.motor_asyncio
 from bson import ObjectId
 
+from app.services import roadmap_graph
+
 MONGO_DETAILS = "mongodb://mongo:27017"
 client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_DETAILS)
 database = client.nexus_db
 roadmap_collection = database.get_collection("roadmaps")
 challenge_collection = database.get_collection("challenges")
+challenge_vector_collection = database.get_collection("challenge_vectors")
+catalog_meta_collection = database.get_collection("catalog_meta")
 
 # --- TÜM YOL HARİTASI VERİLERİ ---
 suggested_roadmaps_data = [
@@ -128,6 +132,17 @@ code_challenges_data = [
         "description": "Given an array of integers `nums` and an integer `target`, return indices of the two numbers such that they add up to `target`. You may assume that each input would have exactly one solution, and you may not use the same element twice.",
         "difficulty": "Easy", "category": "Arrays",
         "template_code": "def two_sum(nums, target):\n    # Your code here\n    pass\n",
+        "entrypoint": "two_sum", "compare": "unordered",
+        # Otomatik üretilen girdilerde tam olarak bir çözüm olmalı (bkz. app/services/test_vectors.py).
+        "precondition": "def precondition(nums, target):\n    pairs = [(i, j) for i in range(len(nums)) for j in range(i + 1, len(nums)) if nums[i] + nums[j] == target]\n    return len(pairs) == 1\n",
+        "tests": [
+            {"args": [[2, 7, 11, 15], 9], "expected": [0, 1]},
+            {"args": [[3, 2, 4], 6], "expected": [1, 2]},
+            {"args": [[3, 3], 6], "expected": [0, 1]},
+            {"args": [[-1, -2, -3, -4, -5], -8], "expected": [2, 4]},
+            {"args": [[0, 4, 3, 0], 0], "expected": [0, 3]},
+            {"args": [[1, 5, 9, 13, 2], 15], "expected": [3, 4]},
+        ],
         "solution_code": "def two_sum(nums, target):\n    num_map = {}\n    for i, num in enumerate(nums):\n        complement = target - num\n        if complement in num_map:\n            return [num_map[complement], i]\n        num_map[num] = i\n    return []\n"
     },
     {
@@ -135,6 +150,20 @@ code_challenges_data = [
         "description": "Given a string `s` containing just the characters '(', ')', '{', '}', '[' and ']', determine if the input string is valid. An input string is valid if: Open brackets must be closed by the same type of brackets. Open brackets must be closed in the correct order.",
         "difficulty": "Easy", "category": "Strings & Stacks",
         "template_code": "def is_valid(s):\n    # Your code here\n    pass\n",
+        "entrypoint": "is_valid",
+        "tests": [
+            {"args": ["()"], "expected": True},
+            {"args": ["()[]{}"], "expected": True},
+            {"args": ["(]"], "expected": False},
+            {"args": ["([)]"], "expected": False},
+            {"args": ["{[]}"], "expected": True},
+            {"args": [""], "expected": True},
+            {"args": ["(("], "expected": False},
+            {"args": ["]"], "expected": False},
+        ],
+        # Rastgele parantez dizileri ilk karakterlerde geçersiz olur; karmaşıklık taraması için en kötü
+        # durum olan iç içe geçerli dizi kullanılır (bkz. app/services/profiling.py).
+        "sweep_input": "def sweep_input(n):\n    return ['([{' * (n // 6) + '}])' * (n // 6)]\n",
         "solution_code": "def is_valid(s):\n    stack = []\n    mapping = {')': '(', '}': '{', ']': '['}\n    for char in s:\n        if char in mapping:\n            top_element = stack.pop() if stack else '#'\n            if mapping[char] != top_element:\n                return False\n        else:\n            stack.append(char)\n    return not stack\n"
     },
     {
@@ -142,6 +171,13 @@ code_challenges_data = [
         "description": "Write a function that reverses a string. The input string is given as an array of characters `s`.",
         "difficulty": "Easy", "category": "Strings",
         "template_code": "def reverse_string(s: list[str]) -> None:\n    \"\"\"\n    Do not return anything, modify s in-place instead.\n    \"\"\"\n    # Your code here\n    pass\n",
+        "entrypoint": "reverse_string", "compare": "inplace",
+        "tests": [
+            {"args": [["h", "e", "l", "l", "o"]], "expected": ["o", "l", "l", "e", "h"]},
+            {"args": [["H", "a", "n", "n", "a", "h"]], "expected": ["h", "a", "n", "n", "a", "H"]},
+            {"args": [["a"]], "expected": ["a"]},
+            {"args": [[]], "expected": []},
+        ],
         "solution_code": "def reverse_string(s: list[str]) -> None:\n    s.reverse()\n"
     },
     {
@@ -149,16 +185,28 @@ code_challenges_data = [
         "description": "Given an integer array `nums`, find the contiguous subarray (containing at least one number) which has the largest sum and return its sum.",
         "difficulty": "Medium", "category": "Arrays & Dynamic Programming",
         "template_code": "def max_subarray(nums: list[int]) -> int:\n    # Your code here\n    pass\n",
+        "entrypoint": "max_subarray",
+        "precondition": "def precondition(nums):\n    return len(nums) > 0\n",
+        "tests": [
+            {"args": [[-2, 1, -3, 4, -1, 2, 1, -5, 4]], "expected": 6},
+            {"args": [[1]], "expected": 1},
+            {"args": [[5, 4, -1, 7, 8]], "expected": 23},
+            {"args": [[-3, -1, -2]], "expected": -1},
+            {"args": [[0, 0, 0]], "expected": 0},
+        ],
         "solution_code": "def max_subarray(nums: list[int]) -> int:\n    max_so_far = -float('inf')\n    max_ending_here = 0\n    for num in nums:\n        max_ending_here = max_ending_here + num\n        if max_so_far < max_ending_here:\n            max_so_far = max_ending_here\n        if max_ending_here < 0:\n            max_ending_here = 0\n    return max_so_far\n"
     }
 ]
 
 # --- ANA SEED FONKSİYONU ---
 async def seed_data():
-    # Önce mevcut verileri sil
-    print("Deleting existing suggested roadmaps and challenges...")
-    await roadmap_collection.delete_many({"type": "suggested"})
-    await challenge_collection.delete_many({})
+    # Önce mevcut verileri sil. Önerilen roadmap'ler silinmez: kayıtlı kullanıcılar şablona
+    # _id ile referans verdiği için aşağıda başlığa göre yerinde güncellenir.
+    print("Deleting existing challenges...")
+    # AI'ın ürettiği önerilen challenge'lar kullanıcıların "görüldü" kayıtlarından referans alınır; silinmez.
+    await challenge_collection.delete_many({"source": {"$ne": "generated"}})
+    # Vektörler challenge id'sine bağlı; yeniden eklenen challenge'lar için ilk çalıştırmada üretilir.
+    await challenge_vector_collection.delete_many({})
     print("Deletion complete.")
 
     # Yol haritalarını eklemeden önce hazırla
@@ -168,16 +216,29 @@ async def seed_data():
         # Her bir nodea gerekli varsayılan alanları
         for node in roadmap_data["nodes"]:
             node["status"] = "not_started"
-            node["chatHistory"] = []
         # Her roadmape progress 
         roadmap_data["progress"] = 0
+        roadmap_data["completedCount"] = 0
+        roadmap_data["nodeCount"] = len(roadmap_data["nodes"])
+        # Graf alanları bir kez burada hesaplanır; kayıtlar sıra ve seviyeleri şablondan okur.
+        roadmap_data["nodes"], issues = roadmap_graph.repair(roadmap_data["nodes"])
+        if issues:
+            print(f"Repaired '{roadmap_data['title']}': {issues}")
+        roadmap_data["topoOrder"], roadmap_data["levels"] = roadmap_graph.analyze(roadmap_data["nodes"])
+        roadmap_data["availableNodes"] = roadmap_graph.available_nodes(roadmap_data["nodes"], {})
         roadmaps_to_insert.append(roadmap_data)
     
-    # Hazırlanan yol haritalarını veritabanına
+    # Hazırlanan yol haritalarını veritabanına (replace_one mevcut _id'yi korur)
     if roadmaps_to_insert:
-        print(f"Inserting {len(roadmaps_to_insert)} roadmaps...")
-        result = await roadmap_collection.insert_many(roadmaps_to_insert)
-        print(f"Successfully inserted {len(result.inserted_ids)} roadmaps.")
+        print(f"Upserting {len(roadmaps_to_insert)} roadmaps...")
+        for roadmap_data in roadmaps_to_insert:
+            await roadmap_collection.replace_one(
+                {"type": "suggested", "title": roadmap_data["title"]}, roadmap_data, upsert=True
+            )
+        removed = await roadmap_collection.delete_many({
+            "type": "suggested", "title": {"$nin": [r["title"] for r in roadmaps_to_insert]}
+        })
+        print(f"Successfully upserted {len(roadmaps_to_insert)} roadmaps, removed {removed.deleted_count} obsolete ones.")
 
     # Challenge'ları veritabanına 
     if code_challenges_data:
@@ -185,6 +246,9 @@ async def seed_data():
         result = await challenge_collection.insert_many(code_challenges_data)
         print(f"Successfully inserted {len(result.inserted_ids)} challenges.")
 
+    # API süreçlerinin katalog önbelleklerini yenilemesi için sürümü artır (bkz. app/catalog_cache.py).
+    await catalog_meta_collection.update_one({"_id": "catalog"}, {"$inc": {"version": 1}}, upsert=True)
+
     client.close()
     print("Database seeding complete.")
 
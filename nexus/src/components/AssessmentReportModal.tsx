@@ -1,14 +1,33 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { X } from 'lucide-react';
-import { AssessmentSession } from '../types';
+import apiClient from '../services/apiClient';
+import { SessionReport, SessionSummary } from '../types';
 import ReactMarkdown from 'react-markdown';
 
 interface AssessmentReportModalProps {
-  assessment: AssessmentSession;
+  assessment: SessionSummary;
   onClose: () => void;
 }
 
 const AssessmentReportModal: React.FC<AssessmentReportModalProps> = ({ assessment, onClose }) => {
+  const [report, setReport] = useState<SessionReport | null>(null);
+  const [loading, setLoading] = useState(true);
+
+  // Rapor metni profil listesinde yer almaz; modal açıldığında ayrıca çekilir.
+  useEffect(() => {
+    const fetchReport = async () => {
+      try {
+        const { data } = await apiClient.get<SessionReport>(`/api/assessments/${assessment.id}/report`);
+        setReport(data);
+      } catch (error) {
+        console.error("Failed to fetch report:", error);
+      } finally {
+        setLoading(false);
+      }
+    };
+    fetchReport();
+  }, [assessment.id]);
+
   return (
     <div 
       className="fixed inset-0 bg-black/80 backdrop-blur-sm flex items-center justify-center z-50 animate-fade-in" 
@@ -34,8 +53,10 @@ const AssessmentReportModal: React.FC<AssessmentReportModalProps> = ({ assessmen
 
         <main className="flex-grow p-6 overflow-y-auto custom-scrollbar">
           <div className="markdown-content text-gray-300">
-            {assessment.final_report ? (
-              <ReactMarkdown>{assessment.final_report}</ReactMarkdown>
+            {loading ? (
+              <p className="animate-pulse">Loading report...</p>
+            ) : report?.report ? (
+              <ReactMarkdown>{report.report}</ReactMarkdown>
             ) : (
               <p>No final report available for this session.</p>
             )}
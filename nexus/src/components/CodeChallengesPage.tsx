@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import apiClient from '../services/apiClient';
-import { CodeChallenge, RoadmapData, UserProfile } from '../types';
+import { CodeChallenge, Page, RoadmapSummary } from '../types';
 import ChallengeList from './ChallengeList';
 import ChallengeDetail from './ChallengeDetail';
 import ChatPanel from './ChatPanel';
@@ -14,7 +14,7 @@ const CodeChallengesPage: React.FC = () => {
   const [activeTab, setActiveTab] = useState<ChallengeTab>('suggested');
   const [suggestedChallenges, setSuggestedChallenges] = useState<CodeChallenge[]>([]);
   const [recommendedChallenges, setRecommendedChallenges] = useState<CodeChallenge[]>([]);
-  const [userRoadmaps, setUserRoadmaps] = useState<RoadmapData[]>([]);
+  const [userRoadmaps, setUserRoadmaps] = useState<RoadmapSummary[]>([]);
   
   const [selectedChallenge, setSelectedChallenge] = useState<CodeChallenge | null>(null);
   const [loading, setLoading] = useState(true);
@@ -26,16 +26,16 @@ const CodeChallengesPage: React.FC = () => {
     const fetchInitialData = async () => {
       setLoading(true);
       try {
-        const [challengesRes, profileRes] = await Promise.all([
+        const [challengesRes, roadmapsRes] = await Promise.all([
           apiClient.get<ChallengeResponse[]>('/api/challenges/'),
-          apiClient.get<UserProfile>('/api/auth/users/me/profile')
+          apiClient.get<Page<RoadmapSummary>>('/api/auth/users/me/profile/roadmaps', { params: { limit: 100 } })
         ]);
         
         const transformedChallenges = challengesRes.data.map(c => ({ ...c, id: c.id || c._id || '' }));
         setSuggestedChallenges(transformedChallenges);
         
         // Gelen roadmap verisini de dönüştürerek ID'lerini garantile
-        const transformedRoadmaps = profileRes.data.roadmaps.map(r => ({ ...r, id: (r as any).id || (r as any)._id || '' }));
+        const transformedRoadmaps = roadmapsRes.data.items.map(r => ({ ...r, id: r.id || r._id || '' }));
         setUserRoadmaps(transformedRoadmaps);
 
         if (transformedChallenges.length > 0 && activeTab === 'suggested') {
@@ -52,9 +52,7 @@ const CodeChallengesPage: React.FC = () => {
   }, []);
 
   const eligibleRoadmaps = useMemo(() => {
-    return userRoadmaps.filter(roadmap => 
-      roadmap.nodes.some(node => node.status === 'completed')
-    );
+    return userRoadmaps.filter(roadmap => roadmap.completedCount > 0);
   }, [userRoadmaps]);
 
   const handleGenerateForRoadmap = async (roadmapId: string, roadmapTitle: string) => {
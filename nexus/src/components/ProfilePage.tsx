@@ -2,17 +2,38 @@ import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Mail, GitBranch, CheckCircle, TrendingUp, Mic, FileText, Award } from 'lucide-react';
 import apiClient from '../services/apiClient';
-import { UserProfile, RoadmapData, InterviewSession, AssessmentSession } from '../types';
+import { UserProfile, Page, RoadmapSummary, SessionSummary } from '../types';
 import InterviewReportModal from './InterviewReportModal';
 import AssessmentReportModal from './AssessmentReportModal';
 
+type Section = 'roadmaps' | 'interviews' | 'assessments';
+
 const ProfilePage: React.FC = () => {
   const [profileData, setProfileData] = useState<UserProfile | null>(null);
   const [loading, setLoading] = useState(true);
-  const [selectedInterview, setSelectedInterview] = useState<InterviewSession | null>(null);
-  const [selectedAssessment, setSelectedAssessment] = useState<AssessmentSession | null>(null);
+  const [loadingMore, setLoadingMore] = useState<Section | null>(null);
+  const [selectedInterview, setSelectedInterview] = useState<SessionSummary | null>(null);
+  const [selectedAssessment, setSelectedAssessment] = useState<SessionSummary | null>(null);
   const navigate = useNavigate();
 
+  // Bölümlerin sonraki sayfalarını çekip mevcut listenin sonuna ekler.
+  const loadMore = async (section: Section) => {
+    const cursor = profileData?.[section].next_cursor;
+    if (!profileData || !cursor) return;
+    setLoadingMore(section);
+    try {
+      const { data } = await apiClient.get<Page<any>>(`/api/auth/users/me/profile/${section}`, { params: { after: cursor } });
+      setProfileData(prev => prev && {
+        ...prev,
+        [section]: { items: [...prev[section].items, ...data.items], next_cursor: data.next_cursor },
+      });
+    } catch (error) {
+      console.error(`Failed to load more ${section}:`, error);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
   useEffect(() => {
     const fetchProfileData = async () => {
       try {
@@ -35,11 +56,14 @@ const ProfilePage: React.FC = () => {
     return <div className="flex justify-center items-center h-screen"><p className="text-center text-red-400 text-xl">Could not load profile data.</p></div>;
   }
 
-  const { user_details, roadmaps, interviews, assessments } = profileData;
+  const { user_details } = profileData;
+  const roadmaps: RoadmapSummary[] = profileData.roadmaps.items.map(r => ({ ...r, id: r.id || r._id || '' }));
+  const interviews: SessionSummary[] = profileData.interviews.items.map(i => ({ ...i, id: i.id || i._id || '' }));
+  const assessments: SessionSummary[] = profileData.assessments.items.map(a => ({ ...a, id: a.id || a._id || '' }));
+  // Sayfalanmış listelerde sayılar yüklenen kayıtlar üzerinden hesaplanır; devamı varsa "+" eklenir.
+  const countLabel = (section: Section, count: number) => `${count}${profileData[section].next_cursor ? '+' : ''}`;
 
-  const completedNodes = roadmaps.reduce((acc, roadmap) => {
-    return acc + (roadmap.nodes?.filter(node => node.status === 'completed').length || 0);
-  }, 0);
+  const completedNodes = roadmaps.reduce((acc, roadmap) => acc + (roadmap.completedCount || 0), 0);
   
   const avgProgress = roadmaps.length > 0 ? Math.round(roadmaps.reduce((acc, r) => acc + (r.progress || 0), 0) / roadmaps.length) : 0;
 
@@ -67,11 +91,11 @@ const ProfilePage: React.FC = () => {
               <hr className="border-gray-700 my-6" />
               <h3 className="text-xl font-semibold text-white mb-4">Overall Stats</h3>
               <div className="space-y-4">
-                <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><GitBranch className="w-5 h-5 mr-3 text-cyan-400" />Roadmaps Initiated</span><span className="font-bold text-white text-lg">{roadmaps.length}</span></div>
+                <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><GitBranch className="w-5 h-5 mr-3 text-cyan-400" />Roadmaps Initiated</span><span className="font-bold text-white text-lg">{countLabel('roadmaps', roadmaps.length)}</span></div>
                 <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><CheckCircle className="w-5 h-5 mr-3 text-green-400" />Nodes Completed</span><span className="font-bold text-white text-lg">{completedNodes}</span></div>
                 <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><TrendingUp className="w-5 h-5 mr-3 text-yellow-400" />Average Progress</span><span className="font-bold text-white text-lg">{avgProgress}%</span></div>
-                <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><Mic className="w-5 h-5 mr-3 text-blue-400" />Interviews Completed</span><span className="font-bold text-white text-lg">{interviews?.length || 0}</span></div>
-                <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><Award className="w-5 h-5 mr-3 text-orange-400" />Assessments Taken</span><span className="font-bold text-white text-lg">{assessments?.length || 0}</span></div>
+                <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><Mic className="w-5 h-5 mr-3 text-blue-400" />Interviews Completed</span><span className="font-bold text-white text-lg">{countLabel('interviews', interviews.length)}</span></div>
+                <div className="flex justify-between items-center text-gray-300"><span className="flex items-center"><Award className="w-5 h-5 mr-3 text-orange-400" />Assessments Taken</span><span className="font-bold text-white text-lg">{countLabel('assessments', assessments.length)}</span></div>
               </div>
             </div>
           </div>
@@ -83,7 +107,7 @@ const ProfilePage: React.FC = () => {
               <div className="space-y-4 max-h-[40vh] overflow-y-auto custom-scrollbar pr-2">
                 {roadmaps && roadmaps.length > 0 ? (
                   roadmaps.map((roadmap) => {
-                    const roadmapId = (roadmap as any).id || (roadmap as any)._id;
+                    const roadmapId = roadmap.id;
                     if (!roadmapId) return null;
                     return (
                       <div key={roadmapId} className="bg-nexus-dark/50 p-4 rounded-lg flex items-center justify-between cursor-pointer hover:bg-nexus-accent/10 transition-colors" onClick={() => navigate(`/roadmaps/${roadmapId}`)}>
@@ -101,13 +125,18 @@ const ProfilePage: React.FC = () => {
                 ) : (
                   <p className="text-gray-400 text-center py-8">You haven't generated any roadmaps yet.</p>
                 )}
+                {profileData.roadmaps.next_cursor && (
+                  <button onClick={() => loadMore('roadmaps')} disabled={loadingMore === 'roadmaps'} className="w-full py-2 text-sm text-nexus-accent hover:underline disabled:opacity-50">
+                    {loadingMore === 'roadmaps' ? 'Loading...' : 'Load more'}
+                  </button>
+                )}
               </div>
             </div>
 
             <div className="bg-nexus-surface/80 p-6 rounded-2xl border border-gray-700">
               <h3 className="text-xl font-semibold text-white mb-4">Interview Reports</h3>
               <div className="space-y-4 max-h-[40vh] overflow-y-auto custom-scrollbar pr-2">
-                {interviews && interviews.length > 0 ? (
+                {interviews.length > 0 ? (
                     interviews.map((interview) => (
                     <div key={interview.id} className="bg-nexus-dark/50 p-4 rounded-lg flex items-center justify-between cursor-pointer hover:bg-nexus-accent/10 transition-colors" onClick={() => setSelectedInterview(interview)}>
                         <div className="flex items-center space-x-4">
@@ -137,13 +166,18 @@ const ProfilePage: React.FC = () => {
                 ) : (
                     <p className="text-gray-400 text-center py-8">You haven't completed any interviews yet.</p>
                 )}
+                {profileData.interviews.next_cursor && (
+                  <button onClick={() => loadMore('interviews')} disabled={loadingMore === 'interviews'} className="w-full py-2 text-sm text-nexus-accent hover:underline disabled:opacity-50">
+                    {loadingMore === 'interviews' ? 'Loading...' : 'Load more'}
+                  </button>
+                )}
               </div>
             </div>
 
             <div className="bg-nexus-surface/80 p-6 rounded-2xl border border-gray-700">
               <h3 className="text-xl font-semibold text-white mb-4">Assessment Reports</h3>
               <div className="space-y-4 max-h-[40vh] overflow-y-auto custom-scrollbar pr-2">
-                {assessments && assessments.length > 0 ? (
+                {assessments.length > 0 ? (
                     assessments.map((assessment) => (
                     <div key={assessment.id} className="bg-nexus-dark/50 p-4 rounded-lg flex items-center justify-between cursor-pointer hover:bg-nexus-accent/10 transition-colors" onClick={() => setSelectedAssessment(assessment)}>
                         <div>
@@ -161,6 +195,11 @@ const ProfilePage: React.FC = () => {
                 ) : (
                     <p className="text-gray-400 text-center py-8">You haven't completed any skill assessments yet.</p>
                 )}
+                {profileData.assessments.next_cursor && (
+                  <button onClick={() => loadMore('assessments')} disabled={loadingMore === 'assessments'} className="w-full py-2 text-sm text-nexus-accent hover:underline disabled:opacity-50">
+                    {loadingMore === 'assessments' ? 'Loading...' : 'Load more'}
+                  </button>
+                )}
               </div>
             </div>
           </div>
@@ -2,24 +2,23 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import apiClient from '../../services/apiClient';
 import toast from 'react-hot-toast';
-import { AssessmentSession, RoadmapData, UserProfile } from '../../types';
+import { AssessmentSession, Page, RoadmapSummary } from '../../types';
 import { BookOpen } from 'lucide-react';
 
-type RoadmapResponse = RoadmapData & { _id?: string };
 
 const AssessmentTopicPage: React.FC = () => {
   const [isStarting, setIsStarting] = useState(false);
-  const [roadmaps, setRoadmaps] = useState<RoadmapData[]>([]);
+  const [roadmaps, setRoadmaps] = useState<RoadmapSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const navigate = useNavigate();
 
   useEffect(() => {
     const fetchUserRoadmaps = async () => {
       try {
-        const response = await apiClient.get<UserProfile>('/api/auth/users/me/profile');
-        const transformedRoadmaps = response.data.roadmaps.map(roadmap => ({
+        const response = await apiClient.get<Page<RoadmapSummary>>('/api/auth/users/me/profile/roadmaps', { params: { limit: 100 } });
+        const transformedRoadmaps = response.data.items.map(roadmap => ({
           ...roadmap,
-          id: (roadmap as RoadmapResponse).id || (roadmap as RoadmapResponse)._id || '',
+          id: roadmap.id || roadmap._id || '',
         }));
         setRoadmaps(transformedRoadmaps);
       } catch (error) {
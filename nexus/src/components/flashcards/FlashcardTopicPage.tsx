@@ -1,24 +1,23 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import apiClient from '../../services/apiClient';
-import { RoadmapData, UserProfile } from '../../types';
+import { Page, RoadmapSummary } from '../../types';
 import { BookOpen } from 'lucide-react';
 import toast from 'react-hot-toast';
 
-type RoadmapResponse = RoadmapData & { _id?: string };
 
 const FlashcardTopicPage: React.FC = () => {
-  const [roadmaps, setRoadmaps] = useState<RoadmapData[]>([]);
+  const [roadmaps, setRoadmaps] = useState<RoadmapSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const navigate = useNavigate();
 
   useEffect(() => {
     const fetchUserRoadmaps = async () => {
       try {
-        const response = await apiClient.get<UserProfile>('/api/auth/users/me/profile');
-        const transformedRoadmaps = response.data.roadmaps.map(roadmap => ({
+        const response = await apiClient.get<Page<RoadmapSummary>>('/api/auth/users/me/profile/roadmaps', { params: { limit: 100 } });
+        const transformedRoadmaps = response.data.items.map(roadmap => ({
           ...roadmap,
-          id: (roadmap as RoadmapResponse).id || (roadmap as RoadmapResponse)._id || '',
+          id: roadmap.id || roadmap._id || '',
         }));
         setRoadmaps(transformedRoadmaps);
       } catch (error) {
@@ -55,7 +54,7 @@ const FlashcardTopicPage: React.FC = () => {
               <h3 className="text-2xl font-semibold text-gray-100 group-hover:text-nexus-accent transition-colors">
                 {roadmap.title}
               </h3>
-              <p className="text-sm text-gray-500 mt-2">{roadmap.nodes.length} topics</p>
+              <p className="text-sm text-gray-500 mt-2">{roadmap.nodeCount} topics</p>
             </button>
           ))}
         </div>
@@ -10,6 +10,8 @@ import 'prismjs/themes/prism-tomorrow.css';
 import { Timer, CheckSquare, Send } from 'lucide-react';
 
 const TOTAL_TIME = 20 * 60;
+// Kalan sorular arka planda üretilirken oturum bu aralıkla yeniden çekilir.
+const QUESTIONS_POLL_MS = 3000;
 
 const InterviewSessionPage: React.FC = () => {
   const { sessionId } = useParams<{ sessionId: string }>();
@@ -37,6 +39,21 @@ const InterviewSessionPage: React.FC = () => {
       });
   }, [sessionId, navigate]);
 
+  // Sorular sadece sona eklenir; cevaplar indeksle tutulduğundan yeni sorular mevcut cevapları bozmaz.
+  useEffect(() => {
+    if (!sessionId || !session?.questions_pending || session.status !== 'in_progress') return;
+    const timeout = setTimeout(() => {
+      apiClient.get<InterviewSession>(`/api/interviews/${sessionId}`)
+        .then(response => setSession(response.data))
+        .catch(err => {
+          console.error(err);
+          // Geçici hatalarda yoklamaya devam etmek için aynı durumu yeni bir nesneyle tekrar yaz.
+          setSession(prev => prev && { ...prev });
+        });
+    }, QUESTIONS_POLL_MS);
+    return () => clearTimeout(timeout);
+  }, [sessionId, session]);
+
   useEffect(() => {
     if (!loading && session) { 
       timerRef.current = setInterval(() => {
@@ -50,7 +67,7 @@ const InterviewSessionPage: React.FC = () => {
       }, 1000);
     }
     return () => clearInterval(timerRef.current);
-  }, [loading, session]);
+  }, [loading]);
 
   useEffect(() => {
     if (timeLeft === 0 && session?.status === 'in_progress') {
@@ -30,11 +30,50 @@ export interface ChatMessage {
     email: string;
   }
   
+  // Profil listeleri sadece özet alanları içerir ve _id imleciyle sayfalanır.
+  export interface Page<T> {
+    items: T[];
+    next_cursor?: string | null; // Sonraki sayfa için ?after= parametresi
+  }
+
+  export interface RoadmapSummary {
+    id: string;
+    _id?: string;
+    title: string;
+    prompt?: string | null;
+    type: string;
+    templateId?: string | null;
+    progress: number;
+    completedCount: number;
+    nodeCount: number;
+  }
+
+  export interface SessionSummary {
+    id: string;
+    _id?: string;
+    topic: string;
+    score?: number | null;
+    completed_at?: string | null;
+  }
+
+  export interface ItemGrade {
+    kind: string;
+    question: string;
+    score: number; // 0-10
+    feedback: string;
+  }
+
+  // /api/interviews/{id}/report ve /api/assessments/{id}/report yanıtı
+  export interface SessionReport extends SessionSummary {
+    report?: string | null;
+    item_grades: ItemGrade[];
+  }
+
   export interface UserProfile {
     user_details: AuthUser;
-    roadmaps: RoadmapData[];
-    interviews?: InterviewSession[]; // interviews alanını ekle/doğrula
-    assessments?: AssessmentSession[]; // assessments alanını ekle/doğrula
+    roadmaps: Page<RoadmapSummary>;
+    interviews: Page<SessionSummary>;
+    assessments: Page<SessionSummary>;
   }
 
   export interface CodeChallenge {
@@ -44,7 +83,7 @@ export interface ChatMessage {
     difficulty: string;
     category: string;
     template_code: string;
-    solution_code: string;
+    solution_code?: string;
   }
 
   export interface InterviewQuestion {
@@ -59,7 +98,8 @@ export interface ChatMessage {
     ownerId: string;
     topic: string;
     questions: InterviewQuestion[];
-    status: 'in_progress' | 'completed';
+    questions_pending?: boolean; // Kalan sorular arka planda üretilirken true
+    status: 'in_progress' | 'evaluating' | 'completed';
     feedback?: string;
     score?: number;
     started_at: string;